@@ -0,0 +1,1701 @@
+"""
+Sorting algorithms implemented as generators. Every algorithm sorts the given list in place and yields the operations
+it performs, so the caller decides how many of them are shown per frame, or runs the algorithm headless.
+"""
+from collections import deque
+from enum import IntEnum
+from functools import partial
+from math import isqrt
+from typing import Callable, Dict, Iterator, NamedTuple
+
+
+class OpCode(IntEnum):
+    """
+    Types of the operations yielded by the sorting algorithms
+    """
+    COMPARE = 0  # a, b - indices of the compared numbers
+    SWAP = 1  # a, b - indices of the swapped numbers
+    WRITE = 2  # a - index written to, b - the written number
+    HIGHLIGHT = 3  # a - index of the number the algorithm focuses on
+    ALLOC = 4  # a - the number of elements of the allocated auxiliary memory
+    FREE = 5  # a - the number of elements of the freed auxiliary memory
+    LANE = 6  # a - the first index of the region of the worker b (-1 for none), a lane at 0 replaces all regions
+
+
+class Operation(NamedTuple):
+    """
+    Single operation performed by a sorting algorithm. A swap or write is yielded after the array was already changed,
+    a comparison is yielded before the compared numbers are used
+    """
+    code: OpCode
+    a: int
+    b: int = 0
+
+
+COMPARE, SWAP, WRITE, HIGHLIGHT, ALLOC, FREE, LANE = OpCode
+
+
+def bubble_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the bubble sort algorithm
+
+    :param nums: the array to sort
+    """
+    while True:
+        changed = False
+        for i in range(1, len(nums)):
+            yield Operation(COMPARE, i, i - 1)
+            if nums[i] < nums[i - 1]:
+                nums[i], nums[i - 1] = nums[i - 1], nums[i]
+                yield Operation(SWAP, i, i - 1)
+                changed = True
+        if not changed:
+            return
+
+
+def insertion_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the insertion sort algorithm
+
+    :param nums: the array to sort
+    """
+    for i in range(1, len(nums)):
+        j = i - 1
+        while j >= 0:
+            yield Operation(COMPARE, j, j + 1)
+            if nums[j] <= nums[j + 1]:
+                break
+            nums[j + 1], nums[j] = nums[j], nums[j + 1]
+            yield Operation(SWAP, j, j + 1)
+            j -= 1
+
+
+def _merge(nums: list, left: list, right: list, start_l: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for merge sort algorithm, merges the left and right arrays
+
+    :param nums: the array to merge into
+    :param left: the left sub-array to merge
+    :param right: the right sub-array to merge
+    :param start_l: the starting index of left sub-array within the main array
+    """
+    i = j = 0
+    k = start_l
+    mid = start_l + len(left)
+
+    while i < len(left) and j < len(right):
+        yield Operation(COMPARE, k, mid + j)
+        if left[i] <= right[j]:
+            nums[k] = left[i]
+            i += 1
+        else:
+            nums[k] = right[j]
+            j += 1
+        yield Operation(WRITE, k, nums[k])
+        k += 1
+
+    while i < len(left):
+        nums[k] = left[i]
+        yield Operation(WRITE, k, nums[k])
+        i += 1
+        k += 1
+
+    while j < len(right):
+        nums[k] = right[j]
+        yield Operation(WRITE, k, nums[k])
+        j += 1
+        k += 1
+
+
+def merge_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the bottom-up merge sort algorithm
+
+    :param nums: the array to sort
+    """
+    group_size = 2
+    while group_size // 2 < len(nums):
+        for start_l in range(0, len(nums), group_size):
+            mid = min(start_l + group_size // 2, len(nums))
+            end_r = min(start_l + group_size, len(nums))
+            yield Operation(ALLOC, end_r - start_l)
+            yield from _merge(nums, nums[start_l:mid], nums[mid:end_r], start_l)
+            yield Operation(FREE, end_r - start_l)
+        group_size *= 2
+
+
+def selection_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the selection sort algorithm
+
+    :param nums: the array to sort
+    """
+    for start in range(len(nums)):
+        min_index = start
+        for i in range(start + 1, len(nums)):
+            yield Operation(COMPARE, i, min_index)
+            if nums[i] < nums[min_index]:
+                min_index = i
+        if min_index != start:
+            nums[start], nums[min_index] = nums[min_index], nums[start]
+            yield Operation(SWAP, min_index, start)
+
+
+def _partition(nums: list, start: int, end: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the quick sort algorithm, moves the elements in the array according to the pivot
+
+    :param nums: the array to partition
+    :param start: the first index of sub-array
+    :param end: the last index of sub-array
+    :return: the correct index of pivot
+    """
+    pivot = nums[end]
+    i = start - 1
+    for j in range(start, end):
+        yield Operation(COMPARE, j, end)
+        if nums[j] < pivot:
+            i += 1
+            if i != j:
+                nums[i], nums[j] = nums[j], nums[i]
+                yield Operation(SWAP, j, i)
+    i += 1
+    if i != end:
+        nums[i], nums[end] = nums[end], nums[i]
+        yield Operation(SWAP, i, end)
+    return i
+
+
+def quick_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the quick sort algorithm
+
+    :param nums: the array to sort
+    """
+    stack = [(0, len(nums) - 1)]
+    yield Operation(ALLOC, 1)
+    while stack:
+        start, end = stack.pop()
+        yield Operation(FREE, 1)
+        if start >= end:
+            continue
+        pivot_index = yield from _partition(nums, start, end)
+        stack.append((start, pivot_index - 1))
+        stack.append((pivot_index + 1, end))
+        yield Operation(ALLOC, 2)
+
+
+def _swap(nums: list, i: int, j: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the heap and hybrid sorts, swaps two numbers of the array unless the indices are the same
+
+    :param nums: the array
+    :param i: index of the first number
+    :param j: index of the second number
+    """
+    if i != j:
+        nums[i], nums[j] = nums[j], nums[i]
+        yield Operation(SWAP, i, j)
+
+
+def _sift_down(nums: list, offset: int, parent_i: int, n: int, d: int = 2) -> Iterator[Operation]:
+    """
+    Auxiliary function for heap sort algorithm, moves the number down the d-ary max heap stored from the offset on until
+    it is not smaller than its children
+
+    :param nums: the array holding the heap
+    :param offset: the index of the heap's root within the array
+    :param parent_i: index of the moved node within the heap
+    :param n: the length of the heap
+    :param d: the number of children of every node
+    """
+    while True:
+        first = d * parent_i + 1
+        largest_i = parent_i
+        for child_i in range(first, min(first + d, n)):
+            yield Operation(COMPARE, offset + child_i, offset + largest_i)
+            if nums[offset + child_i] > nums[offset + largest_i]:
+                largest_i = child_i
+        if largest_i == parent_i:
+            return
+        nums[offset + parent_i], nums[offset + largest_i] = nums[offset + largest_i], nums[offset + parent_i]
+        yield Operation(SWAP, offset + parent_i, offset + largest_i)
+        parent_i = largest_i
+
+
+def _sift_to_bottom(nums: list, n: int, d: int = 2) -> Iterator[Operation]:
+    """
+    Auxiliary function for the bottom-up heap sort, moves the root of the d-ary max heap to its place by descending
+    along the largest children to a leaf without comparing them to the root, then climbing back up to the first node
+    not smaller than the root; the root usually belongs near the bottom, so this takes about half the comparisons
+
+    :param nums: the array holding the heap
+    :param n: the length of the heap
+    :param d: the number of children of every node
+    """
+    leaf = 0
+    while d * leaf + 1 < n:
+        first = d * leaf + 1
+        leaf = first
+        for child_i in range(first + 1, min(first + d, n)):
+            yield Operation(COMPARE, child_i, leaf)
+            if nums[child_i] > nums[leaf]:
+                leaf = child_i
+    root = nums[0]
+    while leaf:
+        yield Operation(COMPARE, 0, leaf)
+        if nums[leaf] >= root:
+            break
+        leaf = (leaf - 1) // d
+    # the numbers on the path above the found node move one level up, the root takes the node's place
+    path = []
+    while leaf:
+        path.append(leaf)
+        leaf = (leaf - 1) // d
+    target = 0
+    for node in reversed(path):
+        nums[target] = nums[node]
+        yield Operation(WRITE, target, nums[target])
+        target = node
+    if target:
+        nums[target] = root
+        yield Operation(WRITE, target, root)
+
+
+def heap_sort(nums: list, d: int = 2, bottom_up: bool = False) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the iterative heap sort algorithm, the max heap is built bottom-up by Floyd's method
+
+    :param nums: the array to sort
+    :param d: the number of children of every node of the heap, the wider heaps are shallower
+    :param bottom_up: whether the root is sifted to the bottom and then up after every extraction
+    """
+    n = len(nums)
+    for i in range((n - 2) // d, -1, -1):
+        yield from _sift_down(nums, 0, i, n, d)
+    for last in range(n - 1, 0, -1):
+        nums[last], nums[0] = nums[0], nums[last]
+        yield Operation(SWAP, last, 0)
+        if bottom_up:
+            yield from _sift_to_bottom(nums, last, d)
+        else:
+            yield from _sift_down(nums, 0, 0, last, d)
+
+
+def shell_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the shell sort algorithm
+
+    :param nums: the array to sort
+    """
+    dist = len(nums) // 2
+    while dist > 0:
+        for i in range(dist, len(nums)):
+            j = i
+            while j >= dist:
+                yield Operation(COMPARE, j - dist, j)
+                if nums[j - dist] <= nums[j]:
+                    break
+                nums[j], nums[j - dist] = nums[j - dist], nums[j]
+                yield Operation(SWAP, j, j - dist)
+                j -= dist
+        dist //= 2
+
+
+def _insertion_range(nums: list, start: int, end: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the hybrid sorts, sorts the sub-array with the insertion sort
+
+    :param nums: the array to sort
+    :param start: the first index of sub-array
+    :param end: the last index of sub-array
+    """
+    for i in range(start + 1, end + 1):
+        j = i - 1
+        while j >= start:
+            yield Operation(COMPARE, j, j + 1)
+            if nums[j] <= nums[j + 1]:
+                break
+            nums[j + 1], nums[j] = nums[j], nums[j + 1]
+            yield Operation(SWAP, j, j + 1)
+            j -= 1
+
+
+def _heap_range(nums: list, start: int, end: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the hybrid sorts, sorts the sub-array with the heap sort, the fallback keeping them
+    O(n log n)
+
+    :param nums: the array to sort
+    :param start: the first index of sub-array
+    :param end: the last index of sub-array
+    """
+    n = end - start + 1
+    for i in range(n // 2 - 1, -1, -1):
+        yield from _sift_down(nums, start, i, n)
+    for last in range(n - 1, 0, -1):
+        yield from _swap(nums, start, start + last)
+        yield from _sift_down(nums, start, 0, last)
+
+
+def _sort3(nums: list, a: int, b: int, c: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the hybrid sorts, orders the three numbers, so the median ends up at the index b
+
+    :param nums: the array
+    :param a: index of the number to become the smallest
+    :param b: index of the number to become the median
+    :param c: index of the number to become the largest
+    """
+    yield Operation(COMPARE, b, a)
+    if nums[b] < nums[a]:
+        yield from _swap(nums, a, b)
+    yield Operation(COMPARE, c, b)
+    if nums[c] < nums[b]:
+        yield from _swap(nums, b, c)
+        yield Operation(COMPARE, b, a)
+        if nums[b] < nums[a]:
+            yield from _swap(nums, a, b)
+
+
+_INTRO_INSERTION_THRESHOLD = 16
+
+
+def intro_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the introsort algorithm, the quick sort with the median of three as the pivot, which
+    switches to the heap sort when the recursion gets deeper than 2 log n and to the insertion sort on short sub-arrays
+
+    :param nums: the array to sort
+    """
+    if len(nums) < 2:
+        return
+    stack = [(0, len(nums) - 1, 2 * (len(nums).bit_length() - 1))]
+    yield Operation(ALLOC, 1)
+    while stack:
+        start, end, depth = stack.pop()
+        yield Operation(FREE, 1)
+        if end - start < _INTRO_INSERTION_THRESHOLD:
+            yield from _insertion_range(nums, start, end)
+            continue
+        if not depth:
+            yield from _heap_range(nums, start, end)
+            continue
+        mid = (start + end) // 2
+        yield from _sort3(nums, start, mid, end)
+        yield from _swap(nums, mid, end)
+        pivot_index = yield from _partition(nums, start, end)
+        stack.append((start, pivot_index - 1, depth - 1))
+        stack.append((pivot_index + 1, end, depth - 1))
+        yield Operation(ALLOC, 2)
+
+
+_PDQ_INSERTION_THRESHOLD = 24
+_PDQ_NINTHER_THRESHOLD = 128
+_PDQ_PARTIAL_INSERTION_LIMIT = 8
+
+
+def _pdq_partition_right(nums: list, begin: int, end: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the pdqsort algorithm, partitions the sub-array around the pivot at its beginning, the
+    numbers equal to the pivot go to the right
+
+    :param nums: the array to partition
+    :param begin: the first index of sub-array, holding the pivot
+    :param end: the index past the last one of sub-array
+    :return: the correct index of pivot and whether the sub-array was already partitioned
+    """
+    pivot = nums[begin]
+    first = begin + 1
+    last = end - 1
+    while True:
+        yield Operation(COMPARE, first, begin)
+        if not nums[first] < pivot:
+            break
+        first += 1
+    if first - 1 == begin:
+        while first < last:
+            yield Operation(COMPARE, last, begin)
+            if nums[last] < pivot:
+                break
+            last -= 1
+    else:
+        while True:
+            yield Operation(COMPARE, last, begin)
+            if nums[last] < pivot:
+                break
+            last -= 1
+    already_partitioned = first >= last
+    while first < last:
+        yield from _swap(nums, first, last)
+        first += 1
+        while True:
+            yield Operation(COMPARE, first, begin)
+            if not nums[first] < pivot:
+                break
+            first += 1
+        last -= 1
+        while True:
+            yield Operation(COMPARE, last, begin)
+            if nums[last] < pivot:
+                break
+            last -= 1
+    pivot_index = first - 1
+    yield from _swap(nums, begin, pivot_index)
+    return pivot_index, already_partitioned
+
+
+def _pdq_partition_left(nums: list, begin: int, end: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the pdqsort algorithm, partitions the sub-array around the pivot at its beginning, the
+    numbers equal to the pivot go to the left, so a run of equal numbers is done in a single pass
+
+    :param nums: the array to partition
+    :param begin: the first index of sub-array, holding the pivot
+    :param end: the index past the last one of sub-array
+    :return: the correct index of pivot
+    """
+    pivot = nums[begin]
+    first = begin
+    last = end - 1
+    while True:
+        yield Operation(COMPARE, begin, last)
+        if not pivot < nums[last]:
+            break
+        last -= 1
+    if last + 1 == end:
+        while first < last:
+            first += 1
+            yield Operation(COMPARE, begin, first)
+            if pivot < nums[first]:
+                break
+    else:
+        while True:
+            first += 1
+            yield Operation(COMPARE, begin, first)
+            if pivot < nums[first]:
+                break
+    while first < last:
+        yield from _swap(nums, first, last)
+        while True:
+            last -= 1
+            yield Operation(COMPARE, begin, last)
+            if not pivot < nums[last]:
+                break
+        while True:
+            first += 1
+            yield Operation(COMPARE, begin, first)
+            if pivot < nums[first]:
+                break
+    yield from _swap(nums, begin, last)
+    return last
+
+
+def _pdq_partial_insertion(nums: list, begin: int, end: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the pdqsort algorithm, attempts the insertion sort on the sub-array and gives up once more
+    than a few numbers were moved
+
+    :param nums: the array to sort
+    :param begin: the first index of sub-array
+    :param end: the index past the last one of sub-array
+    :return: True if the sub-array got sorted, False otherwise
+    """
+    moved = 0
+    for i in range(begin + 1, end):
+        j = i
+        while j > begin:
+            yield Operation(COMPARE, j - 1, j)
+            if nums[j - 1] <= nums[j]:
+                break
+            nums[j - 1], nums[j] = nums[j], nums[j - 1]
+            yield Operation(SWAP, j - 1, j)
+            j -= 1
+        moved += i - j
+        if moved > _PDQ_PARTIAL_INSERTION_LIMIT:
+            return False
+    return True
+
+
+def _pdq_loop(nums: list, begin: int, end: int, bad_allowed: int, leftmost: bool) -> Iterator[Operation]:
+    """
+    Auxiliary function for the pdqsort algorithm, sorts the sub-array, recursing into the left part and looping on the
+    right one
+
+    :param nums: the array to sort
+    :param begin: the first index of sub-array
+    :param end: the index past the last one of sub-array
+    :param bad_allowed: the number of the highly unbalanced partitions left before switching to the heap sort
+    :param leftmost: whether the sub-array starts the array, otherwise the number before it is a previous pivot
+    """
+    while True:
+        size = end - begin
+        if size < _PDQ_INSERTION_THRESHOLD:
+            yield from _insertion_range(nums, begin, end - 1)
+            return
+        mid = begin + size // 2
+        if size > _PDQ_NINTHER_THRESHOLD:
+            yield from _sort3(nums, begin, mid, end - 1)
+            yield from _sort3(nums, begin + 1, mid - 1, end - 2)
+            yield from _sort3(nums, begin + 2, mid + 1, end - 3)
+            yield from _sort3(nums, mid - 1, mid, mid + 1)
+            yield from _swap(nums, begin, mid)
+        else:
+            yield from _sort3(nums, mid, begin, end - 1)
+
+        # the pivot equal to the previous pivot means the sub-array starts with equal numbers, they are skipped at once
+        if not leftmost:
+            yield Operation(COMPARE, begin - 1, begin)
+            if not nums[begin - 1] < nums[begin]:
+                begin = (yield from _pdq_partition_left(nums, begin, end)) + 1
+                continue
+
+        pivot_index, already_partitioned = yield from _pdq_partition_right(nums, begin, end)
+        l_size = pivot_index - begin
+        r_size = end - pivot_index - 1
+        if l_size < size // 8 or r_size < size // 8:
+            bad_allowed -= 1
+            if not bad_allowed:
+                yield from _heap_range(nums, begin, end - 1)
+                return
+            # breaking the patterns which caused the bad partition
+            if l_size >= _PDQ_INSERTION_THRESHOLD:
+                yield from _swap(nums, begin, begin + l_size // 4)
+                yield from _swap(nums, pivot_index - 1, pivot_index - l_size // 4)
+            if r_size >= _PDQ_INSERTION_THRESHOLD:
+                yield from _swap(nums, pivot_index + 1, pivot_index + 1 + r_size // 4)
+                yield from _swap(nums, end - 1, end - r_size // 4)
+        elif already_partitioned:
+            if ((yield from _pdq_partial_insertion(nums, begin, pivot_index))
+                    and (yield from _pdq_partial_insertion(nums, pivot_index + 1, end))):
+                return
+
+        yield from _pdq_loop(nums, begin, pivot_index, bad_allowed, leftmost)
+        begin = pivot_index + 1
+        leftmost = False
+
+
+def pdq_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the pattern-defeating quick sort algorithm, which detects the already partitioned
+    sub-arrays and the runs of equal numbers, and breaks the patterns causing bad partitions
+
+    :param nums: the array to sort
+    """
+    if len(nums) < 2:
+        return
+    yield from _pdq_loop(nums, 0, len(nums), len(nums).bit_length() - 1, True)
+
+
+_MIN_GALLOP = 7
+
+
+def _gallop(values: list, key: int, lo: int, hi: int, right: bool, from_end: bool, key_i: int,
+            base: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the Timsort algorithm, finds the position of the key in the sorted values with the
+    exponential search from one end followed by the binary search
+
+    :param values: the sorted values, the array or the temporary copy of a run
+    :param key: the searched number
+    :param lo: the first index of the searched range
+    :param hi: the index past the last one of the searched range
+    :param right: True to return the position past the values equal to the key, False for the one before them
+    :param from_end: True to search from the end of the range, False from its beginning
+    :param key_i: the index of the key within the array, shown in the comparisons
+    :param base: the index of the values' beginning within the array, shown in the comparisons
+    :return: the number of the values before the key plus lo
+    """
+    a, b = lo, hi
+    ofs = 1
+    if not from_end:
+        while lo + ofs - 1 < hi:
+            probe = lo + ofs - 1
+            yield Operation(COMPARE, key_i, base + probe)
+            if values[probe] <= key if right else values[probe] < key:
+                a = probe + 1
+                ofs *= 2
+            else:
+                b = probe
+                break
+    else:
+        while hi - ofs >= lo:
+            probe = hi - ofs
+            yield Operation(COMPARE, key_i, base + probe)
+            if values[probe] <= key if right else values[probe] < key:
+                a = probe + 1
+                break
+            b = probe
+            ofs *= 2
+    while a < b:
+        probe = (a + b) // 2
+        yield Operation(COMPARE, key_i, base + probe)
+        if values[probe] <= key if right else values[probe] < key:
+            a = probe + 1
+        else:
+            b = probe
+    return a
+
+
+def _merge_lo(nums: list, a: int, len_a: int, len_b: int, state: list) -> Iterator[Operation]:
+    """
+    Auxiliary function for the Timsort algorithm, merges two adjacent runs from the left, the shorter left run is
+    copied to the temporary array
+
+    :param nums: the array holding the runs
+    :param a: the first index of the left run
+    :param len_a: the length of the left run
+    :param len_b: the length of the right run
+    :param state: the single-item list holding the adaptive galloping threshold
+    """
+    tmp = nums[a:a + len_a]
+    yield Operation(ALLOC, len_a)
+    i, j, k = 0, a + len_a, a
+    end_b = j + len_b
+    min_gallop = state[0]
+    while i < len_a and j < end_b:
+        count_a = count_b = 0
+        while i < len_a and j < end_b and count_a < min_gallop and count_b < min_gallop:
+            yield Operation(COMPARE, j, k)
+            if nums[j] < tmp[i]:
+                nums[k] = nums[j]
+                j += 1
+                count_a, count_b = 0, count_b + 1
+            else:
+                nums[k] = tmp[i]
+                i += 1
+                count_a, count_b = count_a + 1, 0
+            yield Operation(WRITE, k, nums[k])
+            k += 1
+        # galloping, one run wins repeatedly, so its numbers are copied in bulk
+        while i < len_a and j < end_b:
+            p = yield from _gallop(tmp, nums[j], i, len_a, True, False, j, a)
+            count_a = p - i
+            for x in range(i, p):
+                nums[k] = tmp[x]
+                yield Operation(WRITE, k, nums[k])
+                k += 1
+            i = p
+            if i == len_a:
+                break
+            nums[k] = nums[j]
+            yield Operation(WRITE, k, nums[k])
+            k += 1
+            j += 1
+            if j == end_b:
+                break
+            p = yield from _gallop(nums, tmp[i], j, end_b, False, False, k, 0)
+            count_b = p - j
+            for x in range(j, p):
+                nums[k] = nums[x]
+                yield Operation(WRITE, k, nums[k])
+                k += 1
+            j = p
+            if j == end_b:
+                break
+            nums[k] = tmp[i]
+            yield Operation(WRITE, k, nums[k])
+            k += 1
+            i += 1
+            min_gallop = max(min_gallop - 1, 1)
+            if count_a < _MIN_GALLOP and count_b < _MIN_GALLOP:
+                break
+        min_gallop += 1
+    while i < len_a:
+        nums[k] = tmp[i]
+        yield Operation(WRITE, k, nums[k])
+        i += 1
+        k += 1
+    state[0] = min_gallop
+    yield Operation(FREE, len_a)
+
+
+def _merge_hi(nums: list, a: int, len_a: int, len_b: int, state: list) -> Iterator[Operation]:
+    """
+    Auxiliary function for the Timsort algorithm, merges two adjacent runs from the right, the shorter right run is
+    copied to the temporary array
+
+    :param nums: the array holding the runs
+    :param a: the first index of the left run
+    :param len_a: the length of the left run
+    :param len_b: the length of the right run
+    :param state: the single-item list holding the adaptive galloping threshold
+    """
+    b = a + len_a
+    tmp = nums[b:b + len_b]
+    yield Operation(ALLOC, len_b)
+    i, j, k = len_b - 1, b - 1, b + len_b - 1
+    min_gallop = state[0]
+    while i >= 0 and j >= a:
+        count_a = count_b = 0
+        while i >= 0 and j >= a and count_a < min_gallop and count_b < min_gallop:
+            yield Operation(COMPARE, j, k)
+            if tmp[i] < nums[j]:
+                nums[k] = nums[j]
+                j -= 1
+                count_a, count_b = count_a + 1, 0
+            else:
+                nums[k] = tmp[i]
+                i -= 1
+                count_a, count_b = 0, count_b + 1
+            yield Operation(WRITE, k, nums[k])
+            k -= 1
+        # galloping, one run wins repeatedly, so its numbers are copied in bulk
+        while i >= 0 and j >= a:
+            p = yield from _gallop(nums, tmp[i], a, j + 1, True, True, k, 0)
+            count_a = j + 1 - p
+            for x in range(j, p - 1, -1):
+                nums[k] = nums[x]
+                yield Operation(WRITE, k, nums[k])
+                k -= 1
+            j = p - 1
+            if j < a:
+                break
+            nums[k] = tmp[i]
+            yield Operation(WRITE, k, nums[k])
+            k -= 1
+            i -= 1
+            if i < 0:
+                break
+            p = yield from _gallop(tmp, nums[j], 0, i + 1, False, True, j, b)
+            count_b = i + 1 - p
+            for x in range(i, p - 1, -1):
+                nums[k] = tmp[x]
+                yield Operation(WRITE, k, nums[k])
+                k -= 1
+            i = p - 1
+            if i < 0:
+                break
+            nums[k] = nums[j]
+            yield Operation(WRITE, k, nums[k])
+            k -= 1
+            j -= 1
+            min_gallop = max(min_gallop - 1, 1)
+            if count_a < _MIN_GALLOP and count_b < _MIN_GALLOP:
+                break
+        min_gallop += 1
+    while i >= 0:
+        nums[k] = tmp[i]
+        yield Operation(WRITE, k, nums[k])
+        i -= 1
+        k -= 1
+    state[0] = min_gallop
+    yield Operation(FREE, len_b)
+
+
+def _merge_at(nums: list, runs: list, index: int, state: list) -> Iterator[Operation]:
+    """
+    Auxiliary function for the Timsort algorithm, merges the run on the stack with the next one, the numbers already
+    in place at both ends are skipped
+
+    :param nums: the array holding the runs
+    :param runs: the stack of the runs' starting indices and lengths
+    :param index: the index of the left run on the stack
+    :param state: the single-item list holding the adaptive galloping threshold
+    """
+    a, len_a = runs[index]
+    b, len_b = runs[index + 1]
+    runs[index] = (a, len_a + len_b)
+    del runs[index + 1]
+    yield Operation(FREE, 1)
+    p = yield from _gallop(nums, nums[b], a, b, True, False, b, 0)
+    len_a -= p - a
+    a = p
+    if not len_a:
+        return
+    p = yield from _gallop(nums, nums[b - 1], b, b + len_b, False, True, b - 1, 0)
+    len_b = p - b
+    if not len_b:
+        return
+    if len_a <= len_b:
+        yield from _merge_lo(nums, a, len_a, len_b, state)
+    else:
+        yield from _merge_hi(nums, a, len_a, len_b, state)
+
+
+def _count_run(nums: list, lo: int, hi: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the Timsort algorithm, finds the length of the run starting at lo, a strictly descending run
+    is reversed
+
+    :param nums: the array
+    :param lo: the first index of the run
+    :param hi: the index past the last one of the array
+    :return: the length of the run
+    """
+    end = lo + 1
+    if end == hi:
+        return 1
+    yield Operation(COMPARE, end, lo)
+    descending = nums[end] < nums[lo]
+    end += 1
+    while end < hi:
+        yield Operation(COMPARE, end, end - 1)
+        if (nums[end] < nums[end - 1]) != descending:
+            break
+        end += 1
+    if descending:
+        for i in range((end - lo) // 2):
+            yield from _swap(nums, lo + i, end - 1 - i)
+    return end - lo
+
+
+def _binary_insertion(nums: list, lo: int, hi: int, start: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the Timsort algorithm, extends the sorted beginning of the sub-array with the insertion sort,
+    the positions are found with the binary search
+
+    :param nums: the array
+    :param lo: the first index of sub-array
+    :param hi: the index past the last one of sub-array
+    :param start: the index of the first number not sorted yet
+    """
+    for i in range(start, hi):
+        num = nums[i]
+        left, right = lo, i
+        while left < right:
+            mid = (left + right) // 2
+            yield Operation(COMPARE, i, mid)
+            if num < nums[mid]:
+                right = mid
+            else:
+                left = mid + 1
+        for j in range(i, left, -1):
+            nums[j] = nums[j - 1]
+            yield Operation(WRITE, j, nums[j])
+        if left != i:
+            nums[left] = num
+            yield Operation(WRITE, left, num)
+
+
+def tim_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the Timsort algorithm, the natural runs are extended to the minimal run length with
+    the binary insertion sort and merged with galloping, keeping the lengths on the run stack balanced
+
+    :param nums: the array to sort
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    min_run, rest = n, 0
+    while min_run >= 64:
+        rest |= min_run & 1
+        min_run >>= 1
+    min_run += rest
+    runs = []
+    state = [_MIN_GALLOP]
+    lo = 0
+    while lo < n:
+        length = yield from _count_run(nums, lo, n)
+        if length < min_run:
+            forced = min(min_run, n - lo)
+            yield from _binary_insertion(nums, lo, lo + forced, lo + length)
+            length = forced
+        runs.append((lo, length))
+        yield Operation(ALLOC, 1)
+        lo += length
+        # the lengths on the stack must stay decreasing faster than the Fibonacci numbers
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]
+                    or i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            yield from _merge_at(nums, runs, i, state)
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        yield from _merge_at(nums, runs, i, state)
+    yield Operation(FREE, 1)
+
+
+def _natural_runs(nums: list) -> Iterator[Operation]:
+    """
+    Auxiliary function for the natural merge sorts, splits the array into the ascending runs, the strictly descending
+    runs are reversed
+
+    :param nums: the array
+    :return: the starting indices of the runs followed by the length of the array
+    """
+    bounds = [0]
+    while bounds[-1] < len(nums):
+        length = yield from _count_run(nums, bounds[-1], len(nums))
+        bounds.append(bounds[-1] + length)
+    return bounds
+
+
+def _merge_into(src: list, dst: list, lo: int, mid: int, hi: int, nums: list) -> Iterator[Operation]:
+    """
+    Auxiliary function for the ping-pong merge sort, merges two adjacent runs of the source into the destination at the
+    same indices, only the writes into the sorted array are yielded
+
+    :param src: the array holding the runs
+    :param dst: the array to merge into
+    :param lo: the first index of the left run
+    :param mid: the first index of the right run
+    :param hi: the index past the last one of the right run
+    :param nums: the sorted array
+    """
+    visible = dst is nums
+    i, j = lo, mid
+    for k in range(lo, hi):
+        if j == hi:
+            dst[k] = src[i]
+            i += 1
+        elif i == mid:
+            dst[k] = src[j]
+            j += 1
+        else:
+            yield Operation(COMPARE, i, j)
+            if src[i] <= src[j]:
+                dst[k] = src[i]
+                i += 1
+            else:
+                dst[k] = src[j]
+                j += 1
+        if visible:
+            yield Operation(WRITE, k, dst[k])
+
+
+def ping_pong_merge_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the natural merge sort with a single auxiliary buffer, the existing runs are merged
+    pairwise and the array and the buffer swap the source and destination roles on every pass, so nothing is allocated
+    in the merge loop
+
+    :param nums: the array to sort
+    """
+    bounds = yield from _natural_runs(nums)
+    if len(bounds) <= 2:
+        return
+    buf = [0] * len(nums)
+    aux_memory = len(buf) + len(bounds)
+    yield Operation(ALLOC, aux_memory)
+    src, dst = nums, buf
+    while len(bounds) > 2:
+        merged = 0
+        for r in range(0, len(bounds) - 1, 2):
+            lo = bounds[r]
+            if r + 2 < len(bounds):
+                yield from _merge_into(src, dst, lo, bounds[r + 1], bounds[r + 2], nums)
+            else:
+                # the odd run out is copied to stay in the same array as the others
+                yield from _merge_into(src, dst, lo, bounds[r + 1], bounds[r + 1], nums)
+            bounds[merged] = lo
+            merged += 1
+        bounds[merged] = len(nums)
+        del bounds[merged + 1:]
+        src, dst = dst, src
+    if src is buf:
+        for i, num in enumerate(buf):
+            nums[i] = num
+            yield Operation(WRITE, i, num)
+    yield Operation(FREE, aux_memory)
+
+
+def _sift_runs(nums: list, heap: list, positions: list, parent_i: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the k-way merge sort, moves the run down the min heap of the runs ordered by their current
+    numbers, the earlier run goes first on a tie to keep the sort stable
+
+    :param nums: the array holding the runs
+    :param heap: the heap of the runs' indices
+    :param positions: the indices of the runs' current numbers
+    :param parent_i: index of the moved node within the heap
+    """
+    n = len(heap)
+    while True:
+        smallest_i = parent_i
+        smallest = heap[parent_i]
+        child_i = 2 * parent_i + 1
+        end = min(child_i + 2, n)
+        while child_i < end:
+            child = heap[child_i]
+            yield Operation(COMPARE, positions[child], positions[smallest])
+            child_num, smallest_num = nums[positions[child]], nums[positions[smallest]]
+            # compared without building (number, run) tuples, the heap is sifted for every merged number
+            if child_num < smallest_num or child_num == smallest_num and child < smallest:
+                smallest_i = child_i
+                smallest = child
+            child_i += 1
+        if smallest_i == parent_i:
+            return
+        heap[parent_i], heap[smallest_i] = heap[smallest_i], heap[parent_i]
+        parent_i = smallest_i
+
+
+def k_way_merge_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the natural merge sort merging all runs in a single pass, the run with the smallest
+    current number is taken from a min heap
+
+    :param nums: the array to sort
+    """
+    bounds = yield from _natural_runs(nums)
+    runs = len(bounds) - 1
+    if runs <= 1:
+        return
+    buf = [0] * len(nums)
+    positions = bounds[:-1]
+    heap = list(range(runs))
+    aux_memory = len(buf) + len(bounds) + len(positions) + len(heap)
+    yield Operation(ALLOC, aux_memory)
+    for i in range(runs // 2 - 1, -1, -1):
+        yield from _sift_runs(nums, heap, positions, i)
+    for k in range(len(nums)):
+        run = heap[0]
+        buf[k] = nums[positions[run]]
+        positions[run] += 1
+        if positions[run] == bounds[run + 1]:
+            heap[0] = heap[-1]
+            heap.pop()
+        if heap:
+            yield from _sift_runs(nums, heap, positions, 0)
+    for i, num in enumerate(buf):
+        nums[i] = num
+        yield Operation(WRITE, i, num)
+    yield Operation(FREE, aux_memory)
+
+
+def _reverse(nums: list, lo: int, hi: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the in-place merge sorts, reverses the sub-array
+
+    :param nums: the array
+    :param lo: the first index of sub-array
+    :param hi: the index past the last one of sub-array
+    """
+    hi -= 1
+    while lo < hi:
+        nums[lo], nums[hi] = nums[hi], nums[lo]
+        yield Operation(SWAP, lo, hi)
+        lo += 1
+        hi -= 1
+
+
+def _rotate(nums: list, lo: int, mid: int, hi: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the in-place merge sorts, moves the sub-array [mid, hi) in front of [lo, mid) by three
+    reversals
+
+    :param nums: the array
+    :param lo: the first index of the left sub-array
+    :param mid: the first index of the right sub-array
+    :param hi: the index past the last one of the right sub-array
+    """
+    if lo == mid or mid == hi:
+        return
+    yield from _reverse(nums, lo, mid)
+    yield from _reverse(nums, mid, hi)
+    yield from _reverse(nums, lo, hi)
+
+
+def _rotation_merge(nums: list, lo: int, mid: int, hi: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the in-place merge sorts, merges two adjacent sorted sub-arrays without a buffer. The longer
+    one is cut in half, the other one at the matching position, the inner parts are swapped by a rotation and both
+    halves are merged the same way; the shorter one recursively, so the stack stays O(log n) deep
+
+    :param nums: the array
+    :param lo: the first index of the left sub-array
+    :param mid: the first index of the right sub-array
+    :param hi: the index past the last one of the right sub-array
+    """
+    while lo < mid < hi:
+        if hi - lo == 2:
+            yield Operation(COMPARE, mid, lo)
+            if nums[mid] < nums[lo]:
+                yield from _swap(nums, lo, mid)
+            return
+        if mid - lo >= hi - mid:
+            cut_l = lo + (mid - lo) // 2
+            cut_r = yield from _gallop(nums, nums[cut_l], mid, hi, False, False, cut_l, 0)
+        else:
+            cut_r = mid + (hi - mid) // 2
+            cut_l = yield from _gallop(nums, nums[cut_r], lo, mid, True, False, cut_r, 0)
+        yield from _rotate(nums, cut_l, mid, cut_r)
+        new_mid = cut_l + cut_r - mid
+        yield Operation(ALLOC, 1)  # the stack frame of the recursion
+        if new_mid - lo <= hi - new_mid:
+            yield from _rotation_merge(nums, lo, cut_l, new_mid)
+            lo, mid = new_mid, cut_r
+        else:
+            yield from _rotation_merge(nums, new_mid, cut_r, hi)
+            mid, hi = cut_l, new_mid
+        yield Operation(FREE, 1)
+
+
+_IN_PLACE_INSERTION_RUN = 16
+
+
+def rotation_merge_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the stable in-place merge sort, the runs sorted by the insertion sort are merged
+    bottom-up by the rotation-based merge, which needs no buffer
+
+    :param nums: the array to sort
+    """
+    n = len(nums)
+    for start in range(0, n, _IN_PLACE_INSERTION_RUN):
+        yield from _insertion_range(nums, start, min(start + _IN_PLACE_INSERTION_RUN, n) - 1)
+    size = _IN_PLACE_INSERTION_RUN
+    while size < n:
+        for start in range(0, n - size, 2 * size):
+            mid, end = start + size, min(start + 2 * size, n)
+            yield Operation(COMPARE, mid - 1, mid)
+            if nums[mid - 1] > nums[mid]:
+                yield from _rotation_merge(nums, start, mid, end)
+        size *= 2
+
+
+def _swap_blocks(nums: list, a: int, b: int, count: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the block merge sort, swaps two non-overlapping blocks of the array
+
+    :param nums: the array
+    :param a: the first index of the first block
+    :param b: the first index of the second block
+    :param count: the length of the blocks
+    """
+    if a != b:
+        for i in range(count):
+            nums[a + i], nums[b + i] = nums[b + i], nums[a + i]
+            yield Operation(SWAP, a + i, b + i)
+
+
+def _extract_buffer(nums: list, lo: int, hi: int, count: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the block merge sort, moves the first occurrences of the given number of distinct values of
+    the sorted sub-array to its beginning, so they can tag the blocks of the merges
+
+    :param nums: the array
+    :param lo: the first index of sub-array
+    :param hi: the index past the last one of sub-array
+    :param count: the number of the distinct values to extract
+    :return: False if the sub-array has fewer distinct values and was left unchanged, True otherwise
+    """
+    i = lo
+    for _ in range(count - 1):
+        i = yield from _gallop(nums, nums[i], i + 1, hi, True, False, i, 0)
+        if i == hi:
+            return False
+    # the collected values are moved along as a block, the skipped duplicates are rotated in front of it
+    buf_start, buf_end = lo, lo + 1
+    while buf_end - buf_start < count:
+        i = yield from _gallop(nums, nums[buf_end - 1], buf_end, hi, True, False, buf_end - 1, 0)
+        yield from _rotate(nums, buf_start, buf_end, i)
+        buf_start, buf_end = i - (buf_end - buf_start), i + 1
+    yield from _rotate(nums, lo, buf_start, buf_end)
+    return True
+
+
+def _block_merge(nums: list, a0: int, a1: int, b1: int, tags: int) -> Iterator[Operation]:
+    """
+    Auxiliary function for the block merge sort, merges two adjacent sorted sub-arrays in place. The left one is split
+    into blocks of sqrt(n) numbers, which are rolled through the right one and dropped behind it in their original
+    order, known from the distinct tag values swapped into their first positions; every dropped block is merged only
+    with the right sub-array's numbers it passed
+
+    :param nums: the array
+    :param a0: the first index of the left sub-array
+    :param a1: the first index of the right sub-array
+    :param b1: the index past the last one of the right sub-array
+    :param tags: the first index of the ascending distinct values tagging the blocks
+    """
+    block_size = isqrt(a1 - a0)
+    first_end = a0 + (a1 - a0) % block_size  # the first, unevenly sized block is never moved
+    index_a = tags
+    for index in range(first_end, a1, block_size):
+        yield from _swap(nums, index_a, index)
+        index_a += 1
+    index_a = tags  # the real first value of the minimal block
+    last_a = (a0, first_end)
+    last_b = (a0, a0)
+    block_a = [first_end, a1]
+    block_b = (a1, min(a1 + block_size, b1))
+    min_a = first_end
+    while True:
+        drop = block_b[0] == block_b[1]
+        if not drop and last_b[1] > last_b[0]:
+            yield Operation(COMPARE, last_b[1] - 1, index_a)
+            drop = not nums[last_b[1] - 1] < nums[index_a]
+        if drop:
+            # the minimal block goes behind the previous right block, the part of it smaller than the block is merged
+            # with the previously dropped block
+            b_split = yield from _gallop(nums, nums[index_a], last_b[0], last_b[1], False, False, index_a, 0)
+            b_remaining = last_b[1] - b_split
+            yield from _swap_blocks(nums, block_a[0], min_a, block_size)
+            yield from _swap(nums, block_a[0], index_a)
+            index_a += 1
+            yield from _rotation_merge(nums, last_a[0], last_a[1], b_split)
+            yield from _rotate(nums, b_split, block_a[0], block_a[0] + block_size)
+            last_a = (block_a[0] - b_remaining, block_a[0] - b_remaining + block_size)
+            last_b = (last_a[1], last_a[1] + b_remaining)
+            block_a[0] += block_size
+            if block_a[0] == block_a[1]:
+                break
+            min_a = block_a[0]
+            for find_a in range(min_a + block_size, block_a[1] - 1, block_size):
+                yield Operation(COMPARE, find_a, min_a)
+                if nums[find_a] < nums[min_a]:
+                    min_a = find_a
+        elif block_b[1] - block_b[0] < block_size:
+            # the last, shorter right block is rotated in front of the remaining blocks
+            length = block_b[1] - block_b[0]
+            yield from _rotate(nums, block_a[0], block_b[0], block_b[1])
+            last_b = (block_a[0], block_a[0] + length)
+            block_a[0] += length
+            block_a[1] += length
+            min_a += length
+            block_b = (block_b[1], block_b[1])
+        else:
+            # the first block is rolled to the end by swapping it with the next right block
+            yield from _swap_blocks(nums, block_a[0], block_b[0], block_size)
+            last_b = (block_a[0], block_a[0] + block_size)
+            if min_a == block_a[0]:
+                min_a = block_a[1]
+            block_a[0] += block_size
+            block_a[1] += block_size
+            block_b = (block_b[0] + block_size, min(block_b[1] + block_size, b1))
+    yield from _rotation_merge(nums, last_a[0], last_a[1], b1)
+
+
+def block_merge_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the stable in-place block merge sort in the WikiSort style. On every level the
+    distinct values tagging the blocks are extracted from the first run, the runs are merged by the block merge and the
+    tags are merged back; a level without enough distinct values falls back to the rotation-based merge
+
+    :param nums: the array to sort
+    """
+    n = len(nums)
+    for start in range(0, n, _IN_PLACE_INSERTION_RUN):
+        yield from _insertion_range(nums, start, min(start + _IN_PLACE_INSERTION_RUN, n) - 1)
+    size = _IN_PLACE_INSERTION_RUN
+    while size < n:
+        tags = isqrt(size) + 3  # more than the number of the blocks of a run
+        tagged = yield from _extract_buffer(nums, 0, size, tags)
+        for start in range(0, n - size, 2 * size):
+            a0 = tags if tagged and not start else start
+            mid, end = start + size, min(start + 2 * size, n)
+            yield Operation(COMPARE, mid - 1, mid)
+            if nums[mid - 1] <= nums[mid]:
+                continue
+            yield Operation(COMPARE, end - 1, a0)
+            if nums[end - 1] < nums[a0]:
+                yield from _rotate(nums, a0, mid, end)
+            elif tagged:
+                yield from _block_merge(nums, a0, mid, end, 0)
+            else:
+                yield from _rotation_merge(nums, a0, mid, end)
+        if tagged:
+            yield from _rotation_merge(nums, 0, tags, min(2 * size, n))
+        size *= 2
+
+
+_DUAL_PIVOT_INSERTION_THRESHOLD = 27
+
+
+def dual_pivot_quick_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the Yaroslavskiy's dual-pivot quick sort algorithm, the array is split into three
+    parts by two pivots taken from the tertiles
+
+    :param nums: the array to sort
+    """
+    stack = [(0, len(nums) - 1)]
+    yield Operation(ALLOC, 1)
+    while stack:
+        left, right = stack.pop()
+        yield Operation(FREE, 1)
+        if right - left < _DUAL_PIVOT_INSERTION_THRESHOLD:
+            yield from _insertion_range(nums, left, right)
+            continue
+        third = (right - left) // 3
+        yield from _swap(nums, left, left + third)
+        yield from _swap(nums, right, right - third)
+        yield Operation(COMPARE, right, left)
+        if nums[right] < nums[left]:
+            yield from _swap(nums, left, right)
+        low_pivot, high_pivot = nums[left], nums[right]
+        lt = k = left + 1
+        gt = right - 1
+        while k <= gt:
+            yield Operation(COMPARE, k, left)
+            if nums[k] < low_pivot:
+                yield from _swap(nums, k, lt)
+                lt += 1
+            else:
+                yield Operation(COMPARE, k, right)
+                if nums[k] > high_pivot:
+                    while k < gt:
+                        yield Operation(COMPARE, gt, right)
+                        if nums[gt] <= high_pivot:
+                            break
+                        gt -= 1
+                    yield from _swap(nums, k, gt)
+                    gt -= 1
+                    yield Operation(COMPARE, k, left)
+                    if nums[k] < low_pivot:
+                        yield from _swap(nums, k, lt)
+                        lt += 1
+            k += 1
+        lt -= 1
+        gt += 1
+        yield from _swap(nums, left, lt)
+        yield from _swap(nums, right, gt)
+        stack.append((left, lt - 1))
+        stack.append((gt + 1, right))
+        yield Operation(ALLOC, 2)
+        # the middle part equals both pivots if they are equal
+        if low_pivot != high_pivot:
+            stack.append((lt + 1, gt - 1))
+            yield Operation(ALLOC, 1)
+
+
+_COUNTING_MIN_SPAN = 1 << 16  # the number of counters allowed regardless of the length of the array
+
+
+def counting_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the counting sort algorithm, the counters are kept in a list indexed by the numbers
+    shifted by the smallest one. The numbers spanning a range much wider than the array, where the counters would not
+    fit the memory, are sorted by the LSD radix sort with 8-bit digits instead
+
+    :param nums: the array of integers to sort
+    """
+    if not nums:
+        return
+    offset = min(nums)
+    span = max(nums) - offset + 1
+    if span > max(4 * len(nums), _COUNTING_MIN_SPAN):
+        yield from lsd_radix_sort(nums)
+        return
+    arr = nums[:]
+    counter = [0] * span
+    yield Operation(ALLOC, len(arr) + len(counter))
+    for num in arr:
+        counter[num - offset] += 1
+    for i in range(1, len(counter)):
+        counter[i] += counter[i - 1]
+    for num in reversed(arr):
+        counter[num - offset] -= 1
+        new_index = counter[num - offset]
+        nums[new_index] = num
+        yield Operation(WRITE, new_index, num)
+    yield Operation(FREE, len(arr) + len(counter))
+
+
+def radix_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the base 10 LSD radix sort algorithm, the counters and the output array are allocated
+    once and reused by every pass
+
+    :param nums: the array of integers to sort
+    """
+    if not nums:
+        return
+    offset = min(nums)
+    span = max(nums) - offset
+    counter = [0] * 10
+    sorted_arr = [0] * len(nums)
+    yield Operation(ALLOC, len(counter) + len(sorted_arr))
+    exp = 1
+    while span // exp > 0:
+        for i in range(10):
+            counter[i] = 0
+        for num in nums:
+            counter[(num - offset) // exp % 10] += 1
+        for i in range(1, 10):
+            counter[i] += counter[i - 1]
+        for num in reversed(nums):
+            digit = (num - offset) // exp % 10
+            counter[digit] -= 1
+            sorted_arr[counter[digit]] = num
+        for i, num in enumerate(sorted_arr):
+            nums[i] = num
+            yield Operation(WRITE, i, num)
+        exp *= 10
+    yield Operation(FREE, len(counter) + len(sorted_arr))
+
+
+def _prefix_sums(counts: list, start: int) -> int:
+    """
+    Auxiliary function for the distribution sorts, turns the counts of the digits into the starting indices of their
+    buckets in place
+
+    :param counts: the counts of the digits
+    :param start: the index of the first bucket
+    :return: the index past the last bucket
+    """
+    total = start
+    for digit, count in enumerate(counts):
+        counts[digit] = total
+        total += count
+    return total
+
+
+def lsd_radix_sort(nums: list, bits: int = 8) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the LSD radix sort algorithm with a power of two radix, the digits are extracted by
+    shifts and masks of the numbers offset by the smallest one, so negative numbers are sorted too. The array and a
+    single buffer swap the source and destination roles on every pass, and the passes where all numbers share the digit
+    are skipped
+
+    :param nums: the array of integers to sort
+    :param bits: the number of bits of a digit
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    offset = min(nums)
+    span = max(nums) - offset
+    mask = (1 << bits) - 1
+    counts = [0] * (mask + 1)
+    buf = [0] * n
+    yield Operation(ALLOC, len(counts) + n)
+    src, dst = nums, buf
+    shift = 0
+    while span >> shift:
+        for digit in range(len(counts)):
+            counts[digit] = 0
+        for num in src:
+            counts[(num - offset) >> shift & mask] += 1
+        if counts[(src[0] - offset) >> shift & mask] != n:
+            _prefix_sums(counts, 0)
+            visible = dst is nums
+            for num in src:
+                digit = (num - offset) >> shift & mask
+                index = counts[digit]
+                dst[index] = num
+                counts[digit] = index + 1
+                if visible:
+                    yield Operation(WRITE, index, num)
+            src, dst = dst, src
+        shift += bits
+    if src is buf:
+        for i, num in enumerate(buf):
+            nums[i] = num
+            yield Operation(WRITE, i, num)
+    yield Operation(FREE, len(counts) + n)
+
+
+_MSD_INSERTION_THRESHOLD = 32
+
+
+def _msd_setup(nums: list, bits: int) -> tuple:
+    """
+    Auxiliary function for the MSD radix sorts, finds the offset making the numbers non-negative and the shift of
+    their most significant digit
+
+    :param nums: the array of integers
+    :param bits: the number of bits of a digit
+    :return: the offset and the shift
+    """
+    offset = min(nums)
+    span = max(nums) - offset
+    return offset, max(span.bit_length() - 1, 0) // bits * bits
+
+
+def msd_radix_sort(nums: list, bits: int = 8) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the MSD radix sort algorithm, every bucket is distributed by the next digit through
+    a single buffer reused by all buckets, the short buckets are finished by the insertion sort
+
+    :param nums: the array of integers to sort
+    :param bits: the number of bits of a digit
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    offset, top_shift = _msd_setup(nums, bits)
+    mask = (1 << bits) - 1
+    counts = [0] * (mask + 1)
+    buf = [0] * n
+    yield Operation(ALLOC, len(counts) + n)
+    stack = [(0, n, top_shift)]
+    yield Operation(ALLOC, 1)
+    while stack:
+        lo, hi, shift = stack.pop()
+        yield Operation(FREE, 1)
+        if hi - lo <= _MSD_INSERTION_THRESHOLD:
+            yield from _insertion_range(nums, lo, hi - 1)
+            continue
+        for digit in range(len(counts)):
+            counts[digit] = 0
+        for i in range(lo, hi):
+            counts[(nums[i] - offset) >> shift & mask] += 1
+        if counts[(nums[lo] - offset) >> shift & mask] != hi - lo:
+            _prefix_sums(counts, lo)
+            for i in range(lo, hi):
+                digit = (nums[i] - offset) >> shift & mask
+                buf[counts[digit]] = nums[i]
+                counts[digit] += 1
+            for i in range(lo, hi):
+                nums[i] = buf[i]
+                yield Operation(WRITE, i, buf[i])
+        else:
+            counts[(nums[lo] - offset) >> shift & mask] = hi
+        if not shift:
+            continue
+        # after the distribution every counter holds the end of its bucket
+        start = lo
+        for end in counts:
+            if end > start + 1:
+                stack.append((start, end, shift - bits))
+                yield Operation(ALLOC, 1)
+            start = max(start, end)
+    yield Operation(FREE, len(counts) + n)
+
+
+def american_flag_sort(nums: list, bits: int = 8) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the American flag sort algorithm, the in-place MSD radix sort. The numbers of every
+    bucket are permuted into their sub-buckets by cycles of swaps, so only the counters are needed on top of the array
+
+    :param nums: the array of integers to sort
+    :param bits: the number of bits of a digit
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    offset, top_shift = _msd_setup(nums, bits)
+    mask = (1 << bits) - 1
+    ends = [0] * (mask + 1)
+    nexts = [0] * (mask + 1)
+    yield Operation(ALLOC, len(ends) + len(nexts))
+    stack = [(0, n, top_shift)]
+    yield Operation(ALLOC, 1)
+    while stack:
+        lo, hi, shift = stack.pop()
+        yield Operation(FREE, 1)
+        if hi - lo <= _MSD_INSERTION_THRESHOLD:
+            yield from _insertion_range(nums, lo, hi - 1)
+            continue
+        for digit in range(len(ends)):
+            ends[digit] = 0
+        for i in range(lo, hi):
+            ends[(nums[i] - offset) >> shift & mask] += 1
+        start = lo
+        for digit, count in enumerate(ends):
+            nexts[digit] = start
+            start += count
+            ends[digit] = start
+        for digit in range(len(ends)):
+            while nexts[digit] < ends[digit]:
+                i = nexts[digit]
+                target = (nums[i] - offset) >> shift & mask
+                if target == digit:
+                    nexts[digit] = i + 1
+                else:
+                    j = nexts[target]
+                    nums[i], nums[j] = nums[j], nums[i]
+                    yield Operation(SWAP, i, j)
+                    nexts[target] = j + 1
+        if not shift:
+            continue
+        start = lo
+        for end in ends:
+            if end > start + 1:
+                stack.append((start, end, shift - bits))
+                yield Operation(ALLOC, 1)
+            start = end
+    yield Operation(FREE, len(ends) + len(nexts))
+
+
+def bucket_sort(nums: list) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the bucket sort algorithm, the numbers are distributed into as many equally wide
+    buckets of the value range as there are numbers, then every bucket is sorted by the insertion sort
+
+    :param nums: the array of integers to sort
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    offset = min(nums)
+    width = max(nums) - offset + 1
+    counts = [0] * n
+    buf = [0] * n
+    yield Operation(ALLOC, 2 * n)
+    for num in nums:
+        counts[(num - offset) * n // width] += 1
+    _prefix_sums(counts, 0)
+    for num in nums:
+        bucket = (num - offset) * n // width
+        buf[counts[bucket]] = num
+        counts[bucket] += 1
+    for i, num in enumerate(buf):
+        nums[i] = num
+        yield Operation(WRITE, i, num)
+    start = 0
+    for end in counts:
+        if end > start + 1:
+            yield from _insertion_range(nums, start, end - 1)
+        start = max(start, end)
+    yield Operation(FREE, 2 * n)
+
+
+def _parallel(name: str) -> Callable[[list], Iterator[Operation]]:
+    """
+    Returns the parallel sorting algorithm of the given name, the parallel module is imported on the first run as it
+    imports this module
+
+    :param name: the name of the function in the parallel module
+    :return: the sorting algorithm
+    """
+    def sort(nums: list) -> Iterator[Operation]:
+        import parallel
+        yield from getattr(parallel, name)(nums)
+    return sort
+
+
+# sorting algorithms available in the visualizer, in the order they are cycled through
+ALGORITHMS: Dict[str, Callable[[list], Iterator[Operation]]] = {
+    'bubble': bubble_sort,
+    'insertion': insertion_sort,
+    'merge': merge_sort,
+    'selection': selection_sort,
+    'quick': quick_sort,
+    'heap': heap_sort,
+    'heap-4': partial(heap_sort, d=4),
+    'heap-8': partial(heap_sort, d=8),
+    'bottom-up': partial(heap_sort, bottom_up=True),
+    'counting': counting_sort,
+    'radix': radix_sort,
+    'shell': shell_sort,
+    'intro': intro_sort,
+    'pdq': pdq_sort,
+    'tim': tim_sort,
+    'dual-pivot': dual_pivot_quick_sort,
+    'ping-pong': ping_pong_merge_sort,
+    'k-way': k_way_merge_sort,
+    'rotation': rotation_merge_sort,
+    'block-merge': block_merge_sort,
+    'radix-8': lsd_radix_sort,
+    'radix-11': partial(lsd_radix_sort, bits=11),
+    'radix-16': partial(lsd_radix_sort, bits=16),
+    'msd-radix': msd_radix_sort,
+    'american-flag': american_flag_sort,
+    'bucket': bucket_sort,
+    'bitonic': _parallel('bitonic_sort'),
+    'odd-even': _parallel('odd_even_merge_sort'),
+    'parallel-merge': _parallel('parallel_merge_sort'),
+    'sample': _parallel('sample_sort'),
+}
+
+
+def run(name: str, nums: list) -> list:
+    """
+    Runs the sorting algorithm headless, at full speed, without consuming the operations
+
+    :param name: the name of the algorithm
+    :param nums: the array to sort in place
+    :return: the sorted array
+    """
+    deque(ALGORITHMS[name](nums), maxlen=0)
+    return nums
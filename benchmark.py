@@ -0,0 +1,208 @@
+"""
+Headless benchmark of the sorting algorithms. Runs every algorithm on the chosen input sizes, distributions and seeds
+under the SDL dummy video driver and prints the results as JSON, so the output of two runs can be diffed.
+
+Usage: python benchmark.py --sizes 100 600 --distributions random sorted --seeds 0 1 --render -o results.json
+       python benchmark.py --render --full-redraw
+       python benchmark.py --algorithms --startup 20
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from array import array
+from time import perf_counter
+
+import pygame as pg
+
+from algorithms import ALGORITHMS
+from counters import Counters
+from profiler import percentile
+from workloads import DISTRIBUTIONS, generate
+
+BASELINE = 'sorted'
+# the launch timed by the startup benchmark, prints the import time and the visualizer's creation time in seconds
+STARTUP_CODE = ('from time import perf_counter; start = perf_counter(); import sorting_visualizer; '
+                'imported = perf_counter(); sorting_visualizer.Visualizer(); '
+                'print(imported - start, perf_counter() - imported)')
+
+
+def bench_algorithm(name: str, nums: list) -> dict:
+    """
+    Runs the sorting algorithm headless, timing every step
+
+    :param name: the name of the algorithm
+    :param nums: the numbers to sort, the list is left unchanged
+    :return: the measured statistics
+    """
+    work = nums[:]
+    step_times = array('d')
+    counters = Counters()
+    steps = ALGORITHMS[name](work)
+    start = previous = perf_counter()
+    for op in steps:
+        now = perf_counter()
+        step_times.append(now - previous)
+        previous = now
+        counters.count(op)
+    wall_time = perf_counter() - start
+    if work != sorted(nums):
+        raise AssertionError(f'{name} sort returned an unsorted array')
+    ops = len(step_times)
+    ordered = sorted(step_times)
+    return {
+        'wall_time': wall_time,
+        'ops': ops,
+        'ops_per_sec': ops / wall_time if wall_time else 0.0,
+        'comparisons': counters.comparisons,
+        'swaps': counters.swaps,
+        'writes': counters.writes,
+        'allocations': counters.allocations,
+        'peak_aux_memory': counters.peak_aux_memory,
+        'step_mean': wall_time / ops if ops else 0.0,
+        'step_p99': percentile(ordered, 0.99),
+    }
+
+
+def bench_baseline(nums: list) -> dict:
+    """
+    Times Python's built-in sorted on the numbers
+
+    :param nums: the numbers to sort
+    :return: the measured statistics
+    """
+    start = perf_counter()
+    sorted(nums)
+    return {'wall_time': perf_counter() - start}
+
+
+def bench_render(visualizer, name: str, nums: list, ops_per_frame: int) -> dict:
+    """
+    Sorts the numbers through the visualizer's rendering path
+
+    :param visualizer: the headless Visualizer to render with
+    :param name: the name of the algorithm
+    :param nums: the numbers to sort, the list is left unchanged
+    :param ops_per_frame: the number of operations rendered per frame
+    :return: the measured statistics
+    """
+    start = perf_counter()
+    frames = visualizer.run_headless(name, nums[:], ops_per_frame)
+    render_time = perf_counter() - start
+    return {
+        'frames': frames,
+        'render_time': render_time,
+        'frame_mean': render_time / frames if frames else 0.0,
+    }
+
+
+def bench_startup(runs: int) -> dict:
+    """
+    Times the launches of fresh interpreters importing the visualizer and creating it headless, the way the scripted
+    headless runs start
+
+    :param runs: the number of the launches
+    :return: the percentiles of the launch, import and creation times
+    """
+    env = dict(os.environ, SDL_VIDEODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+    launches, imports, creations = [], [], []
+    for _ in range(runs):
+        start = perf_counter()
+        output = subprocess.run([sys.executable, '-c', STARTUP_CODE], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                env=env, capture_output=True, text=True, check=True).stdout
+        launches.append(perf_counter() - start)
+        import_time, creation_time = map(float, output.split()[-2:])
+        imports.append(import_time)
+        creations.append(creation_time)
+    result = {'runs': runs}
+    for key, times in (('launch', launches), ('import', imports), ('create', creations)):
+        times.sort()
+        result[f'{key}_p50'] = percentile(times, 0.5)
+        result[f'{key}_max'] = percentile(times, 1.0)
+    return result
+
+
+def run_benchmarks(algorithms: list, sizes: list, distributions: list, seeds: list, render: bool = False,
+                   ops_per_frame: int = 10, backend: str = 'pygame', incremental: bool = True) -> dict:
+    """
+    Runs all combinations of the given benchmark parameters
+
+    :param algorithms: names of the algorithms to run, BASELINE for the built-in sorted
+    :param sizes: lengths of the inputs
+    :param distributions: shapes of the inputs
+    :param seeds: seeds of the inputs
+    :param render: if the algorithms have to be run through the rendering path too
+    :param ops_per_frame: the number of operations rendered per frame
+    :param backend: the drawing backend of the visualizer
+    :param incremental: if the visualizer redraws only the changed areas, otherwise the whole screen every frame
+    :return: the report with the environment description and the results
+    """
+    visualizer = None
+    if render:
+        from sorting_visualizer import Visualizer
+        # the cached traces would skip the algorithms
+        visualizer = Visualizer(backend=backend, trace_cache_size=0, incremental=incremental)
+    results = []
+    for n in sizes:
+        for distribution in distributions:
+            for seed in seeds:
+                nums = generate(distribution, n, seed).tolist()
+                for name in algorithms:
+                    result = {'algorithm': name, 'n': n, 'distribution': distribution, 'seed': seed}
+                    if name == BASELINE:
+                        result.update(bench_baseline(nums))
+                    else:
+                        result.update(bench_algorithm(name, nums))
+                        if visualizer:
+                            result.update(bench_render(visualizer, name, nums, ops_per_frame))
+                    results.append(result)
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'pygame': pg.version.ver,
+            'platform': platform.platform(),
+            'ops_per_frame': ops_per_frame if render else None,
+            'backend': backend if render else None,
+            'incremental': incremental if render else None,
+        },
+        'results': results,
+    }
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Headless benchmark of the sorting algorithms')
+    parser.add_argument('--algorithms', nargs='*', default=[*ALGORITHMS, BASELINE],
+                        choices=[*ALGORITHMS, BASELINE])
+    parser.add_argument('--sizes', nargs='+', type=int, default=[100, 600])
+    parser.add_argument('--distributions', nargs='+', default=['random'], choices=list(DISTRIBUTIONS))
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0])
+    parser.add_argument('--render', action='store_true', help='also run the algorithms through the render path')
+    parser.add_argument('--ops-per-frame', type=int, default=10)
+    parser.add_argument('--backend', choices=['pygame', 'numpy'], default='pygame')
+    parser.add_argument('--full-redraw', action='store_true',
+                        help='render with the whole screen redrawn every frame instead of the changed areas')
+    parser.add_argument('--startup', type=int, default=0, metavar='RUNS',
+                        help='also time the given number of launches of the visualizer')
+    parser.add_argument('-o', '--output', help='file to write the JSON report to, stdout by default')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.algorithms, args.sizes, args.distributions, args.seeds, args.render,
+                            args.ops_per_frame, args.backend, not args.full_redraw)
+    if args.startup:
+        report['startup'] = bench_startup(args.startup)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,299 @@
+"""
+Boards drawing the numbers' array with NumPy. The whole board is rasterized into a pixel array with vectorized
+operations instead of drawing every bar separately, which keeps the frame time flat for long arrays.
+"""
+import numpy as np
+import pygame as pg
+
+
+class ArrayBoard:
+    """
+    Board keeping the drawn numbers in an ndarray and rasterizing the bars as a column-height mask
+    """
+    def __init__(self, rect: pg.Rect, color: tuple = (0, 0, 0), select_color: tuple = (200, 0, 0),
+                 background: tuple = (255, 255, 255)):
+        """
+        :param rect: the position and size of the board on the screen
+        :param color: the color of the bars
+        :param select_color: the color of the selected bar
+        :param background: the color of the board's background
+        """
+        self._rect = pg.Rect(rect)
+        self._surface = pg.Surface(self._rect.size, depth=32)
+        self._color = self._surface.map_rgb(color)
+        self._select_color = self._surface.map_rgb(select_color)
+        self._background = self._surface.map_rgb(background)
+        self._pixels = np.full(self._rect.size, self._background, dtype=np.uint32)
+        # row number of every pixel counted from the bottom of the board
+        self._rows = np.arange(self._rect.height - 1, -1, -1)
+        self._values = np.zeros(0, dtype=np.int64)
+        self._column_index = np.zeros(0, dtype=np.intp)  # index of the number shown in each pixel column
+        self._bar_colors = None  # the colors of the bars by the workers' regions, None for all in the bars' color
+        self._scale = 0.0
+        self._selected = None
+        self._touched = None  # pixel columns to rasterize in the next frame, None for all of them
+        self._changed = True
+
+    def _lane_colors(self, n: int, lanes: list) -> np.ndarray:
+        """
+        Returns the color of every number's bar according to the regions of the workers of a parallel algorithm
+
+        :param n: the number of the numbers
+        :param lanes: the (first index, color) of the regions, ascending, every region ends where the next one starts;
+            the bars of a region with the None color are drawn in the bars' color
+        :return: the mapped colors of the bars
+        """
+        colors = np.full(n, self._color, dtype=np.uint32)
+        ends = [start for start, _ in lanes[1:]] + [n]
+        for (start, color), end in zip(lanes, ends):
+            if color is not None:
+                colors[start:end] = self._surface.map_rgb(color)
+        return colors
+
+    def set_values(self, nums, selected: int = None, lanes: list = None):
+        """
+        Replaces the drawn numbers and computes the columns of all bars
+
+        :param nums: the numbers to draw, a list or an ndarray
+        :param selected: the index of the selected number
+        :param lanes: the (first index, color) of the regions of the workers of a parallel algorithm, the bars of
+            every region are drawn in its color
+        """
+        self._values = np.array(nums, dtype=np.int64)
+        n = len(self._values)
+        width = self._rect.width
+        if n <= width:
+            bar_width = max(round(width / n), 1) if n else 1
+            self._column_index = np.arange(min(width, n * bar_width)) // bar_width
+        else:
+            self._column_index = np.arange(width) * n // width
+        self._bar_colors = self._lane_colors(n, lanes)[self._column_index, np.newaxis] if lanes else None
+        self._scale = self._rect.height / max(int(self._values.max()), 1) if n else 0.0
+        self._pixels[:] = self._background
+        self._selected = selected
+        self._touched = None
+        self._changed = True
+
+    def _touch(self, columns: np.ndarray):
+        """
+        Marks the pixel columns to rasterize in the next frame, along with the ones marked since the last frame
+
+        :param columns: the indices of the columns, unique and ascending
+        """
+        if not self._changed:
+            self._touched = columns
+        elif self._touched is not None:
+            self._touched = np.union1d(self._touched, columns)
+        self._changed = True
+
+    def update(self, indices, nums: list, selected: int = None):
+        """
+        Copies the changed numbers from the array being sorted, only their pixel columns are rasterized again
+
+        :param indices: the indices of the changed numbers
+        :param nums: the array being sorted
+        :param selected: the index of the selected number
+        """
+        indices = np.fromiter(indices, dtype=np.intp, count=len(indices))
+        self._values[indices] = [nums[i] for i in indices.tolist()]
+        for index in (self._selected, selected):
+            if index is not None:
+                indices = np.append(indices, index)
+        self._selected = selected
+        self._touch(np.flatnonzero(np.isin(self._column_index, indices)))
+
+    def _rasterize(self) -> np.ndarray:
+        """
+        Fills the touched pixel columns with their bars at once and copies them to the board's surface
+
+        :return: the indices of the rasterized columns, None for all of them
+        """
+        touched = self._touched
+        columns = np.arange(len(self._column_index)) if touched is None else touched
+        index = self._column_index[columns]
+        heights = np.minimum((self._values[index] * self._scale).astype(np.intp), self._rect.height)
+        mask = self._rows[np.newaxis, :] < heights[:, np.newaxis]
+        color = self._color if self._bar_colors is None else self._bar_colors[columns]
+        pixels = np.where(mask, color, self._background)
+        if self._selected is not None:
+            selected = index == self._selected
+            pixels[selected] = np.where(mask[selected], self._select_color, self._background)
+        self._pixels[columns] = pixels
+        self._touched = None
+        return self._blit_columns(touched)
+
+    def _blit_columns(self, columns: np.ndarray) -> np.ndarray:
+        """
+        Copies the pixel columns to the board's surface
+
+        :param columns: the indices of the columns, None for all of them
+        :return: the given columns
+        """
+        if columns is None:
+            pg.surfarray.blit_array(self._surface, self._pixels)
+        elif len(columns):
+            surface_pixels = pg.surfarray.pixels2d(self._surface)
+            surface_pixels[columns] = self._pixels[columns]
+            del surface_pixels  # unlocks the surface
+        return columns
+
+    def draw(self, surface: pg.Surface, changed_only: bool = False) -> list:
+        """
+        Blits the board onto the given surface, the bars are rasterized again only if the numbers changed
+
+        :param surface: pygame Surface to blit the board onto
+        :param changed_only: True to blit only the pixel columns rasterized since the last draw, when the surface still
+            shows the board as it was drawn last time
+        :return: the areas of the surface blitted onto
+        """
+        columns = None
+        if self._changed:
+            columns = self._rasterize()
+            self._changed = False
+        elif changed_only:
+            return []
+        if not changed_only or columns is None:
+            surface.blit(self._surface, self._rect)
+            return [self._rect]
+        if not len(columns):
+            return []
+        # the touched columns are blitted as contiguous spans
+        breaks = np.flatnonzero(np.diff(columns) != 1) + 1
+        rects = []
+        for start, end in zip(columns[np.r_[0, breaks]].tolist(), (columns[np.r_[breaks - 1, -1]] + 1).tolist()):
+            area = pg.Rect(start, 0, end - start, self._rect.height)
+            rects.append(surface.blit(self._surface, area.move(self._rect.topleft), area))
+        return rects
+
+    @property
+    def rect(self) -> pg.Rect:
+        """
+        Getter for the area of the board on the screen
+        """
+        return self._rect
+
+
+class BucketBoard(ArrayBoard):
+    """
+    Board for arrays longer than the board's width. The numbers are bucketed into the pixel columns and every column
+    shows the minimum (solid bar), the maximum (envelope above the bar) and the mean (marker line) of its bucket
+    """
+    def __init__(self, rect: pg.Rect, color: tuple = (0, 0, 0), select_color: tuple = (200, 0, 0),
+                 background: tuple = (255, 255, 255), envelope_color: tuple = (170, 170, 170),
+                 mean_color: tuple = (0, 0, 200)):
+        """
+        :param rect: the position and size of the board on the screen
+        :param color: the color of the bars reaching the minimum of the buckets
+        :param select_color: the color of the column with the selected number
+        :param background: the color of the board's background
+        :param envelope_color: the color of the area between the minimum and the maximum of the buckets
+        :param mean_color: the color of the mean marker of the buckets
+        """
+        super().__init__(rect, color, select_color, background)
+        self._envelope_color = self._surface.map_rgb(envelope_color)
+        self._mean_color = self._surface.map_rgb(mean_color)
+        self._bounds = np.zeros(1, dtype=np.intp)  # first index of every bucket and the array's length at the end
+        self._mins = np.zeros(0, dtype=np.int64)
+        self._maxs = np.zeros(0, dtype=np.int64)
+        self._sums = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(0, dtype=np.int64)
+
+    def set_values(self, nums, selected: int = None, lanes: list = None):
+        """
+        Replaces the drawn numbers and aggregates all buckets
+
+        :param nums: the numbers to draw, a list or an ndarray
+        :param selected: the index of the selected number
+        :param lanes: the (first index, color) of the regions of the workers of a parallel algorithm, the solid bar of
+            every column is drawn in the color of the region its bucket starts in
+        """
+        self._values = np.array(nums, dtype=np.int64)
+        n = len(self._values)
+        columns = min(self._rect.width, n)
+        self._bounds = np.arange(columns + 1) * n // max(columns, 1)
+        self._counts = np.diff(self._bounds)
+        self._bar_colors = self._lane_colors(n, lanes)[self._bounds[:-1]] if lanes else None
+        self._aggregate()
+        self._scale = self._rect.height / max(int(self._values.max()), 1) if n else 0.0
+        self._pixels[:] = self._background
+        self._selected = selected
+        self._touched = None
+        self._changed = True
+
+    def _aggregate(self, columns=None):
+        """
+        Computes the minimum, maximum and sum of the given buckets
+
+        :param columns: the indices of the buckets to compute, all of them if not given
+        """
+        if columns is None:
+            if not len(self._values):
+                self._mins = self._maxs = self._sums = np.zeros(0, dtype=np.int64)
+                return
+            starts = self._bounds[:-1]
+            self._mins = np.minimum.reduceat(self._values, starts)
+            self._maxs = np.maximum.reduceat(self._values, starts)
+            self._sums = np.add.reduceat(self._values, starts)
+            return
+        for column in columns.tolist():
+            bucket = self._values[self._bounds[column]:self._bounds[column + 1]]
+            self._mins[column] = bucket.min()
+            self._maxs[column] = bucket.max()
+
+    def _column_of(self, indices: np.ndarray) -> np.ndarray:
+        """
+        Returns the columns of the buckets containing the given indices
+
+        :param indices: the indices of the numbers
+        :return: the indices of the columns
+        """
+        return np.searchsorted(self._bounds, indices, side='right') - 1
+
+    def update(self, indices, nums: list, selected: int = None):
+        """
+        Copies the changed numbers from the array being sorted and aggregates again only the touched buckets
+
+        :param indices: the indices of the changed numbers
+        :param nums: the array being sorted
+        :param selected: the index of the selected number
+        """
+        indices = np.fromiter(indices, dtype=np.intp, count=len(indices))
+        new = np.array([nums[i] for i in indices.tolist()], dtype=np.int64)
+        columns = self._column_of(indices)
+        np.add.at(self._sums, columns, new - self._values[indices])
+        self._values[indices] = new
+        for index in (self._selected, selected):
+            if index is not None:
+                columns = np.append(columns, self._column_of(index))
+        touched = np.unique(columns)
+        if len(touched) > len(self._counts) // 4:
+            self._aggregate()
+        else:
+            self._aggregate(touched)
+        self._selected = selected
+        self._touch(touched)
+
+    def _rasterize(self) -> np.ndarray:
+        """
+        Fills the pixel columns of the touched buckets with their minimum, maximum and mean and copies them to the
+        board's surface
+
+        :return: the indices of the rasterized columns, None for all of them
+        """
+        touched = self._touched
+        columns = np.arange(len(self._counts)) if touched is None else touched
+        height = self._rect.height
+        rows = self._rows[np.newaxis, :]
+        min_h = np.minimum((self._mins[columns] * self._scale).astype(np.intp), height)[:, np.newaxis]
+        max_h = np.minimum((self._maxs[columns] * self._scale).astype(np.intp), height)[:, np.newaxis]
+        mean_h = np.minimum((self._sums[columns] / self._counts[columns] * self._scale).astype(np.intp),
+                            height - 1)[:, np.newaxis]
+        color = self._color if self._bar_colors is None else self._bar_colors[columns][:, np.newaxis]
+        pixels = np.where(rows < min_h, color, np.where(rows < max_h, self._envelope_color, self._background))
+        pixels[np.broadcast_to(rows == mean_h, pixels.shape)] = self._mean_color
+        if self._selected is not None:
+            selected = columns == self._column_of(self._selected)
+            pixels[selected] = np.where(rows < max_h[selected], self._select_color, self._background)
+        self._pixels[columns] = pixels
+        self._touched = None
+        return self._blit_columns(touched)
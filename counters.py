@@ -0,0 +1,65 @@
+"""
+Counters of the sorting algorithms' operations and of their auxiliary memory
+"""
+import csv
+import os
+
+from algorithms import ALLOC, COMPARE, FREE, Operation, SWAP, WRITE
+
+
+class Counters:
+    """
+    Counts the comparisons, swaps and writes of a sorting algorithm, and the allocations, current size and peak size of
+    its auxiliary memory (in elements)
+    """
+    FIELDS = ('comparisons', 'swaps', 'writes', 'allocations', 'aux_memory', 'peak_aux_memory')
+
+    def __init__(self):
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.allocations = 0
+        self.aux_memory = 0
+        self.peak_aux_memory = 0
+
+    def count(self, op: Operation):
+        """
+        Counts the operation
+
+        :param op: the operation performed by the algorithm
+        """
+        code = op.code
+        if code == COMPARE:
+            self.comparisons += 1
+        elif code == SWAP:
+            self.swaps += 1
+        elif code == WRITE:
+            self.writes += 1
+        elif code == ALLOC:
+            self.allocations += 1
+            self.aux_memory += op.a
+            if self.aux_memory > self.peak_aux_memory:
+                self.peak_aux_memory = self.aux_memory
+        elif code == FREE:
+            self.aux_memory -= op.a
+
+    def as_dict(self) -> dict:
+        """
+        Returns the counters as a dict keyed by FIELDS
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+def append_csv(path: str, row: dict):
+    """
+    Appends the row to the CSV file, the header is written if the file is new
+
+    :param path: the path of the CSV file
+    :param row: the values of the row keyed by the columns
+    """
+    new = not os.path.exists(path) or not os.path.getsize(path)
+    with open(path, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(row))
+        if new:
+            writer.writeheader()
+        writer.writerow(row)
@@ -0,0 +1,199 @@
+"""
+Sort engine running a sorting algorithm in a separate process. The numbers are kept in shared memory after a header
+with the step counter, the selected index, the finished flag and the operation counters; the worker process updates
+them as the algorithm runs and the UI process reads them at its own frame rate, without copying or message passing.
+Pausing and stopping the worker are signalled through events and its speed through a shared value.
+"""
+import multiprocessing as mp
+from array import array
+from multiprocessing.shared_memory import SharedMemory
+from time import perf_counter, sleep
+from typing import Optional
+
+from algorithms import ALGORITHMS, ALLOC, FREE, LANE, SWAP, WRITE
+from counters import Counters
+from scheduler import UNTHROTTLED
+
+# the slots of the header, every slot is written by the worker only, as a single aligned 8-byte store
+_STEP, _SELECTED, _FINISHED = range(3)
+_COUNTERS = 3  # the first slot of the operation counters, in the order of Counters.FIELDS
+_HEADER = _COUNTERS + len(Counters.FIELDS)
+_BATCH = 256  # the operations performed unthrottled between checking the signals and publishing the counters
+_MIN_SLEEP = 0.001  # the shortest delay worth sleeping for when throttled, shorter ones are carried over
+
+
+def _publish(shared: memoryview, counters: Counters):
+    """
+    Copies the operation counters to the header
+
+    :param shared: the view of the shared memory block
+    :param counters: the counters of the worker
+    """
+    for slot, field in enumerate(Counters.FIELDS, _COUNTERS):
+        shared[slot] = getattr(counters, field)
+
+
+def _work(name: str, n: int, algorithm: str, running: mp.Event, stopped: mp.Event, rate: mp.RawValue):
+    """
+    Worker process running the sorting algorithm on a private list and mirroring its changes to the shared array
+
+    :param name: the name of the shared memory block
+    :param n: the length of the array
+    :param algorithm: the name of the sorting algorithm
+    :param running: the event cleared while the sort is paused
+    :param stopped: the event set when the sort is abandoned
+    :param rate: the number of operations per second, UNTHROTTLED for the full speed
+    """
+    shm = SharedMemory(name)
+    shared = shm.buf[:8 * (_HEADER + n)].cast('q')
+    try:
+        counters = Counters()
+        speed = rate.value
+        base_time, base_step = perf_counter(), 0
+        step = 0
+        for op in ALGORITHMS[algorithm](shared[_HEADER:].tolist()):
+            code = op.code
+            if code == SWAP:
+                a, b = _HEADER + op.a, _HEADER + op.b
+                shared[a], shared[b] = shared[b], shared[a]
+            elif code == WRITE:
+                shared[_HEADER + op.a] = op.b
+            if code != ALLOC and code != FREE and code != LANE:
+                shared[_SELECTED] = op.a
+            counters.count(op)
+            step += 1
+            shared[_STEP] = step
+            if speed == UNTHROTTLED and step % _BATCH:
+                continue
+            _publish(shared, counters)
+            if not running.is_set():
+                running.wait()
+                base_time, base_step = perf_counter(), step
+            if stopped.is_set():
+                return
+            if rate.value != speed:
+                speed = rate.value
+                base_time, base_step = perf_counter(), step
+            if speed != UNTHROTTLED:
+                delay = base_time + (step - base_step) / speed - perf_counter()
+                if delay > _MIN_SLEEP:
+                    sleep(delay)
+        _publish(shared, counters)
+        shared[_FINISHED] = 1
+    finally:
+        shared.release()
+        shm.close()
+
+
+class SortEngine:
+    """
+    Sorting algorithm running in a separate process on the numbers in shared memory, the engine is created paused
+    """
+    def __init__(self, algorithm: str, nums: list, rate: float = UNTHROTTLED):
+        """
+        :param algorithm: the name of the sorting algorithm
+        :param nums: the numbers to sort, copied to the shared memory
+        :param rate: the number of operations per second, UNTHROTTLED for the full speed
+        """
+        n = len(nums)
+        self._shm = SharedMemory(create=True, size=8 * (_HEADER + n))
+        self._shared = self._shm.buf[:8 * (_HEADER + n)].cast('q')
+        self._shared[:_HEADER] = array('q', bytes(8 * _HEADER))
+        self._shared[_SELECTED] = -1
+        self._values = self._shared[_HEADER:]
+        self._values[:] = array('q', nums)
+        self._running = mp.Event()
+        self._stopped = mp.Event()
+        self._rate = mp.RawValue('d', rate)
+        # not a daemon, so the parallel algorithms can start their own worker processes
+        self._process = mp.Process(target=_work, args=(self._shm.name, n, algorithm, self._running, self._stopped,
+                                                       self._rate))
+
+    def resume(self):
+        """
+        Starts or resumes the sort
+        """
+        self._running.set()
+        if self._process.pid is None:
+            self._process.start()
+
+    def pause(self):
+        """
+        Pauses the sort, the worker stops at the next check of the signals
+        """
+        self._running.clear()
+
+    def stop(self):
+        """
+        Abandons the sort, waits for the worker process to exit and frees the shared memory, the values must not be used
+        afterwards
+        """
+        self._stopped.set()
+        self._running.set()
+        if self._process.pid is not None:
+            self._process.join()
+        self._values.release()
+        self._shared.release()
+        self._shm.close()
+        self._shm.unlink()
+
+    @property
+    def values(self) -> memoryview:
+        """
+        Getter for the live view of the numbers, changed by the worker process
+        """
+        return self._values
+
+    @property
+    def step(self) -> int:
+        """
+        Getter for the number of the operations performed so far
+        """
+        return self._shared[_STEP]
+
+    @property
+    def selected(self) -> Optional[int]:
+        """
+        Getter for the index of the number the last operation focused on, None before the first operation
+        """
+        selected = self._shared[_SELECTED]
+        return None if selected < 0 else selected
+
+    @property
+    def finished(self) -> bool:
+        """
+        Getter for whether the sort has completed
+        """
+        return bool(self._shared[_FINISHED])
+
+    @property
+    def exitcode(self) -> Optional[int]:
+        """
+        Getter for the exit code of the worker process, None while it runs; an exit without finishing the sort means the
+        worker failed or was killed
+        """
+        return self._process.exitcode
+
+    @property
+    def counters(self) -> Counters:
+        """
+        Getter for the operation counters, published by the worker every batch of operations
+        """
+        counters = Counters()
+        for slot, field in enumerate(Counters.FIELDS, _COUNTERS):
+            setattr(counters, field, self._shared[slot])
+        return counters
+
+    @property
+    def rate(self) -> float:
+        """
+        Getter for the number of operations per second
+        """
+        return self._rate.value
+
+    @rate.setter
+    def rate(self, rate: float):
+        """
+        Setter for the number of operations per second, UNTHROTTLED for the full speed
+        """
+        self._rate.value = rate
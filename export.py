@@ -0,0 +1,286 @@
+"""
+Offline export of a sorting algorithm's run to an animated GIF or a sequence of PNG frames. The run is recorded to a
+trace once, or taken from the trace cache, then the frames are split into chunks rendered off-screen by a pool of worker
+processes: every worker restores the array at the start of its chunk from a snapshot, replays the trace from there and
+rasterizes the frames with the NumPy boards, so no window is opened and the run is not watched in real time. The GIF
+frames are encoded by the workers too and only concatenated in order.
+
+Usage: python export.py bubble -o bubble.gif --number 100 --seed 0 --size 640 360 --stride 10
+       python export.py quick -o frames --format frames
+"""
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import struct
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+import numpy as np
+import pygame as pg
+
+from algorithms import ALGORITHMS, ALLOC, FREE, LANE, SWAP, WRITE
+from boards import ArrayBoard, BucketBoard
+from trace_cache import MAX_BYTES, TraceCache
+from traces import Trace, record
+from workloads import DISTRIBUTIONS, generate
+
+# the colors the boards draw with, in the order of the GIF palette: the background, the bars, the selected bar, the
+# envelope and the mean marker of the bucketed columns
+PALETTE = ((255, 255, 255), (0, 0, 0), (200, 0, 0), (170, 170, 170), (0, 0, 200))
+_PALETTE_BITS = 3  # the palette is padded to 2 ** _PALETTE_BITS colors
+_MAX_CODE = 4096  # the LZW codes of GIF are at most 12 bits long
+_FINAL_DELAY = 100  # the last frame is shown for a second before the animation loops, in hundredths of a second
+
+
+def _lzw(pixels: bytes, min_code_size: int) -> bytes:
+    """
+    Compresses the palette indices with the variable-length LZW of GIF
+
+    :param pixels: the palette indices of the pixels, row by row
+    :param min_code_size: the number of bits of the palette indices, at least 2
+    :return: the compressed bytes, not yet split into sub-blocks
+    """
+    clear = 1 << min_code_size
+    size = min_code_size + 1
+    next_code = clear + 2
+    codes = {}  # the (prefix code << 8 | pixel) of every string in the table
+    out = bytearray()
+    bits = clear  # the clear code starts the stream
+    count = size
+    prefix = pixels[0]
+    for pixel in islice(pixels, 1, None):
+        key = prefix << 8 | pixel
+        code = codes.get(key)
+        if code is not None:
+            prefix = code
+            continue
+        bits |= prefix << count
+        count += size
+        while count >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            count -= 8
+        if next_code >= 1 << size and size < 12:
+            size += 1
+        if next_code < _MAX_CODE:
+            codes[key] = next_code
+            next_code += 1
+        else:
+            bits |= clear << count
+            count += size
+            codes.clear()
+            size = min_code_size + 1
+            next_code = clear + 2
+        prefix = pixel
+    bits |= prefix << count
+    count += size
+    if next_code >= 1 << size and size < 12:
+        size += 1
+    bits |= (clear + 1) << count  # the end of information code
+    count += size
+    while count > 0:
+        out.append(bits & 0xFF)
+        bits >>= 8
+        count -= 8
+    return bytes(out)
+
+
+def _gif_frame(indices: np.ndarray, previous: np.ndarray, delay: int) -> bytes:
+    """
+    Encodes a frame of the GIF, only the bounding box of the pixels changed since the previous frame is stored
+
+    :param indices: the palette indices of the frame, shaped (height, width)
+    :param previous: the palette indices of the previous frame, None to store the whole frame
+    :param delay: the time the frame is shown for, in hundredths of a second
+    :return: the graphic control extension, the image descriptor and the image data of the frame
+    """
+    top, left = 0, 0
+    bottom, right = indices.shape
+    if previous is not None:
+        changed = indices != previous
+        rows = np.flatnonzero(changed.any(axis=1))
+        if len(rows):
+            columns = np.flatnonzero(changed.any(axis=0))
+            top, bottom, left, right = rows[0], rows[-1] + 1, columns[0], columns[-1] + 1
+        else:
+            bottom, right = 1, 1  # an unchanged frame still keeps its delay
+    data = _lzw(indices[top:bottom, left:right].tobytes(), _PALETTE_BITS)
+    frame = bytearray(struct.pack('<4BHBB', 0x21, 0xF9, 4, 0x04, delay, 0, 0))  # kept under the next frame
+    frame += struct.pack('<BHHHHB', 0x2C, left, top, right - left, bottom - top, 0)
+    frame.append(_PALETTE_BITS)
+    for i in range(0, len(data), 255):
+        block = data[i:i + 255]
+        frame.append(len(block))
+        frame += block
+    frame.append(0)
+    return bytes(frame)
+
+
+def _gif_header(size: tuple) -> bytes:
+    """
+    Returns the header of the looping GIF with the global palette
+
+    :param size: the width and height of the frames
+    """
+    header = bytearray(b'GIF89a')
+    header += struct.pack('<HHBBB', size[0], size[1], 0xF0 | (_PALETTE_BITS - 1), 0, 0)
+    for i in range(1 << _PALETTE_BITS):
+        header += bytes(PALETTE[i] if i < len(PALETTE) else (0, 0, 0))
+    header += b'\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00'  # loop forever
+    return bytes(header)
+
+
+def _render_chunk(trace_path: str, nums: list, selected: int, start: int, steps: list, first: int, count: int,
+                  size: tuple, delay: int, output: str, fmt: str) -> bytes:
+    """
+    Worker task rendering the consecutive frames of a chunk
+
+    :param trace_path: the path of the recorded trace
+    :param nums: the array after the first start operations
+    :param selected: the index the last of these operations focused on, None if there was none
+    :param start: the number of the operations applied to the array
+    :param steps: the number of the operations applied before every frame of the chunk
+    :param first: the index of the first frame of the chunk within the export
+    :param count: the number of all recorded operations, the frame after all of them shows no selection
+    :param size: the width and height of the frames
+    :param delay: the time a frame is shown for, in hundredths of a second
+    :param output: the directory of the PNG frames
+    :param fmt: 'gif' to return the encoded frames, 'frames' to save them as PNG files
+    :return: the encoded GIF frames, empty for the PNG frames
+    """
+    trace = Trace(trace_path)
+    ops = trace.replay(nums, start)
+    try:
+        surface = pg.Surface(size, depth=32)
+        rect = pg.Rect((0, 0), size)
+        board = ArrayBoard(rect) if len(nums) <= rect.width else BucketBoard(rect)
+        # the scale of the bars comes from the initial array, the maximum of a snapshot may be overwritten meanwhile
+        board.set_values(trace.initial())
+        board.update(range(len(nums)), nums, selected)
+        colors = [surface.map_rgb(color) for color in PALETTE]
+        position = start
+        encoded = bytearray()
+        previous = None
+        for frame, step in enumerate(steps, first):
+            dirty = set()
+            for op in islice(ops, step - position):
+                if op.code == SWAP:
+                    dirty.add(op.a)
+                    dirty.add(op.b)
+                elif op.code == WRITE:
+                    dirty.add(op.a)
+                elif op.code == ALLOC or op.code == FREE or op.code == LANE:
+                    continue
+                selected = op.a
+            position = step
+            if step == count:
+                selected = None
+            board.update(dirty, nums, selected)
+            board.draw(surface)
+            if fmt == 'frames':
+                pg.image.save(surface, os.path.join(output, f'frame_{frame:06d}.png'))
+                continue
+            pixels = pg.surfarray.array2d(surface).T
+            indices = np.zeros(pixels.shape, dtype=np.uint8)
+            for i, color in enumerate(colors[1:], 1):
+                indices[pixels == color] = i
+            encoded += _gif_frame(indices, previous, _FINAL_DELAY if step == count else delay)
+            previous = indices
+        return bytes(encoded)
+    finally:
+        ops.close()
+        trace.close()
+
+
+def export(name: str, nums: list, output: str, fmt: str = 'gif', size: tuple = (640, 360), stride: int = 10,
+           fps: float = 30, workers: int = None, chunk: int = 32, trace_cache: TraceCache = None) -> int:
+    """
+    Renders the run of the sorting algorithm to the animated GIF or the PNG frames
+
+    :param name: the name of the algorithm
+    :param nums: the numbers to sort, the list is left unchanged
+    :param output: the path of the GIF file, or of the directory of the PNG frames
+    :param fmt: 'gif' or 'frames'
+    :param size: the width and height of the frames
+    :param stride: the number of the operations between two frames
+    :param fps: the frame rate of the GIF
+    :param workers: the number of the worker processes, the number of the CPUs by default
+    :param chunk: the number of the frames rendered by a worker at once
+    :param trace_cache: the cache the trace is looked up in and stored to, None to always run the algorithm
+    :return: the number of the rendered frames
+    """
+    delay = max(round(100 / fps), 2)  # most viewers slow down the frames shorter than 2 hundredths of a second
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        trace_path = os.path.join(tmp_dir, f'{name}.svt')
+        if trace_cache is not None:
+            trace_path = trace_cache.path(name, nums, trace_path)
+        else:
+            record(name, nums, trace_path)
+
+        # the snapshots of the array at the starts of the chunks, taken by a single replay of the trace
+        trace = Trace(trace_path)
+        count = len(trace)
+        steps = list(range(0, count, stride)) + [count]
+        work = trace.initial()
+        ops = trace.replay(work)
+        position = 0
+        selected = None
+        tasks = []
+        for first in range(0, len(steps), chunk):
+            for op in islice(ops, steps[first] - position):
+                if op.code != ALLOC and op.code != FREE and op.code != LANE:
+                    selected = op.a
+            position = steps[first]
+            tasks.append((list(work), selected, position, steps[first:first + chunk], first))
+        ops.close()
+        trace.close()
+
+        if fmt == 'frames':
+            os.makedirs(output, exist_ok=True)
+        with ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(_render_chunk, trace_path, snapshot, selected, start, chunk_steps, first, count,
+                                   tuple(size), delay, output, fmt)
+                       for snapshot, selected, start, chunk_steps, first in tasks]
+            if fmt == 'frames':
+                for future in futures:
+                    future.result()
+            else:
+                with open(output, 'wb') as f:
+                    f.write(_gif_header(size))
+                    for future in futures:
+                        f.write(future.result())
+                    f.write(b'\x3B')
+    return len(steps)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Renders a sorting algorithm run to an animated GIF or PNG frames')
+    parser.add_argument('algorithm', choices=list(ALGORITHMS))
+    parser.add_argument('-o', '--output', required=True, help='the GIF file or the directory of the PNG frames')
+    parser.add_argument('--format', choices=['gif', 'frames'],
+                        help='gif for the outputs ending with .gif, frames otherwise by default')
+    parser.add_argument('--number', type=int, default=100, help='the length of the generated array')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--size', type=int, nargs=2, default=[640, 360], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--stride', type=int, default=10, help='the number of the operations between two frames')
+    parser.add_argument('--fps', type=float, default=30, help='the frame rate of the GIF')
+    parser.add_argument('--workers', type=int, help='the number of the worker processes, all CPUs by default')
+    parser.add_argument('--chunk', type=int, default=32, help='the number of the frames rendered by a worker at once')
+    parser.add_argument('--trace-cache-size', type=float, default=MAX_BYTES / 2 ** 20, metavar='MIB',
+                        help='the size limit of the cache of the computed traces, 0 to disable the cache')
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ('gif' if args.output.lower().endswith('.gif') else 'frames')
+    nums = generate(args.distribution, args.number, args.seed).tolist()
+    trace_cache = TraceCache(max_bytes=int(args.trace_cache_size * 2 ** 20)) if args.trace_cache_size > 0 else None
+    frames = export(args.algorithm, nums, args.output, fmt, tuple(args.size), args.stride, args.fps, args.workers,
+                    args.chunk, trace_cache)
+    print(f'rendered {frames} frames to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,421 @@
+"""
+External-memory sort of integer files larger than the memory. The input is memory-mapped (a text file is first parsed
+into a binary one), cut into runs fitting the memory budget, every run is sorted and spilled to a temporary file, and
+groups of k runs are merged with buffered sequential reads and writes until one is left. A group is merged a block at a
+time, the numbers of the runs' blocks up to the smallest of their last numbers are concatenated and sorted by NumPy,
+which is faster than a heap of the run cursors stepped through in Python. The live view shows a sample of the whole file
+as bars, so the sorted runs appear as a sawtooth which the merges smooth out, along with the progress and the throughput
+of every phase.
+
+Binary files hold little-endian int64 numbers, the files ending with .csv or .txt hold numbers separated by commas or
+whitespace.
+
+Usage: python external.py input.bin -o sorted.bin --budget 64M [--show]
+       python external.py input.bin --make 10000000 --seed 0
+"""
+import os
+
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import argparse
+import shutil
+import tempfile
+from time import perf_counter
+from typing import Iterator, NamedTuple
+
+import numpy as np
+import pygame as pg
+
+from boards import ArrayBoard
+from fonts import load_font
+from sorting_visualizer import init_pygame, render_text
+
+ITEM = np.dtype('<i8')
+_TEXT_EXTENSIONS = ('.csv', '.txt')
+_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+class Progress(NamedTuple):
+    """
+    Progress of the external sort, yielded after every block of work
+    """
+    phase: str  # 'parse', 'runs', 'merge 1', 'merge 2', ...
+    done: int  # the bytes processed in the phase so far
+    total: int  # the bytes processed in the whole phase
+    column: int  # the first column of the file's sample the values replace
+    values: np.ndarray  # the new values of the sampled positions
+
+
+def parse_size(text: str) -> int:
+    """
+    Parses a size in bytes with an optional K, M or G suffix
+
+    :param text: the size, e.g. 64M
+    :return: the size in bytes
+    """
+    text = text.strip().upper().rstrip('B')
+    unit = text[-1:] if text[-1:] in _UNITS else ''
+    return int(float(text[:len(text) - len(unit)]) * _UNITS[unit])
+
+
+def _is_text(path: str) -> bool:
+    """
+    Returns whether the file holds the numbers as text
+    """
+    return path.lower().endswith(_TEXT_EXTENSIONS)
+
+
+def _parse_text(path: str, binary_path: str, block: int) -> Iterator[Progress]:
+    """
+    Converts the numbers of the text file to a binary file, reading the text in blocks
+
+    :param path: the path of the text file
+    :param binary_path: the path of the binary file to write
+    :param block: the number of the bytes read at once
+    """
+    total = os.path.getsize(path)
+    done = 0
+    rest = b''
+    with open(path, 'rb') as src, open(binary_path, 'wb') as dst:
+        while True:
+            data = src.read(block)
+            done += len(data)
+            text = (rest + data).replace(b',', b' ')
+            if data:
+                # the last number may continue in the next block
+                cut = max(text.rfind(b' '), text.rfind(b'\n'), text.rfind(b'\r'), text.rfind(b'\t'))
+                text, rest = text[:cut + 1], text[cut + 1:]
+            np.array(text.split(), dtype=ITEM).tofile(dst)
+            yield Progress('parse', done, total, 0, np.zeros(0, dtype=ITEM))
+            if not data:
+                return
+
+
+class _Sampler:
+    """
+    Picks the values of the evenly spaced positions of the file, shown as the bars of the live view
+    """
+    def __init__(self, n: int, columns: int):
+        """
+        :param n: the length of the file in numbers
+        :param columns: the number of the sampled positions, at most n
+        """
+        self._positions = np.arange(min(columns, n), dtype=np.int64) * n // max(min(columns, n), 1)
+
+    def sample(self, phase: str, done: int, total: int, lo: int, values: np.ndarray) -> Progress:
+        """
+        Returns the progress with the sampled values of the block written to the file
+
+        :param phase: the name of the phase
+        :param done: the bytes processed in the phase so far
+        :param total: the bytes processed in the whole phase
+        :param lo: the position of the block within the file
+        :param values: the numbers of the block
+        """
+        first, last = np.searchsorted(self._positions, (lo, lo + len(values)))
+        return Progress(phase, done, total, int(first), values[self._positions[first:last] - lo])
+
+
+def _form_runs(data: np.ndarray, run_length: int, tmp_dir: str, sampler: _Sampler) -> Iterator[Progress]:
+    """
+    Cuts the memory-mapped numbers into runs, sorts every run in memory and spills it to a temporary file
+
+    :param data: the memory-mapped numbers
+    :param run_length: the number of the numbers of a run
+    :param tmp_dir: the directory of the run files
+    :param sampler: the sampler of the live view
+    :return: the (path, first position, length) of the runs
+    """
+    runs = []
+    total = len(data) * ITEM.itemsize
+    for lo in range(0, len(data), run_length):
+        run = np.array(data[lo:lo + run_length])
+        run.sort()
+        path = os.path.join(tmp_dir, f'run0_{len(runs)}.bin')
+        run.tofile(path)
+        runs.append((path, lo, len(run)))
+        yield sampler.sample('runs', (lo + len(run)) * ITEM.itemsize, total, lo, run)
+    return runs
+
+
+class _RunReader:
+    """
+    Sequential reader of a sorted run file, the numbers are read in blocks
+    """
+    def __init__(self, path: str, block: int):
+        """
+        :param path: the path of the run file
+        :param block: the number of the numbers read at once
+        """
+        self._file = open(path, 'rb')
+        self._block = block
+        self.values = np.zeros(0, dtype=ITEM)  # the rest of the last read block
+        self.refill()
+
+    def refill(self) -> bool:
+        """
+        Reads the next block if the current one was consumed
+
+        :return: whether there are numbers left
+        """
+        if not len(self.values):
+            self.values = np.fromfile(self._file, dtype=ITEM, count=self._block)
+        return bool(len(self.values))
+
+    def close(self):
+        """
+        Closes the run file
+        """
+        self._file.close()
+
+
+def _merge_runs(runs: list, path: str, block: int, phase: str, done: int, total: int,
+                sampler: _Sampler) -> Iterator[Progress]:
+    """
+    Merges the sorted runs into a single file. Every step takes the numbers up to the smallest of the last numbers of
+    the current blocks from all blocks, which are the smallest numbers left in all runs, and sorts them together, so a
+    step of up to B numbers costs O(B log B) instead of the O(B log k) of a heap-based k-way merge
+
+    :param runs: the (path, first position, length) of the runs, consecutive in the file
+    :param path: the path of the merged file
+    :param block: the number of the numbers read from a run or written at once
+    :param phase: the name of the merge pass
+    :param done: the bytes merged in the pass before these runs
+    :param total: the bytes merged in the whole pass
+    :param sampler: the sampler of the live view
+    """
+    readers = [_RunReader(run_path, block) for run_path, _, _ in runs]
+    position = runs[0][1]
+    try:
+        with open(path, 'wb', buffering=block * ITEM.itemsize) as out:
+            active = [reader for reader in readers if len(reader.values)]
+            while active:
+                bound = min(reader.values[-1] for reader in active)
+                parts = []
+                for reader in active:
+                    cut = np.searchsorted(reader.values, bound, side='right')
+                    parts.append(reader.values[:cut])
+                    reader.values = reader.values[cut:]
+                merged = np.concatenate(parts)
+                merged.sort()
+                merged.tofile(out)
+                yield sampler.sample(phase, done + (position - runs[0][1] + len(merged)) * ITEM.itemsize, total,
+                                     position, merged)
+                position += len(merged)
+                active = [reader for reader in active if reader.refill()]
+    finally:
+        for reader in readers:
+            reader.close()
+
+
+def external_sort(input_path: str, output_path: str, budget: int = 64 << 20, block: int = 1 << 20,
+                  columns: int = 600, tmp_dir: str = None) -> Iterator[Progress]:
+    """
+    Sorts the integer file within the memory budget, yielding the progress after every block of work; the temporary
+    files are removed when the generator ends or is closed
+
+    :param input_path: the path of the binary or text file to sort
+    :param output_path: the path of the sorted file, binary or text according to its extension
+    :param budget: the bytes of the numbers held in memory at once, the length of the runs
+    :param block: the bytes read from a run or written at once while merging, the runs merged at once share the budget
+    :param columns: the number of the sampled positions shown in the live view
+    :param tmp_dir: the directory of the temporary files, the system's one by default
+    :raises ValueError: if the binary input's size is not a multiple of the numbers' size
+    """
+    if not _is_text(input_path):
+        size = os.path.getsize(input_path)
+        if size % ITEM.itemsize:
+            raise ValueError(f'{input_path} is not a file of {ITEM.itemsize}-byte integers, its size {size} is not a '
+                             f'multiple of {ITEM.itemsize}')
+    run_length = max(budget // ITEM.itemsize, 1)
+    block_length = max(block // ITEM.itemsize, 1)
+    fan_in = max(budget // max(block, 1) - 1, 2)  # a block of every merged run and of the output fit the budget
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as tmp:
+        binary_path = input_path
+        if _is_text(input_path):
+            binary_path = os.path.join(tmp, 'input.bin')
+            yield from _parse_text(input_path, binary_path, block)
+        n = os.path.getsize(binary_path) // ITEM.itemsize
+        sampler = _Sampler(n, columns)
+        if n:
+            data = np.memmap(binary_path, dtype=ITEM, mode='r', shape=(n,))
+            runs = yield from _form_runs(data, run_length, tmp, sampler)
+            del data
+        else:
+            runs = [(os.path.join(tmp, 'run0_0.bin'), 0, 0)]
+            open(runs[0][0], 'wb').close()
+
+        merge_pass = 0
+        while len(runs) > 1:
+            merge_pass += 1
+            merged_runs = []
+            done = 0
+            for first in range(0, len(runs), fan_in):
+                group = runs[first:first + fan_in]
+                length = sum(run_length for _, _, run_length in group)
+                path = os.path.join(tmp, f'run{merge_pass}_{len(merged_runs)}.bin')
+                yield from _merge_runs(group, path, block_length, f'merge {merge_pass}', done,
+                                       n * ITEM.itemsize, sampler)
+                for run_path, _, _ in group:
+                    os.remove(run_path)
+                merged_runs.append((path, group[0][1], length))
+                done += length * ITEM.itemsize
+            runs = merged_runs
+
+        if _is_text(output_path):
+            with open(runs[0][0], 'rb') as src, open(output_path, 'w') as dst:
+                while True:
+                    values = np.fromfile(src, dtype=ITEM, count=block_length)
+                    if not len(values):
+                        break
+                    dst.write('\n'.join(map(str, values.tolist())))
+                    dst.write('\n')
+        else:
+            shutil.move(runs[0][0], output_path)  # copied if the temporary directory is on another file system
+
+
+class ExternalSortView:
+    """
+    Live view of the external sort, the sampled positions of the file drawn as bars and the progress of the phases
+    """
+    def __init__(self, surface: pg.Surface, columns: int):
+        """
+        :param surface: the display surface to draw onto
+        :param columns: the number of the sampled positions of the file
+        """
+        self._surface = surface
+        self._font = load_font('calibri', 18)
+        line_height = self._font.get_linesize() + 2
+        width, height = surface.get_size()
+        self._status = pg.Rect(10, 10, width - 20, 3 * line_height)
+        self._board = ArrayBoard(pg.Rect(10, self._status.bottom + 10, width - 20, height - self._status.bottom - 20))
+        self._samples = np.zeros(columns, dtype=np.int64)
+        self._line_height = line_height
+
+    def show(self, progress: Progress, stats: dict):
+        """
+        Draws the sample of the file and the status lines
+
+        :param progress: the latest progress of the sort
+        :param stats: the (seconds, bytes) of every phase so far
+        """
+        self._board.set_values(self._samples)
+        self._board.draw(self._surface)
+        self._surface.fill((255, 255, 255), self._status)
+        lines = [f'{progress.phase}: {progress.done / max(progress.total, 1):.0%} of {progress.total >> 20} MiB']
+        lines.append('   '.join(f'{phase} {seconds:.2f} s {size / max(seconds, 1e-9) / (1 << 20):.0f} MiB/s'
+                                for phase, (seconds, size) in stats.items()))
+        for i, line in enumerate(lines):
+            position = self._status.left, self._status.top + i * self._line_height
+            self._surface.blit(render_text(self._font, line), position)
+        pg.display.flip()
+
+    def update(self, progress: Progress):
+        """
+        Stores the sampled values of the progress
+
+        :param progress: the progress of the sort
+        """
+        self._samples[progress.column:progress.column + len(progress.values)] = progress.values
+
+
+def run(input_path: str, output_path: str, budget: int, block: int, show: bool = False, tmp_dir: str = None) -> dict:
+    """
+    Runs the external sort, optionally in the live view, and measures the time and the throughput of every phase
+
+    :param input_path: the path of the file to sort
+    :param output_path: the path of the sorted file
+    :param budget: the bytes of the numbers held in memory at once
+    :param block: the bytes read from a run or written at once while merging
+    :param show: whether the progress is shown in a window, the view is refreshed at most 60 times per second
+    :param tmp_dir: the directory of the temporary files
+    :return: the (seconds, bytes) of every phase, None if the window was closed before the end
+    """
+    view = None
+    columns = 1000  # the columns of the view, the sample is not shown without it
+    if show:
+        init_pygame()
+        surface = pg.display.set_mode((1024, 768))
+        pg.display.set_caption('Sorting Visualizer - external sort')
+        surface.fill((255, 255, 255))
+        columns = surface.get_width() - 20
+        view = ExternalSortView(surface, columns)
+    stats = {}
+    progress = None
+    steps = external_sort(input_path, output_path, budget, block, columns, tmp_dir)
+    last_frame = 0.0
+    phase_start = perf_counter()
+    try:
+        for progress in steps:
+            now = perf_counter()
+            stats[progress.phase] = (now - phase_start + stats.get(progress.phase, (0.0, 0))[0], progress.done)
+            if view is not None:
+                view.update(progress)
+                if now - last_frame > 1 / 60:
+                    for event in pg.event.get():
+                        if event.type == pg.QUIT or event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
+                            return None
+                    view.show(progress, stats)
+                    last_frame = perf_counter()
+            phase_start = perf_counter()
+    finally:
+        steps.close()
+    if view is not None and progress is not None:
+        view.show(progress, stats)
+        # the final state is kept on the screen until a key is pressed, unless the window is headless
+        while pg.display.get_driver() != 'dummy' and not any(event.type == pg.QUIT or event.type == pg.KEYDOWN
+                                                             for event in pg.event.get()):
+            pg.time.wait(50)
+    return stats
+
+
+def make_input(path: str, n: int, seed: int = None, block: int = 1 << 20):
+    """
+    Writes uniformly distributed numbers between 1 and n to the file, generated in blocks
+
+    :param path: the path of the binary or text file
+    :param n: the number of the numbers
+    :param seed: the seed of the random generator
+    :param block: the number of the numbers generated at once
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, 'w' if _is_text(path) else 'wb') as f:
+        for lo in range(0, n, block):
+            values = rng.integers(1, n + 1, min(block, n - lo), dtype=np.int64)
+            if _is_text(path):
+                f.write('\n'.join(map(str, values.tolist())))
+                f.write('\n')
+            else:
+                values.astype(ITEM).tofile(f)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Sorts an integer file larger than the memory')
+    parser.add_argument('input', help='the binary (little-endian int64) or .csv/.txt file to sort')
+    parser.add_argument('-o', '--output', help='the sorted file, binary or .csv/.txt')
+    parser.add_argument('--budget', default='64M', help='the memory for the numbers, e.g. 512K, 64M, 1G')
+    parser.add_argument('--block', default='1M', help='the size of the reads and writes while merging')
+    parser.add_argument('--show', action='store_true', help='show the progress in a window')
+    parser.add_argument('--tmp-dir', help='the directory of the spilled runs')
+    parser.add_argument('--make', type=int, metavar='N', help='write N random numbers to the input file and exit')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    if args.make is not None:
+        make_input(args.input, args.make, args.seed)
+        return
+    if not args.output:
+        parser.error('the output file is required')
+    try:
+        stats = run(args.input, args.output, parse_size(args.budget), parse_size(args.block), args.show, args.tmp_dir)
+    except ValueError as e:
+        parser.error(str(e))
+    if stats is None:
+        print('cancelled')
+        return
+    for phase, (seconds, size) in stats.items():
+        print(f'{phase:<10}{seconds:>10.3f} s{size / max(seconds, 1e-9) / (1 << 20):>10.1f} MiB/s')
+
+
+if __name__ == '__main__':
+    main()
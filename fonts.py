@@ -0,0 +1,75 @@
+"""
+Resolution of the system fonts. pygame's SysFont scans all installed fonts on its first use (through fc-list on Linux),
+which takes most of the startup time, so the resolved paths are cached in a JSON file and the scan only runs for the
+fonts missing from it. Delete the file to pick up newly installed fonts.
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Optional
+
+import pygame as pg
+
+from paths import CACHE_DIR
+
+FONT_CACHE = os.path.join(CACHE_DIR, 'fonts.json')
+
+
+def _read_cache(path: str) -> dict:
+    """
+    Reads the cached font paths, a missing or corrupted cache is treated as empty
+
+    :param path: the path of the cache file
+    :return: the font paths by the font names, None for the fonts which are not installed
+    """
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _write_cache(path: str, cache: dict):
+    """
+    Writes the cached font paths atomically, the cache is skipped if it cannot be written
+
+    :param path: the path of the cache file
+    :param cache: the font paths by the font names
+    """
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(cache, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def resolve_font(name: str, cache_path: str = FONT_CACHE) -> Optional[str]:
+    """
+    Returns the path of the system font, scanning the installed fonts only if the font is not cached yet
+
+    :param name: the name of the font, as accepted by pygame's SysFont
+    :param cache_path: the path of the cache file
+    :return: the path of the font file, None for pygame's default font if the font is not installed
+    """
+    cache = _read_cache(cache_path)
+    if name in cache and (cache[name] is None or os.path.exists(cache[name])):
+        return cache[name]
+    cache[name] = pg.font.match_font(name)
+    _write_cache(cache_path, cache)
+    return cache[name]
+
+
+@lru_cache(maxsize=None)
+def load_font(name: str, size: int) -> pg.font.Font:
+    """
+    Loads the system font, falling back to pygame's default font like SysFont, the fonts are cached by the name and size
+
+    :param name: the name of the font
+    :param size: the size of the font
+    :return: pygame Font
+    """
+    return pg.font.Font(resolve_font(name), size)
@@ -0,0 +1,377 @@
+"""
+Parallel sorting algorithms. The array is copied to shared memory and sorted in phases, the work of a phase is split
+into regions processed at once by a pool of worker processes. The workers change the shared array directly and send
+back only the packed operations they performed, which are yielded after the LANE operations marking the region of every
+worker, interleaved across the workers as if they ran in lockstep.
+"""
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, zip_longest
+from multiprocessing.shared_memory import SharedMemory
+from typing import Iterator
+
+from algorithms import ALLOC, COMPARE, FREE, HIGHLIGHT, LANE, OpCode, Operation, SWAP, WRITE, _merge, tim_sort
+
+WORKERS = 4  # the default number of the worker processes
+_MIN_REGION = 16  # the smallest region worth a worker of its own
+_OPCODES = tuple(OpCode)
+
+
+@contextmanager
+def _shared(nums: list) -> Iterator[str]:
+    """
+    Copies the numbers into a new shared memory block, which is freed on exit
+
+    :param nums: the numbers to copy
+    :return: the name of the block the workers attach to
+    """
+    shm = SharedMemory(create=True, size=8 * len(nums))
+    try:
+        shared = shm.buf[:8 * len(nums)].cast('q')
+        shared[:] = array('q', nums)
+        shared.release()
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+@contextmanager
+def _attached(name: str, n: int) -> Iterator[memoryview]:
+    """
+    Attaches a worker to the shared memory block
+
+    :param name: the name of the block
+    :param n: the number of the numbers in the block
+    :return: the int64 view of the numbers
+    """
+    shm = SharedMemory(name)
+    shared = shm.buf[:8 * n].cast('q')
+    try:
+        yield shared
+    finally:
+        shared.release()
+        shm.close()
+
+
+def _pack(ops: Iterator[Operation], offset: int = 0) -> array:
+    """
+    Packs the operations of a worker into a flat array of (opcode, a, b) triples, which is cheap to send to the main
+    process
+
+    :param ops: the operations performed on a region of the shared array
+    :param offset: the index of the region within the shared array, added to the indices of the operations
+    :return: the packed operations
+    """
+    packed = array('q')
+    for code, a, b in ops:
+        if code == COMPARE or code == SWAP:
+            packed.extend((code, a + offset, b + offset))
+        elif code == ALLOC or code == FREE:
+            packed.extend((code, a, b))
+        else:
+            packed.extend((code, a + offset, b))
+    return packed
+
+
+def _unpack(packed: array) -> Iterator[Operation]:
+    """
+    Unpacks the operations packed by a worker
+
+    :param packed: the flat array of (opcode, a, b) triples
+    """
+    for i in range(0, len(packed), 3):
+        yield Operation(_OPCODES[packed[i]], packed[i + 1], packed[i + 2])
+
+
+def _sort_region(name: str, n: int, lo: int, hi: int) -> array:
+    """
+    Worker task sorting a region of the shared array with the Timsort algorithm
+
+    :param name: the name of the shared memory block
+    :param n: the number of the numbers in the block
+    :param lo: the first index of the region
+    :param hi: the index past the last one of the region
+    :return: the packed operations
+    """
+    with _attached(name, n) as shared:
+        part = shared[lo:hi].tolist()
+        packed = _pack(tim_sort(part), lo)
+        shared[lo:hi] = array('q', part)
+    return packed
+
+
+def _merge_regions(name: str, n: int, lo: int, mid: int, hi: int) -> array:
+    """
+    Worker task merging two adjacent sorted regions of the shared array
+
+    :param name: the name of the shared memory block
+    :param n: the number of the numbers in the block
+    :param lo: the first index of the left region
+    :param mid: the first index of the right region
+    :param hi: the index past the last one of the right region
+    :return: the packed operations
+    """
+    with _attached(name, n) as shared:
+        left = shared[lo:mid].tolist()
+        right = shared[mid:hi].tolist()
+        return _pack(chain((Operation(ALLOC, hi - lo),), _merge(shared, left, right, lo), (Operation(FREE, hi - lo),)))
+
+
+def _compare_exchange(name: str, n: int, lo: int, hi: int, j: int, mask: int) -> array:
+    """
+    Worker task performing the comparators of a bitonic network step which start in the given region, the number i is
+    compared with the number i ^ mask for every i without the bit j, the missing numbers past the end of the array are
+    treated as infinite, so their comparators are skipped
+
+    :param name: the name of the shared memory block
+    :param n: the number of the numbers in the block
+    :param lo: the first index of the region
+    :param hi: the index past the last one of the region
+    :param j: the distance bit of the step
+    :param mask: the mask giving the partner of a number
+    :return: the packed operations
+    """
+    packed = array('q')
+    with _attached(name, n) as shared:
+        for i in range(lo, hi):
+            partner = i ^ mask
+            if i & j or partner >= n:
+                continue
+            packed.extend((COMPARE, i, partner))
+            if shared[i] > shared[partner]:
+                shared[i], shared[partner] = shared[partner], shared[i]
+                packed.extend((SWAP, i, partner))
+    return packed
+
+
+def _gather(name: str, source: str, n: int, lo: int, pieces: list) -> array:
+    """
+    Worker task copying the pieces of the source block belonging to its bucket to the bucket's region of the shared
+    array
+
+    :param name: the name of the shared memory block
+    :param source: the name of the block with the copy of the array the pieces are taken from
+    :param n: the number of the numbers in the blocks
+    :param lo: the first index of the bucket's region
+    :param pieces: the (first index, index past the last one) pairs of the pieces, in order
+    :return: the packed operations
+    """
+    packed = array('q')
+    with _attached(name, n) as shared, _attached(source, n) as copy:
+        k = lo
+        for start, end in pieces:
+            for i in range(start, end):
+                shared[k] = copy[i]
+                packed.extend((WRITE, k, copy[i]))
+                k += 1
+    return packed
+
+
+def _bounds(n: int, parts: int) -> list:
+    """
+    Splits the array into equal regions
+
+    :param n: the length of the array
+    :param parts: the number of the regions
+    :return: the first indices of the regions followed by n
+    """
+    return [n * p // parts for p in range(parts + 1)]
+
+
+def _workers(n: int, workers: int) -> int:
+    """
+    Returns the number of the workers the array of the given length is split between
+
+    :param n: the length of the array
+    :param workers: the maximal number of the workers
+    """
+    return max(1, min(workers, n // _MIN_REGION))
+
+
+def _run_phase(pool: ProcessPoolExecutor, nums: list, tasks: list) -> Iterator[Operation]:
+    """
+    Runs the tasks of a phase in the pool and yields their operations, the regions of the tasks are marked by the LANE
+    operations first and the numbers' list is updated along the operations
+
+    :param pool: the pool of the worker processes
+    :param nums: the list mirroring the shared array
+    :param tasks: the (first index, index past the last one, function, arguments) of every task, the regions ascending
+    """
+    futures = [pool.submit(function, *args) for _, _, function, args in tasks]
+    end = 0
+    for worker, (lo, hi, _, _) in enumerate(tasks):
+        if lo > end:
+            yield Operation(LANE, end, -1)
+        yield Operation(LANE, lo, worker)
+        end = hi
+    if end < len(nums):
+        yield Operation(LANE, end, -1)
+    for ops in zip_longest(*(_unpack(future.result()) for future in futures)):
+        for op in ops:
+            if op is None:
+                continue
+            if op.code == SWAP:
+                nums[op.a], nums[op.b] = nums[op.b], nums[op.a]
+            elif op.code == WRITE:
+                nums[op.a] = op.b
+            yield op
+
+
+def _sort_regions(pool: ProcessPoolExecutor, nums: list, name: str, bounds: list) -> Iterator[Operation]:
+    """
+    Sorts every region of the array in a worker of its own
+
+    :param pool: the pool of the worker processes
+    :param nums: the list mirroring the shared array
+    :param name: the name of the shared memory block
+    :param bounds: the first indices of the regions followed by the length of the array
+    """
+    n = len(nums)
+    yield from _run_phase(pool, nums, [(lo, hi, _sort_region, (name, n, lo, hi))
+                                       for lo, hi in zip(bounds, bounds[1:]) if hi > lo])
+
+
+def bitonic_sort(nums: list, workers: int = WORKERS) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the bitonic sorting network, the comparators of every step are independent and split
+    between the workers, the array is padded to a power of two with virtual infinite numbers
+
+    :param nums: the array to sort
+    :param workers: the number of the worker processes
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    parts = _workers(n, workers)
+    bounds = _bounds(n, parts)
+    size = 1 << (n - 1).bit_length()
+    with _shared(nums) as name, ProcessPoolExecutor(parts) as pool:
+        k = 2
+        while k <= size:
+            # the first step compares the mirrored numbers of the blocks, making both halves bitonic sequences sorted
+            # ascending by the following steps, so all comparators point the same way
+            j, mask = k // 2, k - 1
+            while j:
+                yield from _run_phase(pool, nums, [(lo, hi, _compare_exchange, (name, n, lo, hi, j, mask))
+                                                   for lo, hi in zip(bounds, bounds[1:])])
+                j //= 2
+                mask = j
+            k *= 2
+    yield Operation(LANE, 0, -1)
+
+
+def _blocks_ordered(nums: list, bounds: list) -> Iterator[Operation]:
+    """
+    Compares the numbers around the boundaries of the sorted blocks
+
+    :param nums: the array with the sorted blocks
+    :param bounds: the first indices of the blocks followed by the length of the array
+    :return: whether the whole array is sorted
+    """
+    ordered = True
+    for b in bounds[1:-1]:
+        yield Operation(COMPARE, b - 1, b)
+        if nums[b - 1] > nums[b]:
+            ordered = False
+    return ordered
+
+
+def odd_even_merge_sort(nums: list, workers: int = WORKERS) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the odd-even transposition sort of blocks, every worker sorts its block, then the
+    even and odd pairs of the neighbouring blocks are merged alternately until the numbers around all boundaries of the
+    blocks are in order, which takes about as many rounds as there are blocks
+
+    :param nums: the array to sort
+    :param workers: the number of the worker processes
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    parts = _workers(n, workers)
+    bounds = _bounds(n, parts)
+    with _shared(nums) as name, ProcessPoolExecutor(parts) as pool:
+        yield from _sort_regions(pool, nums, name, bounds)
+        round_ = 0
+        while not (yield from _blocks_ordered(nums, bounds)):
+            tasks = [(bounds[b], bounds[b + 2], _merge_regions, (name, n, bounds[b], bounds[b + 1], bounds[b + 2]))
+                     for b in range(round_ % 2, parts - 1, 2)]
+            yield from _run_phase(pool, nums, tasks)
+            round_ += 1
+    yield Operation(LANE, 0, -1)
+
+
+def parallel_merge_sort(nums: list, workers: int = WORKERS) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the parallel merge sort algorithm, every worker sorts its region, then the pairs of
+    the neighbouring regions are merged in parallel, halving the number of the busy workers every round
+
+    :param nums: the array to sort
+    :param workers: the number of the worker processes
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    parts = _workers(n, workers)
+    bounds = _bounds(n, parts)
+    with _shared(nums) as name, ProcessPoolExecutor(parts) as pool:
+        yield from _sort_regions(pool, nums, name, bounds)
+        while len(bounds) > 2:
+            yield from _run_phase(pool, nums, [
+                (bounds[b], bounds[b + 2], _merge_regions, (name, n, bounds[b], bounds[b + 1], bounds[b + 2]))
+                for b in range(0, len(bounds) - 2, 2)])
+            # an odd region left without a pair is merged in the next round
+            bounds = bounds[::2] if len(bounds) % 2 else bounds[::2] + [n]
+    yield Operation(LANE, 0, -1)
+
+
+def sample_sort(nums: list, workers: int = WORKERS, oversampling: int = 8) -> Iterator[Operation]:
+    """
+    Sorts the numbers' array using the sample sort algorithm, every worker sorts its region, the splitters picked from
+    the samples of the regions divide the numbers into a bucket per worker, the workers gather the pieces of their
+    buckets from all regions and sort them
+
+    :param nums: the array to sort
+    :param workers: the number of the worker processes
+    :param oversampling: the number of the samples taken from every region
+    """
+    n = len(nums)
+    if n < 2:
+        return
+    parts = _workers(n, workers)
+    bounds = _bounds(n, parts)
+    with _shared(nums) as name, ProcessPoolExecutor(parts) as pool:
+        yield from _sort_regions(pool, nums, name, bounds)
+
+        yield Operation(LANE, 0, -1)
+        samples = []
+        for lo, hi in zip(bounds, bounds[1:]):
+            for s in range(oversampling):
+                i = lo + (hi - lo) * (2 * s + 1) // (2 * oversampling)
+                yield Operation(HIGHLIGHT, i)
+                samples.append(nums[i])
+        samples.sort()
+        splitters = [samples[len(samples) * b // parts] for b in range(1, parts)]
+
+        # the pieces of the sorted regions falling into every bucket
+        cuts = [[lo] + [bisect_right(nums, splitter, lo, hi) for splitter in splitters] + [hi]
+                for lo, hi in zip(bounds, bounds[1:])]
+        tasks = []
+        start = 0
+        for b in range(parts):
+            pieces = [(region[b], region[b + 1]) for region in cuts]
+            end = start + sum(piece_end - piece_start for piece_start, piece_end in pieces)
+            if end > start:
+                tasks.append((start, end, pieces))
+            start = end
+
+        yield Operation(ALLOC, n)
+        with _shared(nums) as source:
+            yield from _run_phase(pool, nums, [(lo, hi, _gather, (name, source, n, lo, pieces))
+                                               for lo, hi, pieces in tasks])
+        yield Operation(FREE, n)
+        yield from _run_phase(pool, nums, [(lo, hi, _sort_region, (name, n, lo, hi)) for lo, hi, _ in tasks])
+    yield Operation(LANE, 0, -1)
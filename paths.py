@@ -0,0 +1,8 @@
+"""
+Locations of the files the program keeps between runs. Kept apart from the modules using pygame, so the caches can be
+found without importing it.
+"""
+import os
+
+CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+                         'sorting-visualizer')
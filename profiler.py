@@ -0,0 +1,110 @@
+"""
+Profiler of the render loop. Every frame is split into sections timed separately, the durations of the last frames are
+kept in rolling windows, so the percentiles show which part of the loop the time is spent in.
+"""
+from collections import deque
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+# the timed parts of a frame, 'frame' is the whole frame without waiting for the clock
+SECTIONS = ('events', 'sort', 'update_bars', 'draw_bars', 'draw_buttons', 'display', 'frame')
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of the sorted values
+
+    :param sorted_values: the sorted values
+    :param fraction: the percentile as a fraction between 0 and 1
+    :return: the percentile value, 0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(fraction * len(sorted_values)), len(sorted_values) - 1)]
+
+
+class FrameProfiler:
+    """
+    Times the sections of every frame and counts the frames which took longer than the frame budget of the clock
+    """
+    def __init__(self, window: int = 600, frame_time: float = 1 / 60):
+        """
+        :param window: the number of the last frames the percentiles are computed from
+        :param frame_time: the duration of a frame in seconds, the frames taking longer are counted as dropped
+        """
+        self._frame_time = frame_time
+        self._samples = {section: deque(maxlen=window) for section in SECTIONS}
+        self._current = dict.fromkeys(SECTIONS, 0.0)
+        self._frame_start = None
+        self._frames = 0
+        self._dropped = 0
+
+    def begin_frame(self):
+        """
+        Starts timing a new frame
+        """
+        self._current = dict.fromkeys(SECTIONS, 0.0)
+        self._frame_start = perf_counter()
+
+    @contextmanager
+    def measure(self, section: str) -> Iterator[None]:
+        """
+        Adds the time spent in the with block to the section of the current frame, the sections are timed inclusively
+
+        :param section: the name of the section, one of SECTIONS
+        """
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self._current[section] += perf_counter() - start
+
+    def end_frame(self):
+        """
+        Stores the section times of the finished frame, called before waiting for the clock
+        """
+        if self._frame_start is None:
+            return
+        self._current['frame'] = perf_counter() - self._frame_start
+        for section, seconds in self._current.items():
+            self._samples[section].append(seconds)
+        self._frames += 1
+        if self._current['frame'] > self._frame_time:
+            self._dropped += 1
+        self._frame_start = None
+
+    def percentiles(self, section: str) -> tuple:
+        """
+        Returns the p50, p95 and p99 of the section times over the window
+
+        :param section: the name of the section, one of SECTIONS
+        :return: the percentiles in seconds
+        """
+        ordered = sorted(self._samples[section])
+        return tuple(percentile(ordered, fraction) for fraction in (0.5, 0.95, 0.99))
+
+    def report(self) -> str:
+        """
+        Returns the table of the section percentiles in milliseconds and the number of the dropped frames
+        """
+        lines = [f'{"section":<14}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}']
+        for section in SECTIONS:
+            p50, p95, p99 = self.percentiles(section)
+            lines.append(f'{section:<14}{p50 * 1000:>10.3f}{p95 * 1000:>10.3f}{p99 * 1000:>10.3f}')
+        lines.append(f'dropped frames: {self._dropped} of {self._frames}')
+        return '\n'.join(lines)
+
+    @property
+    def frames(self) -> int:
+        """
+        Getter for the number of the profiled frames
+        """
+        return self._frames
+
+    @property
+    def dropped(self) -> int:
+        """
+        Getter for the number of the frames which took longer than the frame budget
+        """
+        return self._dropped
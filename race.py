@@ -0,0 +1,376 @@
+"""
+Race mode, several sorting algorithms sort the same array side by side. The operations of every algorithm are computed
+in a separate worker process and written to a trace file, the UI process only replays and draws the traces.
+
+Usage: python race.py bubble quick heap [--number 200] [--seed 0]
+"""
+import argparse
+import math
+import multiprocessing as mp
+import os
+import random as rnd
+import tempfile
+from collections import deque
+from itertools import islice
+from multiprocessing.connection import Connection
+from time import perf_counter
+
+import pygame as pg
+
+from algorithms import ALGORITHMS, ALLOC, FREE, LANE, SWAP, WRITE
+from fonts import load_font
+from scheduler import Scheduler
+from sorting_visualizer import array_length, init_pygame, render_text
+from trace_cache import MAX_BYTES, TraceCache
+from traces import Trace, record
+
+
+class RaceBoard:
+    """
+    Board of a single algorithm in the race, the bars are drawn per pixel column and only the columns of the changed
+    numbers are redrawn
+    """
+    def __init__(self, name: str, nums: list, rect: pg.Rect, font: pg.font.Font, color: tuple = (0, 0, 0),
+                 select_color: tuple = (200, 0, 0)):
+        """
+        :param name: the name of the algorithm
+        :param nums: the array to sort, the board sorts its own copy
+        :param rect: the area of the board on the screen, including the label
+        :param font: the font of the label
+        :param color: the color of the bars
+        :param select_color: the color of the selected bar
+        """
+        self._name = name
+        self._nums = list(nums)
+        self._font = font
+        self._label_rect = pg.Rect(rect.topleft, (rect.width, font.get_height() + 4))
+        self._rect = pg.Rect(rect.left, self._label_rect.bottom, rect.width, rect.height - self._label_rect.height)
+        self._color = color
+        self._select_color = select_color
+        n = len(self._nums)
+        self._columns = min(n, self._rect.width)
+        # indices of the numbers drawn in every pixel column, the column shows the largest of them
+        self._bounds = [c * n // max(self._columns, 1) for c in range(self._columns + 1)]
+        self._column_of = [c for c in range(self._columns) for _ in range(self._bounds[c], self._bounds[c + 1])]
+        self._scale = self._rect.height / max(max(self._nums, default=1), 1)
+        self._trace = None
+        self._steps = None
+        self._operations = 0
+        self._finished = False
+        self._failed = False
+        self._selected = None
+        self._dirty = set(range(self._columns))  # columns to redraw
+        self._label_changed = True
+
+    def start(self, trace: Trace):
+        """
+        Starts replaying the computed operations of the algorithm
+
+        :param trace: the trace with the operations
+        """
+        self._trace = trace
+        self._steps = trace.replay(self._nums)
+        self._label_changed = True
+
+    def fail(self):
+        """
+        Marks the board as failed, when computing the operations of the algorithm raised an error
+        """
+        self._failed = True
+        self._label_changed = True
+
+    def advance(self, count: int):
+        """
+        Performs the next operations of the algorithm
+
+        :param count: the number of operations to perform
+        """
+        if self._steps is None or self._finished:
+            return
+        dirty = self._dirty
+        column_of = self._column_of
+        selected = None
+        consumed = 0
+        for op in islice(self._steps, count):
+            consumed += 1
+            if op.code == SWAP:
+                dirty.add(column_of[op.a])
+                dirty.add(column_of[op.b])
+            elif op.code == WRITE:
+                dirty.add(column_of[op.a])
+            elif op.code == ALLOC or op.code == FREE or op.code == LANE:
+                continue
+            selected = op.a
+        self._operations += consumed
+        if selected is not None:
+            if self._selected is not None:
+                dirty.add(self._selected)
+            self._selected = column_of[selected]
+            dirty.add(self._selected)
+        if consumed < count:
+            self._finished = True
+            if self._selected is not None:
+                dirty.add(self._selected)
+            self._selected = None
+        self._label_changed = True
+
+    def _column_rect(self, column: int) -> pg.Rect:
+        """
+        Returns the area of the board taken by the given pixel column
+
+        :param column: the index of the column
+        :return: pygame Rect of the column
+        """
+        left = self._rect.left + column * self._rect.width // self._columns
+        right = self._rect.left + (column + 1) * self._rect.width // self._columns
+        return pg.Rect(left, self._rect.top, right - left, self._rect.height)
+
+    def draw(self, surface: pg.Surface) -> list:
+        """
+        Redraws the changed columns and the label of the board
+
+        :param surface: pygame Surface to draw the board onto
+        :return: the list of the redrawn areas
+        """
+        rects = []
+        for column in self._dirty:
+            column_rect = self._column_rect(column)
+            height = int(max(self._nums[self._bounds[column]:self._bounds[column + 1]]) * self._scale)
+            surface.fill((255, 255, 255), column_rect)
+            color = self._select_color if column == self._selected else self._color
+            surface.fill(color, pg.Rect(column_rect.left, column_rect.bottom - height, column_rect.width, height))
+            rects.append(column_rect)
+        self._dirty.clear()
+        if self._label_changed:
+            state = ('failed' if self._failed else 'done' if self._finished else 'computing' if self._trace is None
+                     else 'sorting')
+            text = render_text(self._font, f'{self._name.capitalize()}: {self._operations} ops ({state})')
+            surface.fill((255, 255, 255), self._label_rect)
+            surface.blit(text, self._label_rect.topleft)
+            rects.append(self._label_rect)
+            self._label_changed = False
+        return rects
+
+    def close(self):
+        """
+        Stops the replay and closes the trace
+        """
+        self._steps = None
+        if self._trace:
+            self._trace.close()
+
+    @property
+    def finished(self) -> bool:
+        """
+        Getter for the information whether the algorithm finished sorting
+        """
+        return self._finished
+
+    @property
+    def failed(self) -> bool:
+        """
+        Getter for the information whether computing the operations of the algorithm failed
+        """
+        return self._failed
+
+
+def _compute(name: str, nums: list, path: str, trace_cache: TraceCache, conn: Connection):
+    """
+    Worker process computing the operations of the algorithm, the path of the trace file is sent through the pipe once
+    it is written; a worker exiting without sending it has failed
+
+    :param name: the name of the algorithm
+    :param nums: the numbers to sort
+    :param path: the path the trace file is recorded or linked to
+    :param trace_cache: the cache of the computed traces, None to always run the algorithm
+    :param conn: the sending end of the pipe to the UI process
+    """
+    if trace_cache is not None:
+        path = trace_cache.path(name, nums, path)
+    else:
+        record(name, nums, path)
+    conn.send(path)
+    conn.close()
+
+
+class _Workers:
+    """
+    Worker processes computing the traces of the racing algorithms, at most the given number of them run at a time
+    """
+    def __init__(self, tasks: list, nums: list, tmp_dir: str, workers: int, trace_cache: TraceCache = None):
+        """
+        :param tasks: the (algorithm name, tag) of the traces to compute, the tag is returned with the trace
+        :param nums: the numbers to sort
+        :param tmp_dir: the directory the trace files are recorded or linked to
+        :param workers: the number of the worker processes running at once
+        :param trace_cache: the cache of the computed traces, None to always run the algorithms
+        """
+        self._pending = deque(enumerate(tasks))
+        self._nums = nums
+        self._tmp_dir = tmp_dir
+        self._workers = workers
+        self._trace_cache = trace_cache
+        self._running = {}  # the receiving ends of the pipes and the tags by the running processes
+
+    def poll(self) -> list:
+        """
+        Collects the finished workers and starts the pending ones in their place
+
+        :return: the (tag, path of the trace file) of the finished workers, the path is None if the worker failed
+        """
+        finished = []
+        for process, (receiver, tag) in list(self._running.items()):
+            alive = process.is_alive()  # checked first, so a result sent right before exiting is read
+            if receiver.poll():
+                try:
+                    finished.append((tag, receiver.recv()))
+                except EOFError:  # exited without sending the path
+                    finished.append((tag, None))
+            elif alive:
+                continue
+            else:
+                finished.append((tag, None))
+            del self._running[process]
+            receiver.close()
+            process.join()
+        while self._pending and len(self._running) < self._workers:
+            i, (name, tag) = self._pending.popleft()
+            receiver, sender = mp.Pipe(duplex=False)
+            # not a daemon, so the parallel algorithms can start their own worker processes
+            process = mp.Process(target=_compute, args=(name, self._nums, os.path.join(self._tmp_dir, f'{i}.svt'),
+                                                        self._trace_cache, sender))
+            process.start()
+            sender.close()
+            self._running[process] = receiver, tag
+        return finished
+
+    def close(self):
+        """
+        Kills the running workers instead of waiting for the slow algorithms to finish; SIGTERM would only be queued as
+        a quit event by SDL's handler inherited from the UI process
+        """
+        for process, (receiver, _) in self._running.items():
+            process.kill()
+            receiver.close()
+        for process in self._running:
+            process.join()
+        self._running.clear()
+        self._pending.clear()
+
+    @property
+    def processes(self) -> list:
+        """
+        Getter for the running worker processes
+        """
+        return list(self._running)
+
+
+class Race:
+    """
+    Grid of boards, one per algorithm, all sorting the same array
+    """
+    def __init__(self, names: list, nums: list, ops_per_second: float = 600, workers: int = None,
+                 trace_cache: TraceCache = None):
+        """
+        :param names: the names of the racing algorithms
+        :param nums: the array to sort, every algorithm sorts its own copy
+        :param ops_per_second: the number of operations every algorithm performs per second
+        :param workers: the number of worker processes, by default one per algorithm up to the number of CPUs
+        :param trace_cache: the cache the traces are looked up in and stored to, None to always run the algorithms
+        """
+        self._names = names
+        self._nums = list(nums)
+        self._scheduler = Scheduler(ops_per_second)
+        self._workers = workers or min(len(names), os.cpu_count() or 1)
+        self._font = load_font('calibri', 18)
+        self._trace_cache = trace_cache
+
+    def _layout(self, surface: pg.Surface) -> list:
+        """
+        Splits the surface into the grid of boards
+
+        :param surface: pygame Surface to draw the boards onto
+        :return: the list of the boards
+        """
+        cols = math.ceil(math.sqrt(len(self._names)))
+        rows = math.ceil(len(self._names) / cols)
+        margin = 10
+        cell_w = (surface.get_width() - margin) // cols
+        cell_h = (surface.get_height() - margin) // rows
+        return [RaceBoard(name, self._nums,
+                          pg.Rect(margin + i % cols * cell_w, margin + i // cols * cell_h, cell_w - margin,
+                                  cell_h - margin), self._font)
+                for i, name in enumerate(self._names)]
+
+    def run(self, surface: pg.Surface, clock: pg.time.Clock) -> bool:
+        """
+        Runs the race until it is left with the Escape key
+
+        :param surface: the display surface to draw the boards onto
+        :param clock: the clock limiting the frame rate
+        :return: False if the window was closed, True otherwise
+        """
+        boards = self._layout(surface)
+        surface.fill((255, 255, 255))
+        pg.display.flip()
+        paused = False
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            workers = _Workers(list(zip(self._names, boards)), self._nums, tmp_dir, self._workers, self._trace_cache)
+            try:
+                while True:
+                    for event in pg.event.get():
+                        if event.type == pg.QUIT:
+                            return False
+                        if event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE:
+                            return True
+                        if event.type == pg.KEYDOWN and event.key == pg.K_SPACE:
+                            paused = not paused
+                            self._scheduler.reset()
+                    for board, path in workers.poll():
+                        if path is None:  # the other algorithms keep racing
+                            board.fail()
+                            continue
+                        try:
+                            board.start(Trace(path))
+                        except Exception:
+                            board.fail()
+                    if not paused:
+                        count = self._scheduler.batch()
+                        start = perf_counter()
+                        for board in boards:
+                            board.advance(count)
+                        self._scheduler.report(count, perf_counter() - start)
+                    rects = []
+                    for board in boards:
+                        rects.extend(board.draw(surface))
+                    if rects:
+                        pg.display.update(rects)
+                    clock.tick(60)
+            finally:
+                workers.close()
+                for board in boards:
+                    board.close()
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Races several sorting algorithms on the same array')
+    parser.add_argument('algorithms', nargs='*', choices=list(ALGORITHMS), help='all algorithms if not given')
+    parser.add_argument('--number', type=array_length, default=200, help='the length of the generated array')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--ops-per-second', type=float, default=600)
+    parser.add_argument('--trace-cache-size', type=float, default=MAX_BYTES / 2 ** 20, metavar='MIB',
+                        help='the size limit of the cache of the computed traces, 0 to disable the cache')
+    args = parser.parse_args(argv)
+
+    rng = rnd.Random(args.seed)
+    nums = [rng.randint(1, 600) for _ in range(args.number)]
+    init_pygame()
+    surface = pg.display.set_mode((1024, 768))
+    pg.display.set_caption('Sorting Visualizer - race')
+    trace_cache = TraceCache(max_bytes=int(args.trace_cache_size * 2 ** 20)) if args.trace_cache_size > 0 else None
+    Race(args.algorithms or list(ALGORITHMS), nums, args.ops_per_second,
+         trace_cache=trace_cache).run(surface, pg.time.Clock())
+
+
+if __name__ == '__main__':
+    main()
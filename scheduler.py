@@ -0,0 +1,90 @@
+"""
+Scheduling of the sorting algorithms' operations over the frames, so every algorithm runs at the same, user-set rate of
+operations per second regardless of the frame rate and the cost of its operations.
+"""
+import math
+from time import perf_counter
+
+UNTHROTTLED = math.inf
+# the rates the speed can be switched between, in operations per second
+SPEEDS = (1, 2, 5, 10, 20, 50, 100, 200, 600, 1000, 2000, 5000, 10000, 20000, 50000, 100000, UNTHROTTLED)
+
+
+class Scheduler:
+    """
+    Decides how many operations are performed in the next frame. The number follows the time elapsed since the previous
+    frame, and it is capped by the number of operations that fit in the frame, estimated from the measured cost of the
+    previous batches
+    """
+    def __init__(self, rate: float = 600, frame_time: float = 1 / 60, budget: float = 0.75):
+        """
+        :param rate: the target number of operations per second, UNTHROTTLED to fill the whole frame budget
+        :param frame_time: the duration of a frame in seconds
+        :param budget: the fraction of the frame the operations may take, the rest is left for drawing
+        """
+        self._rate = rate
+        self._frame_time = frame_time
+        self._budget = budget
+        self._op_cost = 0.0  # moving average of the time of a single operation in seconds
+        self._credit = 0.0  # the fraction of an operation carried over to the next frame
+        self._last = None
+
+    def reset(self):
+        """
+        Starts the scheduling anew, used when the sort is started, so the time it was stopped is not caught up
+        """
+        self._credit = 0.0
+        self._last = None
+
+    def capacity(self) -> int:
+        """
+        Returns the number of operations fitting in the frame budget, by the measured cost of an operation
+        """
+        if not self._op_cost:
+            return 1
+        return max(int(self._frame_time * self._budget / self._op_cost), 1)
+
+    def batch(self) -> int:
+        """
+        Returns the number of operations to perform in the current frame
+        """
+        now = perf_counter()
+        elapsed = self._frame_time if self._last is None else min(now - self._last, 0.25)
+        self._last = now
+        if self._rate == UNTHROTTLED:
+            return self.capacity()
+        self._credit += self._rate * elapsed
+        count = int(self._credit)
+        if count > self.capacity():
+            # the operations are too expensive to keep the rate, the backlog is dropped instead of growing
+            count = self.capacity()
+            self._credit = 0.0
+        else:
+            self._credit -= count
+        return count
+
+    def report(self, count: int, seconds: float):
+        """
+        Updates the measured cost of an operation
+
+        :param count: the number of performed operations
+        :param seconds: the time the operations took
+        """
+        if count:
+            cost = seconds / count
+            self._op_cost = cost if not self._op_cost else self._op_cost * 0.8 + cost * 0.2
+
+    @property
+    def rate(self) -> float:
+        """
+        Getter for the target number of operations per second
+        """
+        return self._rate
+
+    @rate.setter
+    def rate(self, rate: float):
+        """
+        Setter for the target number of operations per second
+        """
+        self._rate = rate
+        self.reset()
@@ -1,8 +1,84 @@
+import argparse
 import pygame as pg
 import random as rnd
-from typing import Union
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum, auto
+from functools import lru_cache, partial
+from itertools import islice
+from time import perf_counter
+from typing import Iterator, Optional, Union
+
+from algorithms import ALGORITHMS, ALLOC, FREE, LANE, SWAP, WRITE, Operation
+from counters import Counters, append_csv
+from engine import SortEngine
+from fonts import load_font
+from profiler import SECTIONS, FrameProfiler
+from scheduler import SPEEDS, UNTHROTTLED, Scheduler
+from timeline import Timeline
+from trace_cache import MAX_BYTES, TraceCache
+from traces import Trace, replay
+
+try:
+    import numpy as np
+    from boards import ArrayBoard, BucketBoard
+    from workloads import DISTRIBUTIONS, generate
+except ImportError:  # NumPy is needed only for the numpy backend, the arrays longer than the board's width and the
+    np = None        # input distributions other than the uniform one
+    DISTRIBUTIONS = {'random': None}
+
+
+def init_pygame():
+    """
+    Initializes only the pygame subsystems the visualizer uses, the display and the font, unlike pg.init() which brings
+    up the audio and the joysticks too; initializing an already initialized subsystem does nothing
+    """
+    pg.display.init()
+    pg.font.init()
+
 
-pg.init()
+@lru_cache(maxsize=None)
+def load_image(image_path: str, image_size: tuple = None) -> pg.Surface:
+    """
+    Loads the image from the disk and scales it, the surfaces are cached by the path and size
+
+    :param image_path: a path to the image
+    :param image_size: the size to scale the image to, the original size is kept if not given
+    :return: pygame Surface with the image
+    """
+    image = pg.image.load(image_path)
+    return pg.transform.scale(image, image_size) if image_size else image
+
+
+def array_length(text: str) -> int:
+    """
+    Parses the length of the generated array given on the command line
+
+    :param text: the length
+    :return: the length, at least 1
+    :raises argparse.ArgumentTypeError: if the length is not a positive integer
+    """
+    try:
+        length = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid length: {text!r}')
+    if length < 1:
+        raise argparse.ArgumentTypeError(f'the length has to be at least 1, got {length}')
+    return length
+
+
+@lru_cache(maxsize=256)
+def render_text(font: pg.font.Font, text: str, color: tuple = (0, 0, 0)) -> pg.Surface:
+    """
+    Renders the antialiased text, the surfaces are cached by the font, text and color
+
+    :param font: the font to render the text with
+    :param text: the text to render
+    :param color: the color of the text (RGB)
+    :return: pygame Surface with the rendered text
+    """
+    return font.render(text, True, color)
 
 
 class MyRect(pg.Rect):
@@ -78,6 +154,28 @@ class Cycle:
         return self._c[self._index]
 
 
+class Command(Enum):
+    """
+    Commands issued by the user, the input is polled once per frame and the queued commands are executed before the
+    next batch of the sort's operations
+    """
+    START_STOP = auto()
+    GENERATE = auto()
+    NEXT_SORT = auto()
+    NEXT_DISTRIBUTION = auto()
+    PREVIOUS_SORT = auto()
+    EXIT = auto()
+    SEEK = auto()  # the argument is the fraction of the recorded timeline
+    STEP_BACK = auto()
+    STEP_FORWARD = auto()
+    SEEK_START = auto()
+    SEEK_END = auto()
+    SPEED_UP = auto()
+    SLOW_DOWN = auto()
+    RACE = auto()
+    PROFILER = auto()
+
+
 class Button:
     def __init__(self, position: tuple, size: tuple, border: int = 0, color: tuple = (255, 255, 255),
                  image_path: str = None, image_size: tuple = None, font: pg.font.Font = None, text: str = None,
@@ -102,29 +200,41 @@ class Button:
         self._center_text = center_text
         self._image_path = image_path
         self._image_size = image_size if image_size else size
-        if image_path:
-            self._image = pg.image.load(image_path)
-            self._image = pg.transform.scale(self._image, self._image_size)
-        else:
-            self._image = None
-        self._org_image = self._image
-        self._surface = pg.Surface(self._size, flags=pg.SRCALPHA)
+        self._org_image_path = self._image_path
+        self._org_image_size = self._image_size
+        self._surface = None  # drawn on the first blit, so the images are loaded only when shown
+        self._stale = True  # whether the surface has to be redrawn before the next blit
         self._color = color
         self._org_color = color
         self._clickable = clickable
+        self._changed = True
         self._draw()
 
     def _draw(self):
+        """
+        Marks the button as changed, its surface is redrawn before it is blitted next
+        """
+        self._changed = True
+        self._stale = True
+        self._rect = pg.Rect(self._position, self._size)
+        if self._image_path:
+            self._rect = pg.Rect((0, 0), self._image_size)
+            self._rect.center = tuple(x / 2 for x in self._size)
+            self._rect.move_ip(*self._position)
+
+    def _render(self):
         """
         Draws the button's elements on its surface
         """
+        if self._surface is None:
+            self._surface = pg.Surface(self._size, flags=pg.SRCALPHA)
+        self._stale = False
         self._surface.fill(self._color)
-        self._rect = pg.Rect(self._position, self._size)
-        if self._image:
-            self._rect = self._image.get_rect(center=tuple(x / 2 for x in self._size)).move(*self._position)
-            self._surface.blit(self._image, tuple((x - y) / 2 for x, y in zip(self._size, self._image_size)))
+        if self._image_path:
+            image = load_image(self._image_path, self._image_size)
+            self._surface.blit(image, tuple((x - y) / 2 for x, y in zip(self._size, self._image_size)))
         elif self._text:
-            text = self._font.render(self._text, True, (0, 0, 0))
+            text = render_text(self._font, self._text)
             text_pos = (0, 0)
             if self._center_text:
                 text_pos = tuple((x - y) / 2 for x, y in zip(self._size, text.get_size()))
@@ -148,9 +258,11 @@ class Button:
         :param image_path: a path to a new image
         :param image_size: the size of the image
         """
-        self._image = pg.image.load(image_path)
-        self._image_size = image_size if image_size else self._image_size
-        self._image = pg.transform.scale(self._image, self._image_size)
+        image_size = image_size if image_size else self._image_size
+        if image_path == self._image_path and image_size == self._image_size:
+            return
+        self._image_path = image_path
+        self._image_size = image_size
         self._draw()
 
     def update_text(self, text: str):
@@ -159,6 +271,8 @@ class Button:
 
         :param text: the new button's text
         """
+        if text == self._text:
+            return
         self._text = text
         self._draw()
 
@@ -168,6 +282,8 @@ class Button:
 
         :param color: the new button's background color (RGB)
         """
+        if color == self._color:
+            return
         self._color = color
         self._draw()
 
@@ -177,7 +293,10 @@ class Button:
 
         :param surface: pygame Surface to blit the button onto
         """
+        if self._stale:
+            self._render()
         surface.blit(self._surface, self._position)
+        self._changed = False
 
     def check_collision(self, pos: tuple) -> bool:
         """
@@ -192,7 +311,10 @@ class Button:
         """
         Reverts the image of the button to the given one on creation
         """
-        self._image = self._org_image
+        if self._image_path == self._org_image_path and self._image_size == self._org_image_size:
+            return
+        self._image_path = self._org_image_path
+        self._image_size = self._org_image_size
         self._draw()
 
     @property
@@ -209,6 +331,13 @@ class Button:
         """
         return self._size
 
+    @property
+    def changed(self) -> bool:
+        """
+        Getter for the information whether the button was redrawn since it was last blitted
+        """
+        return self._changed
+
     @property
     def clickable(self) -> bool:
         """
@@ -224,44 +353,85 @@ class Button:
         return self._org_color
 
 
+def _store_trace(trace_cache: TraceCache, name: str, nums: list, ops: Iterator[Operation]):
+    """
+    Background task storing a finished run in the trace cache, the cache is skipped if it cannot be written
+
+    :param trace_cache: the cache of the computed traces
+    :param name: the name of the algorithm
+    :param nums: the array before the first operation
+    :param ops: all operations of the run
+    """
+    try:
+        trace_cache.store(name, nums, ops)
+    except OSError:
+        pass
+
+
 class Visualizer:
     """
     Class handling the GUI
     """
-    def __init__(self):
+    def __init__(self, ops_per_second: float = 600, backend: str = 'pygame', number: int = 600,
+                 counters_csv: str = None, profile: bool = False, distribution: str = 'random', seed: int = None,
+                 engine: str = 'inline', trace_cache_size: int = MAX_BYTES, incremental: bool = True):
+        """
+        :param ops_per_second: the number of the sorting algorithm's operations performed per second, UNTHROTTLED to
+            perform as many as fit in a frame
+        :param backend: 'pygame' to draw every bar as a rect, 'numpy' to rasterize the whole board with NumPy; arrays
+            longer than the board's width are always aggregated per pixel column with NumPy
+        :param number: the length of the generated array
+        :param counters_csv: the path of the CSV file a row of the operation counters is appended to after every
+            finished sort, the counters are not exported if not given
+        :param profile: if the profiler's report is printed when the main loop exits
+        :param distribution: the shape of the generated arrays, one of workloads.DISTRIBUTIONS
+        :param seed: the seed of the first generated array, every next one is generated with the seed increased by 1,
+            so a session is repeatable; the arrays are random if not given
+        :param engine: 'inline' to run the algorithm in the main loop on a timeline, 'process' to run it in a separate
+            process sharing the array through shared memory, without the timeline
+        :param trace_cache_size: the size limit of the cache of the computed traces in bytes, the finished runs are
+            stored in it and replayed when the same algorithm is started on the same array again; 0 disables the cache
+        :param incremental: if only the bars and the buttons changed since the last frame are redrawn, otherwise all
+            bars are rebuilt and the whole screen is redrawn every frame
+        """
+        if backend == 'numpy' and np is None:
+            raise ImportError('the numpy backend requires NumPy to be installed')
+        if distribution != 'random' and np is None:
+            raise ImportError(f'the {distribution} distribution requires NumPy to be installed')
+        self._backend = backend
         # screen settings
         self._SCR_DIMS = 1024, 768
-        self._ICON = pg.image.load('img/icon.png')
+        init_pygame()
         self._scr = pg.display.set_mode(self._SCR_DIMS)
         pg.display.set_caption('Sorting Visualizer')
-        pg.display.set_icon(self._ICON)
 
         # pygame loop variables
         self._running = True
         self._clock = pg.time.Clock()
 
-        # dict for controlling the state of sorting algorithms
-        self._sort_ctrls = {'bubble': False,
-                            'insertion': False,
-                            'merge': False,
-                            'selection': False,
-                            'quick': False,
-                            'heap': False,
-                            'counting': False,
-                            'radix': False,
-                            'shell': False, }
-
-        # variable for the insertion sort, contains the index of number to be checked
-        self._insertion_index = 1
+        # sorting algorithm state, the timeline recording the algorithm is created when the sort is started
+        self._sorting = False
+        self._timeline = None
+        self._scheduler = Scheduler(ops_per_second)
+        self._speed = min(bisect_left(SPEEDS, ops_per_second), len(SPEEDS) - 1)  # index of the speed in SPEEDS
+        self._trace = None  # the loaded trace replayed instead of running the algorithm
+        self._trace_cache = TraceCache(max_bytes=trace_cache_size) if trace_cache_size > 0 else None
+        self._trace_cached = True  # whether the run on the timeline needs no storing in the trace cache
+        self._cache_writer = None  # the thread writing the finished runs to the trace cache, started on the first one
+        self._process_engine = engine == 'process'  # whether the sort runs in the engine process
+        self._engine = None  # the engine running the algorithm, the numbers' array is its live view while it runs
+        self._engine_counters = None  # the operation counters of the last finished engine
+        self._engine_error = None  # the reason the last engine failed, shown in the HUD
+        self._engine_step = 0  # the step of the engine shown in the last frame
 
         # sorting algorithm choosing variables
-        self._sort_names = Cycle(['bubble', 'insertion', 'merge', 'selection', 'quick', 'heap', 'counting', 'radix',
-                                  'shell'])
+        self._sort_names = Cycle(list(ALGORITHMS))
         self._chosen_sort = next(self._sort_names)
         self._sort_states = Cycle(['start', 'stop'])
 
         # fonts
-        self._fnt = pg.font.SysFont('calibri', 30)
+        self._fnt = load_font('calibri', 30)
+        self._hud_fnt = load_font('calibri', 18)
 
         # interface
         self._BRD_SIZE = 600, 600
@@ -289,7 +459,14 @@ class Visualizer:
                       (self._SCR_DIMS[1] - self._BRD_SIZE[1]) / 2 + (btn_size[1] + btn_spacing_y) * 3),
             size=btn_size, color=(255, 255, 255), border=2, font=self._fnt, text='Exit', center_text=True)
 
-        self._text_btns = [self._generate_btn, self._sort_name_btn, self._start_pause_btn, self._exit_btn]
+        self._speed_btn = Button(
+            position=(self._SCR_DIMS[0] - btn_size[0] - btn_offs_x,
+                      (self._SCR_DIMS[1] - self._BRD_SIZE[1]) / 2 + (btn_size[1] + btn_spacing_y) * 4),
+            size=btn_size, color=(255, 255, 255), font=self._fnt, text=self._format_speed(ops_per_second),
+            center_text=True, clickable=False)
+
+        self._text_btns = [self._generate_btn, self._sort_name_btn, self._start_pause_btn, self._exit_btn,
+                           self._speed_btn]
 
         arrow_btn_size = 50, 50
         arrow_btn_offs_x = 10
@@ -304,43 +481,213 @@ class Visualizer:
             size=arrow_btn_size, image_path='img/arrow_r.png')
 
         self._arrow_btns = [self._arrow_l_btn, self._arrow_r_btn]
+        self._hover_images = {self._arrow_l_btn: 'img/arrow_l_hover.png', self._arrow_r_btn: 'img/arrow_r_hover.png'}
+
+        # input handling, the events are translated into the queued commands
+        self._commands = deque()
+        self._hovered = None  # the button under the mouse cursor
+        self._btn_commands = {self._generate_btn: Command.GENERATE,
+                              self._start_pause_btn: Command.START_STOP,
+                              self._exit_btn: Command.EXIT,
+                              self._arrow_l_btn: Command.PREVIOUS_SORT,
+                              self._arrow_r_btn: Command.NEXT_SORT, }
+        self._key_commands = {pg.K_LEFT: Command.STEP_BACK,
+                              pg.K_RIGHT: Command.STEP_FORWARD,
+                              pg.K_HOME: Command.SEEK_START,
+                              pg.K_END: Command.SEEK_END,
+                              pg.K_UP: Command.SPEED_UP,
+                              pg.K_DOWN: Command.SLOW_DOWN,
+                              pg.K_r: Command.RACE,
+                              pg.K_p: Command.PROFILER,
+                              pg.K_d: Command.NEXT_DISTRIBUTION, }
 
         # number generation parameters
         self._nums = []
         self._lower = 1  # lower bound for generated values
         self._higher = 600  # higher bound for generated values
-        self._number = 600  # the length of the generated array
+        self._number = number  # the length of the generated array
+        self._distributions = Cycle(list(DISTRIBUTIONS))
+        self._distribution = next(self._distributions)
+        while self._distribution != distribution:
+            self._distribution = next(self._distributions)
+        self._seed = seed
+        self._generation = 0  # the number of the arrays generated so far, added to the seed
         self._sorted = False
 
         # variables for the graphical representation of numbers to sort
         self._bars = []
         self._bar_width = 0
         self._bar_height_base = 0
+        self._BRD_POS = ((self._SCR_DIMS[0] - self._BRD_SIZE[0]) / 2 - 100, (self._SCR_DIMS[1] - self._BRD_SIZE[1]) / 2)
+
+        # incremental rendering variables, only the changed columns are redrawn if enabled
+        self._incremental = incremental
+        self._dirty = set()  # indices of the bars changed since the last frame
+        self._selected = None  # index of the bar marked as selected
+        self._full_redraw = True  # forces the redraw of the whole screen in the next frame
+
+        # regions of the workers of a parallel algorithm, the bars of every worker are colored differently
+        self._LANE_COLORS = ((31, 119, 180), (255, 127, 14), (44, 160, 44), (188, 189, 34),
+                             (148, 103, 189), (140, 86, 75), (227, 119, 194), (23, 190, 207))
+        self._lane_starts = []  # the first indices of the regions, ascending
+        self._lane_workers = []  # the workers of the regions, -1 for a region without a worker
+        self._lanes_changed = False
+
+        # NumPy board replacing the bars, chosen according to the backend and the length of the array
+        self._board = None
+        self._boards = {}
+
+        # timeline scrubber below the board
+        self._scrubber = pg.Rect(self._BRD_POS[0], self._BRD_POS[1] + self._BRD_SIZE[1] + 20, self._BRD_SIZE[0], 16)
+        self._scrubber_changed = True
+
+        # HUD with the operation counters of the sort and the engine's failure below the buttons
+        self._hud = pg.Rect(self._speed_btn.position[0], self._speed_btn.position[1] + btn_size[1] + btn_spacing_y,
+                            btn_size[0] + btn_offs_x, (len(Counters.FIELDS) + 2) * (self._hud_fnt.get_linesize() + 2))
+        self._hud_changed = True
+        self._counters_csv = counters_csv
+        self._counters_exported = False  # whether the counters of the current timeline were appended to the CSV
+
+        # render loop profiler, its overlay is shown above the board
+        self._profiler = FrameProfiler()
+        self._profile = profile
+        self._profiler_overlay = pg.Rect(0, 0, self._SCR_DIMS[0], self._BRD_POS[1] - 4)
+        self._show_profiler = False
+        self._profiler_changed = False
+
+    @staticmethod
+    def _format_speed(ops_per_second: float) -> str:
+        """
+        Formats the speed of the sort for the speed label
+
+        :param ops_per_second: the number of operations per second
+        :return: the text of the label
+        """
+        if ops_per_second == UNTHROTTLED:
+            return 'Max op/s'
+        if ops_per_second >= 1000:
+            return f'{ops_per_second / 1000:g}k op/s'
+        return f'{ops_per_second:g} op/s'
+
+    def _change_speed(self, step: int):
+        """
+        Switches the speed of the sort to the faster or slower one
+
+        :param step: 1 to speed the sort up, -1 to slow it down
+        """
+        self._speed = max(min(self._speed + step, len(SPEEDS) - 1), 0)
+        self._scheduler.rate = SPEEDS[self._speed]
+        if self._engine is not None:
+            self._engine.rate = SPEEDS[self._speed]
+        self._speed_btn.update_text(self._format_speed(SPEEDS[self._speed]))
 
     def _generate_nums(self):
         """
-        Generates the random numbers array to be sorted
+        Generates the numbers array to be sorted with the chosen distribution
+        """
+        seed = None if self._seed is None else self._seed + self._generation
+        self._generation += 1
+        if np is not None:
+            self._set_nums(generate(self._distribution, self._number, seed, self._lower, self._higher).tolist())
+        else:
+            rng = rnd.Random(seed)
+            self._set_nums([rng.randint(self._lower, self._higher) for _ in range(self._number)])
+
+    def _set_nums(self, nums: list):
+        """
+        Sets the numbers array to be sorted and adjusts the bars to its length and values
+
+        :param nums: the numbers to sort
         """
-        self._nums = [rnd.randint(self._lower, self._higher) for _ in range(self._number)]
-        self._bar_width = round(self._BRD_SIZE[0] / len(self._nums))
-        self._bar_height_base = round(self._BRD_SIZE[1] / max(self._nums))
+        self._nums = nums
+        self._input = list(nums)  # the array restored when another algorithm is chosen
+        self._board = self._choose_board(len(nums))
+        self._bar_width = round(self._BRD_SIZE[0] / max(len(self._nums), 1))
+        self._bar_height_base = self._BRD_SIZE[1] / max(max(self._nums, default=1), 1)
         self._sorted = False
 
+    def _choose_board(self, n: int):
+        """
+        Chooses the NumPy board to draw the array of the given length, the boards are created once and reused
+
+        :param n: the length of the array
+        :return: the board, None if the bars are drawn as pygame rects
+        """
+        if n > self._BRD_SIZE[0]:
+            if np is None:
+                raise ImportError('arrays longer than the board\'s width require NumPy to be installed')
+            board_cls = BucketBoard
+        elif self._backend == 'numpy':
+            board_cls = ArrayBoard
+        else:
+            return None
+        if board_cls not in self._boards:
+            self._boards[board_cls] = board_cls(pg.Rect(self._BRD_POS, self._BRD_SIZE))
+        return self._boards[board_cls]
+
+    def _make_bar(self, i: int) -> MyRect:
+        """
+        Creates the bar representing the number with the given index
+
+        :param i: the index of the number
+        :return: the bar of the number
+        """
+        height = int(self._bar_height_base * self._nums[i])
+        color = (0, 0, 0)
+        if self._lane_starts:
+            color = self._lane_color(self._lane_workers[bisect_right(self._lane_starts, i) - 1]) or color
+        return MyRect(self._BRD_POS[0] + i * self._bar_width, self._BRD_POS[1] + self._BRD_SIZE[1] - height,
+                      self._bar_width, height, color)
+
+    def _lane_color(self, worker: int) -> Optional[tuple]:
+        """
+        Returns the color of the bars in the region of the worker, None for a region without a worker
+
+        :param worker: the index of the worker, -1 for none
+        """
+        return self._LANE_COLORS[worker % len(self._LANE_COLORS)] if worker >= 0 else None
+
+    def _column_rect(self, i: int) -> pg.Rect:
+        """
+        Returns the area of the board taken by the bar with the given index, including the empty space above the bar
+
+        :param i: the index of the bar
+        :return: pygame Rect of the column
+        """
+        return pg.Rect(self._BRD_POS[0] + i * self._bar_width, self._BRD_POS[1], self._bar_width, self._BRD_SIZE[1])
+
     def _update_bars(self):
         """
         Update the bars size and position based on the numbers' array
         """
-        x_offset = -100
-        self._bars = [MyRect(
-            i * self._bar_width + (self._SCR_DIMS[0] - self._BRD_SIZE[0]) / 2 + x_offset,
-            (self._SCR_DIMS[1] - self._BRD_SIZE[1]) / 2 + self._BRD_SIZE[1] - self._bar_height_base * num,
-            self._bar_width,
-            self._bar_height_base * num) for i, num in enumerate(self._nums)]
+        if self._board:
+            lanes = [(start, self._lane_color(worker)) for start, worker in zip(self._lane_starts, self._lane_workers)]
+            self._board.set_values(self._nums, self._selected, lanes)
+            return
+        self._bars = [self._make_bar(i) for i in range(len(self._nums))]
+        if self._selected is not None:
+            self._bars[self._selected].select()
+
+    def _select(self, i: int):
+        """
+        Marks the bar with the given index as selected, the previously selected bar is marked as changed
+
+        :param i: the index of the bar to select
+        """
+        if self._selected is not None:
+            self._dirty.add(self._selected)
+        self._selected = i
+        self._dirty.add(i)
 
     def _draw_bars(self):
         """
         Draws the bars on the screen
         """
+        if self._board:
+            if self._dirty:
+                self._board.update(self._dirty, self._nums, self._selected)
+            self._board.draw(self._scr)
+            return
         for bar in self._bars:
             pg.draw.rect(self._scr, bar.color, bar)
 
@@ -353,402 +700,587 @@ class Visualizer:
         for button in self._arrow_btns:
             button.blit(self._scr)
 
+    def _draw_scrubber(self):
+        """
+        Draws the timeline scrubber showing the position of the sort within the operations recorded so far
+        """
+        pg.draw.rect(self._scr, (230, 230, 230), self._scrubber)
+        if self._timeline is not None and len(self._timeline):
+            progress = self._timeline.position / len(self._timeline)
+            played = pg.Rect(self._scrubber.topleft, (round(self._scrubber.width * progress), self._scrubber.height))
+            pg.draw.rect(self._scr, (120, 120, 120), played)
+        pg.draw.rect(self._scr, (0, 0, 0), self._scrubber, 1)
+        self._scrubber_changed = False
+
+    def _draw_hud(self):
+        """
+        Draws the HUD with the input distribution and the operation counters of the sort
+        """
+        counters = self._counters()
+        self._scr.fill((255, 255, 255), self._hud)
+        line_height = self._hud_fnt.get_linesize() + 2
+        lines = [('input', self._distribution.replace('_', ' '))] + list(counters.as_dict().items())
+        if self._engine_error:
+            lines.append(('error', self._engine_error))
+        for i, (field, value) in enumerate(lines):
+            text = render_text(self._hud_fnt, f'{field.replace("_", " ").capitalize()}: {value}')
+            self._scr.blit(text, (self._hud.left, self._hud.top + i * line_height))
+        self._hud_changed = False
+
+    def _draw_profiler(self):
+        """
+        Draws the overlay with the percentiles of the render loop sections, or clears it if the overlay was hidden
+        """
+        self._scr.fill((255, 255, 255), self._profiler_overlay)
+        self._profiler_changed = False
+        if not self._show_profiler:
+            return
+        line_height = self._profiler_overlay.height // 4
+        label_width = 110
+        column_width = (self._profiler_overlay.width - label_width) // len(SECTIONS)
+        labels = [f'{self._profiler.dropped} dropped', 'p50 ms', 'p95 ms', 'p99 ms']
+        for row, label in enumerate(labels):
+            self._scr.blit(render_text(self._hud_fnt, label), (self._profiler_overlay.left + 4, row * line_height))
+        for column, section in enumerate(SECTIONS):
+            left = self._profiler_overlay.left + label_width + column * column_width
+            values = [section] + [f'{seconds * 1000:.2f}' for seconds in self._profiler.percentiles(section)]
+            for row, value in enumerate(values):
+                self._scr.blit(render_text(self._hud_fnt, value), (left, row * line_height))
+
     def _update_screen(self):
         """
         Updates the screen to show the drawn elements
         """
+        if self._incremental and not self._full_redraw:
+            self._update_changed()
+            return
+        if not self._incremental:
+            with self._profiler.measure('update_bars'):
+                self._update_bars()
         self._scr.fill((255, 255, 255))
-        self._draw_bars()
-        self._draw_buttons()
-        pg.display.flip()
+        with self._profiler.measure('draw_bars'):
+            self._draw_bars()
+        with self._profiler.measure('draw_buttons'):
+            self._draw_buttons()
+            self._draw_scrubber()
+            self._draw_hud()
+            self._draw_profiler()
+        with self._profiler.measure('display'):
+            pg.display.flip()
+        self._dirty.clear()
+        self._full_redraw = False
+
+    def _update_changed(self):
+        """
+        Redraws only the columns of the bars and the buttons changed since the last frame, then updates just these
+        areas of the screen
+        """
+        rects = []
+        if not self._board:
+            with self._profiler.measure('update_bars'):
+                for i in self._dirty:
+                    bar = self._make_bar(i)
+                    if i == self._selected:
+                        bar.select()
+                    self._bars[i] = bar
+        with self._profiler.measure('draw_bars'):
+            if self._board:
+                if self._dirty:
+                    self._board.update(self._dirty, self._nums, self._selected)
+                    rects.extend(self._board.draw(self._scr, changed_only=True))
+            else:
+                for i in self._dirty:
+                    bar = self._bars[i]
+                    column = self._column_rect(i)
+                    self._scr.fill((255, 255, 255), column)
+                    pg.draw.rect(self._scr, bar.color, bar)
+                    rects.append(column)
+            self._dirty.clear()
+        with self._profiler.measure('draw_buttons'):
+            for button in self._text_btns + self._arrow_btns:
+                if button.changed:
+                    button.blit(self._scr)
+                    rects.append(pg.Rect(button.position, button.size))
+            if self._scrubber_changed:
+                self._draw_scrubber()
+                rects.append(self._scrubber)
+            if self._hud_changed:
+                self._draw_hud()
+                rects.append(self._hud)
+            if self._profiler_changed:
+                self._draw_profiler()
+                rects.append(self._profiler_overlay)
+        if rects:
+            with self._profiler.measure('display'):
+                pg.display.update(rects)
 
     def _button_hover(self, pos: tuple, hover_color: tuple = (210, 210, 210)):
         """
-        Creates the hover effect on the buttons within the given list
+        Creates the hover effect on the buttons, only the buttons the mouse has entered or left are updated
 
         :param pos: the mouse position
         :param hover_color: the color of hovered button
         """
-        for button in self._text_btns:
-            if button.check_collision(pos) and button.clickable:
-                button.update_color(color=hover_color)
-            else:
-                button.update_color(color=button.org_color)
-        for button, dir_ in zip(self._arrow_btns, ('l', 'r')):
-            if button.check_collision(pos) and button.clickable:
-                button.update_image(f'img/arrow_{dir_}_hover.png')
+        hovered = next((button for button in self._text_btns + self._arrow_btns if button.check_collision(pos)), None)
+        if hovered is self._hovered:
+            return
+        for button in (self._hovered, hovered):
+            if button is None:
+                continue
+            if button in self._hover_images:
+                if button is hovered:
+                    button.update_image(self._hover_images[button])
+                else:
+                    button.reset_image()
             else:
-                button.reset_image()
-
-    def _reset_sort(self):
-        self._insertion_index = 1
-        self._sort_ctrls = {k: False for k in self._sort_ctrls.keys()}
+                button.update_color(color=hover_color if button is hovered else button.org_color)
+        self._hovered = hovered
+
+    def _reset_sort(self, regenerate: bool = True):
+        """
+        Stops the sorting algorithm and generates a new numbers' array
+
+        :param regenerate: False to restore the array the sort started from instead, so the algorithms can be compared
+            on the same numbers and their cached traces are reused
+        """
+        self._selected = None
+        self._full_redraw = True
+        self._sorting = False
+        self._timeline = None
+        self._stop_engine()
+        self._engine_counters = None
+        self._engine_error = None
+        self._lane_starts = []
+        self._lane_workers = []
+        self._scrubber_changed = True
+        self._hud_changed = True
+        if self._trace:
+            self._trace.close()
+            self._trace = None
         self._sort_states.reset()
         self._start_pause_btn.update_text(next(self._sort_states).capitalize())
-        self._generate_nums()
+        if regenerate:
+            self._generate_nums()
+        else:
+            self._set_nums(self._input)
         self._update_bars()
 
     def _events_handler(self):
         """
-        Handles the pygame events
+        Polls the pygame events and queues the commands they issue, called once per frame
         """
         for event in pg.event.get():
-            pos = pg.mouse.get_pos()
             if event.type == pg.QUIT:
-                self._running = False
+                self._commands.append((Command.EXIT, None))
+            elif event.type == pg.MOUSEMOTION:
+                self._button_hover(event.pos)
             elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1:
-                if self._generate_btn.check_collision(pos):
-                    self._reset_sort()
-                if self._start_pause_btn.check_collision(pos):
-                    self._sort_ctrls[self._chosen_sort] = not self._sort_ctrls[self._chosen_sort]
-                    self._start_pause_btn.update_text(next(self._sort_states).capitalize())
-                if self._arrow_r_btn.check_collision(pos):
+                for button, command in self._btn_commands.items():
+                    if button.check_collision(event.pos):
+                        self._commands.append((command, None))
+                if self._scrubber.collidepoint(event.pos):
+                    self._commands.append((Command.SEEK, (event.pos[0] - self._scrubber.left) / self._scrubber.width))
+            elif event.type == pg.KEYDOWN and event.key in self._key_commands:
+                self._commands.append((self._key_commands[event.key], None))
+
+    def _execute_commands(self):
+        """
+        Executes the queued commands
+        """
+        while self._commands:
+            command, argument = self._commands.popleft()
+            if self._process_engine and command in (Command.SEEK, Command.STEP_BACK, Command.STEP_FORWARD,
+                                                    Command.SEEK_START, Command.SEEK_END):
+                continue  # the engine process keeps no timeline
+            if command is Command.EXIT:
+                self._running = False
+            elif command is Command.GENERATE:
+                self._reset_sort()
+            elif command is Command.START_STOP:
+                self._sorting = not self._sorting
+                self._scheduler.reset()
+                self._start_pause_btn.update_text(next(self._sort_states).capitalize())
+                if self._process_engine:
+                    self._toggle_engine()
+            elif command is Command.NEXT_SORT or command is Command.PREVIOUS_SORT:
+                if command is Command.NEXT_SORT:
                     self._chosen_sort = next(self._sort_names)
-                    self._sort_name_btn.update_text(self._chosen_sort.capitalize())
-                    self._reset_sort()
-                if self._arrow_l_btn.check_collision(pos):
+                else:
                     self._chosen_sort = self._sort_names.previous
-                    self._sort_name_btn.update_text(self._chosen_sort.capitalize())
-                    self._reset_sort()
-                if self._exit_btn.check_collision(pos):
-                    self._running = False
-            self._button_hover(pos)
+                self._sort_name_btn.update_text(self._chosen_sort.capitalize())
+                self._reset_sort(regenerate=False)
+            elif command is Command.NEXT_DISTRIBUTION:
+                self._distribution = next(self._distributions)
+                self._reset_sort()
+            elif command is Command.SEEK:
+                if self._timeline is not None:
+                    self._seek(round(argument * len(self._timeline)))
+            elif command is Command.STEP_BACK:
+                self._step_back()
+            elif command is Command.STEP_FORWARD:
+                self._seek(self._timeline.position + 1 if self._timeline else 1)
+            elif command is Command.SEEK_START:
+                self._seek(0)
+            elif command is Command.SEEK_END:
+                self._seek(float('inf'))
+            elif command is Command.SPEED_UP or command is Command.SLOW_DOWN:
+                self._change_speed(1 if command is Command.SPEED_UP else -1)
+            elif command is Command.RACE:
+                self._race()
+            elif command is Command.PROFILER:
+                self._show_profiler = not self._show_profiler
+                self._profiler_changed = True
+
+    def _advance_sort(self, count: int):
+        """
+        Performs the next batch of operations of the chosen sorting algorithm and marks the changed bars
+
+        :param count: the number of operations to perform
+        """
+        if self._timeline is None:
+            self._start_timeline()
+        dirty = self._dirty
+        selected = None
+        consumed = 0
+        for op in islice(self._timeline.forward(self._nums), count):
+            consumed += 1
+            if op.code == SWAP:
+                dirty.add(op.a)
+                dirty.add(op.b)
+            elif op.code == WRITE:
+                dirty.add(op.a)
+            elif op.code == LANE:
+                self._set_lane(op.a, op.b)
+                continue
+            elif op.code == ALLOC or op.code == FREE:
+                continue
+            selected = op.a
+        if selected is not None:
+            self._select(selected)
+        if self._lanes_changed:
+            self._lanes_changed = False
+            self._update_bars()
+            self._full_redraw = True
+        if consumed:
+            self._scrubber_changed = True
+            self._hud_changed = True
+        if consumed < count:
+            self._finish_sort()
+
+    def _set_lane(self, start: int, worker: int):
+        """
+        Marks the region of a worker of the parallel algorithm, the region starting at 0 replaces all previous regions
+
+        :param start: the first index of the region, which ends where the next region starts
+        :param worker: the index of the worker, -1 for a region without a worker
+        """
+        if start == 0:
+            self._lane_starts = []
+            self._lane_workers = []
+        self._lane_starts.append(start)
+        self._lane_workers.append(worker)
+        self._lanes_changed = True
+
+    def _restore_lanes(self):
+        """
+        Rebuilds the regions of the workers at the current position of the timeline, after it was moved back or seeked
+        """
+        lanes = self._timeline.lanes()
+        starts = [start for start, _ in lanes]
+        workers = [worker for _, worker in lanes]
+        if starts != self._lane_starts or workers != self._lane_workers:
+            self._lane_starts = starts
+            self._lane_workers = workers
+            self._update_bars()
+            self._full_redraw = True
+
+    def _toggle_engine(self):
+        """
+        Starts the engine process sorting the numbers' array, or pauses or resumes the running one
+        """
+        if self._engine is None:
+            if not self._sorting:
+                return
+            if self._engine_counters is not None:  # the array was already sorted by the previous engine
+                self._finish_sort()
+                return
+            self._engine = SortEngine(self._chosen_sort, self._nums, self._scheduler.rate)
+            self._nums = self._engine.values
+        if self._sorting:
+            self._engine.resume()
+        else:
+            self._engine.pause()
 
-    def _sort_update_screen(self, i: int):
+    def _poll_engine(self):
         """
-        Used inside the sorting functions, used to update bars position and size through the algorithm and to indicate,
-        which number is being sorted at the moment
-
-        :param i: the index of bar to be marked
+        Shows the live numbers' array of the engine process if it changed since the last frame, the bars are rebuilt as
+        the changed ones are not known
         """
-        self._update_bars()
-        self._bars[i].select()
-        self._update_screen()
-
-    def _bubble_sort(self):
-        """
-        Sorts the numbers' array using the bubble sort algorithm
-        """
-        while True:
-            changed = False
-            for i in range(1, len(self._nums)):
-                self._events_handler()
-                if not self._sort_ctrls['bubble']:
-                    return
-                if self._nums[i] < self._nums[i - 1]:
-                    self._nums[i], self._nums[i - 1] = self._nums[i - 1], self._nums[i]
-                    self._sort_update_screen(i)
-                    changed = True
-            if not changed:
-                self._sort_ctrls['bubble'] = False
-                self._sorted = True
-                return
+        with self._profiler.measure('sort'):
+            exitcode = self._engine.exitcode  # read before the flag, so an exit right after finishing is not a failure
+            finished = self._engine.finished
+            step = self._engine.step
+        if step != self._engine_step:
+            self._engine_step = step
+            self._selected = self._engine.selected
+            with self._profiler.measure('update_bars'):
+                self._update_bars()
+            self._full_redraw = True
+            self._hud_changed = True
+        if finished:
+            self._engine_counters = self._engine.counters
+            self._stop_engine()
+            self._selected = None
+            with self._profiler.measure('update_bars'):
+                self._update_bars()
+            self._full_redraw = True
+            self._finish_sort()
+        elif exitcode is not None:
+            self._engine_counters = self._engine.counters
+            self._stop_engine()
+            self._engine_error = f'engine exit code {exitcode}'
+            self._selected = None
+            with self._profiler.measure('update_bars'):
+                self._update_bars()
+            self._full_redraw = True
+            self._hud_changed = True
+            self._sorting = False
+            self._sort_states.reset()
+            self._start_pause_btn.update_text(next(self._sort_states).capitalize())
 
-    def _insertion_sort(self):
+    def _stop_engine(self):
         """
-        Sorts the numbers' array using the insertion sort algorithm
+        Stops the engine process, if any, and takes over the numbers' array from its shared memory
         """
-        if not self._insertion_index < len(self._nums):
-            self._insertion_index = 1
-            self._sort_ctrls['insertion'] = False
-            self._sorted = True
+        if self._engine is None:
             return
-        j = self._insertion_index - 1
-        while j >= 0 and self._nums[j] > self._nums[j + 1]:
-            self._events_handler()
-            self._nums[j + 1], self._nums[j] = self._nums[j], self._nums[j + 1]
-            self._sort_update_screen(j)
-            j -= 1
-        self._insertion_index += 1
+        self._nums = self._engine.values.tolist()
+        self._engine.stop()
+        self._engine = None
+        self._engine_step = 0
+
+    def _start_timeline(self):
+        """
+        Creates the timeline recording the chosen sorting algorithm, or replaying the loaded or the cached trace, from
+        the current numbers' array
+        """
+        path = None
+        if self._trace is None and self._trace_cache is not None:
+            path = self._trace_cache.lookup(self._chosen_sort, self._nums)
+        if self._trace:
+            algorithm = self._trace.replay
+        elif path is not None:
+            algorithm = partial(replay, path)
+        else:
+            algorithm = ALGORITHMS[self._chosen_sort]
+        self._timeline = Timeline(self._nums, algorithm)
+        self._trace_cached = self._trace is not None or path is not None or self._trace_cache is None
+        self._lane_starts = []
+        self._lane_workers = []
+        self._counters_exported = False
 
-    def _merge(self, left: list, right: list, start_l: int):
+    def _seek(self, step: int):
         """
-        Auxiliary function for merge sort algorithm, merges the left and right arrays
+        Moves the sort to the state after the given number of operations, running the algorithm further if needed
 
-        :param left: the left sub-array to merge
-        :param right: the right sub-array to merge
-        :param start_l: the starting index of left sub-array within the main array
+        :param step: the number of operations to be applied
         """
-        if not self._sort_ctrls['merge']:
-            return
-        i = j = 0
-        k = start_l
-
-        while i < len(left) and j < len(right):
-            self._sort_update_screen(k)
-            if left[i] < right[j]:
-                self._nums[k] = left[i]
-                i += 1
-                k += 1
-            else:
-                self._nums[k] = right[j]
-                j += 1
-                k += 1
-
-        while i < len(left):
-            self._nums[k] = left[i]
-            self._sort_update_screen(k)
-            i += 1
-            k += 1
-
-        while j < len(right):
-            self._nums[k] = right[j]
-            self._sort_update_screen(k)
-            j += 1
-            k += 1
-
-    def _merge_sort(self):
-        """
-        Sorts the numbers' array using the merge sort algorithm
-        """
-        group_size = 2
-        loop = True
-        while True:
-            if group_size > len(self._nums) or self._sorted:
-                loop = False
-            loop_range = len(self._nums) // group_size + bool(len(self._nums) % group_size)
-            for i in range(loop_range):
-                self._events_handler()
-                if not self._sort_ctrls['merge']:
-                    return
-                mid = group_size // 2 + i * group_size
-                start_l = i * group_size
-                end_r = mid + group_size // 2
-                self._merge(self._nums[start_l: mid], self._nums[mid:end_r], start_l)
-                self._update_bars()
-                self._update_screen()
+        if self._timeline is None:
+            self._start_timeline()
+        changed = self._timeline.seek(self._nums, step)
+        if changed is None:
+            self._update_bars()
+            self._full_redraw = True
+        else:
+            self._dirty.update(changed)
+        self._restore_lanes()
+        self._sorted = self._timeline.finished
+        if self._sorted:
+            self._export_counters()
+            self._cache_trace()
+        self._scrubber_changed = True
+        self._hud_changed = True
 
-            if not loop:
-                self._sort_ctrls['merge'] = False
-                self._sorted = True
-                return
-            group_size *= 2
-
-    def _selection_sort(self):
-        """
-        Sorts the numbers' array using the selection sort algorithm
-        """
-        start = 0
-        for j in range(len(self._nums)):
-            self._clock.tick(30)
-            min_val = None
-            min_index = None
-            for i in range(start, len(self._nums)):
-                if not self._sort_ctrls['selection']:
-                    return
-                self._events_handler()
-                if min_val is None:
-                    min_val = self._nums[i]
-                    min_index = i
-                elif min_val > self._nums[i]:
-                    min_val = self._nums[i]
-                    min_index = i
-            self._nums[start], self._nums[min_index] = self._nums[min_index], self._nums[start]
-            start += 1
-            self._sort_update_screen(min_index)
-        self._sort_ctrls['selection'] = False
-        self._sorted = True
+    def _step_back(self):
+        """
+        Undoes the last operation of the sort
+        """
+        op = self._timeline.back(self._nums) if self._timeline else None
+        if op is None:
+            return
+        if op.code == SWAP:
+            self._dirty.update((op.a, op.b))
+        elif op.code == WRITE:
+            self._dirty.add(op.a)
+        elif op.code == LANE:
+            self._restore_lanes()
+        if op.code != ALLOC and op.code != FREE and op.code != LANE:
+            self._select(op.a)
+        self._sorted = False
+        self._scrubber_changed = True
+        self._hud_changed = True
 
-    def _partition(self, start: int, end: int):
+    def _race(self):
         """
-        Auxiliary function for the quick sort algorithm, moves the elements in the array according to the pivot
+        Races all sorting algorithms side by side on copies of the current numbers' array
+        """
+        from race import Race
+        self._sorting = False
+        if self._engine is not None:
+            self._engine.pause()
+        self._sort_states.reset()
+        self._start_pause_btn.update_text(next(self._sort_states).capitalize())
+        self._running = Race(list(ALGORITHMS), self._nums, self._scheduler.rate,
+                             trace_cache=self._trace_cache).run(self._scr, self._clock)
+        self._full_redraw = True
 
-        :param start: the first index of sub-array
-        :param end: the last index of sub-array
-        :return: the correct index of pivot
+    def _finish_sort(self):
         """
-        pivot = self._nums[end]
-        i = start - 1
-        for j in range(start, end):
-            self._events_handler()
-            self._clock.tick(120)
-            if not self._sort_ctrls['quick']:
-                return
-            if self._nums[j] < pivot:
-                i += 1
-                self._nums[i], self._nums[j] = self._nums[j], self._nums[i]
-            self._sort_update_screen(j)
-        i += 1
-        self._nums[i], self._nums[end] = self._nums[end], self._nums[i]
-        return i
-
-    def _quick_sort(self):
-        """
-        Sorts the numbers' array using the quick sort algorithm
-        """
-        stack = [0 for _ in range(len(self._nums))]
-        start, end, index = 0, len(self._nums) - 1, 0
-        stack[index] = start
-        index += 1
-        stack[index] = end
-        index += 1
-        while index > 0:
-            index -= 1
-            end = stack[index]
-            index -= 1
-            start = stack[index]
-            if start >= end:
-                continue
-            pivot_index = self._partition(start, end)
-            if not self._sort_ctrls['quick']:
-                return
-            elif self._sorted:
-                self._sort_ctrls['quick'] = False
-                return
-            stack[index] = start
-            index += 1
-            stack[index] = pivot_index - 1
-            index += 1
-            stack[index] = pivot_index + 1
-            index += 1
-            stack[index] = end
-            index += 1
-        self._sort_ctrls['quick'] = False
+        Stops the finished sorting algorithm and resets the start button, the timeline is kept for scrubbing
+        """
+        self._sorting = False
         self._sorted = True
+        self._sort_states.reset()
+        self._start_pause_btn.update_text(next(self._sort_states).capitalize())
+        self._export_counters()
+        self._cache_trace()
 
-    def _maxify_heap(self, n, parent_i):
+    def _counters(self) -> Counters:
         """
-        Auxiliary function for heap sort algorithm, creates the max heap from the array with the given length
+        Returns the operation counters of the current sort, taken from the timeline or the engine
+        """
+        if self._engine is not None:
+            return self._engine.counters
+        if self._engine_counters is not None:
+            return self._engine_counters
+        return self._timeline.counters if self._timeline is not None else Counters()
 
-        :param n: the length of the array to create max heap from
-        :param parent_i: index of parent node
+    def _export_counters(self):
+        """
+        Appends the operation counters of the finished sort to the CSV file, once per run
         """
-        self._events_handler()
-        if not self._sort_ctrls['heap']:
+        if not self._counters_csv or self._counters_exported:
             return
-        left = 2 * parent_i + 1
-        right = 2 * parent_i + 2
-        largest_i = parent_i
-        self._sort_update_screen(parent_i)
-
-        if left < n and self._nums[left] > self._nums[largest_i]:
-            largest_i = left
-        if right < n and self._nums[right] > self._nums[largest_i]:
-            largest_i = right
-
-        if largest_i != parent_i:
-            self._nums[parent_i], self._nums[largest_i] = self._nums[largest_i], self._nums[parent_i]
-            self._maxify_heap(n, largest_i)
-
-    def _heap_sort(self):
-        """
-        Sorts the numbers' array using the heap sort algorithm
-        """
-        last_parent_i = len(self._nums) // 2 - 1
-        for i in range(last_parent_i, -1, -1):
-            self._maxify_heap(len(self._nums), i)
-        for j in range(len(self._nums) - 1, 0, -1):
-            self._nums[j], self._nums[0] = self._nums[0], self._nums[j]
-            self._maxify_heap(j, 0)
-        self._sort_ctrls['heap'] = False
-        self._sorted = True
+        row = {'algorithm': self._chosen_sort, 'number': len(self._nums)}
+        row.update(self._counters().as_dict())
+        append_csv(self._counters_csv, row)
+        self._counters_exported = True
 
-    def _counting_sort(self):
+    def _cache_trace(self):
         """
-        Sorts the numbers' array using the counting sort algorithm
+        Stores the finished run of the algorithm in the trace cache, once per run; the trace is written by a background
+        thread, so storing a long run does not stall the frame
         """
-        arr = self._nums[:]
-        counter = {i: 0 for i in range(max(arr) + 1)}
-        for num in arr:
-            counter[num] += 1
-        for i in range(1, len(counter)):
-            counter[i] += counter[i - 1]
-        for num in arr:
-            self._events_handler()
-            self._clock.tick(20)
-            if not self._sort_ctrls['counting']:
-                return
-            new_index = counter[num] - 1
-            counter[num] -= 1
-            self._nums[new_index] = num
-            self._sort_update_screen(new_index)
-        self._sort_ctrls['counting'] = False
-        self._sorted = True
-
-    def _radix_sort(self):
-        """
-        Sorts the numbers' array using the radix sort algorithm
-        """
-        max_ = max(self._nums)
-        exp = 1
-        while max_ / exp > 1:
-            counter_range = max([i // exp % 10 for i in self._nums])
-            counter = {i: 0 for i in range(counter_range + 1)}
-            sorted_arr = [None] * len(self._nums)
-            for num in self._nums:
-                counter[num // exp % 10] += 1
-            for i in range(1, len(counter)):
-                counter[i] += counter[i - 1]
-            for num in self._nums[::-1]:
-                new_index = counter[num // exp % 10] - 1
-                sorted_arr[new_index] = num
-                counter[num // exp % 10] -= 1
-            for i, num in enumerate(sorted_arr):
-                self._events_handler()
-                self._clock.tick(60)
-                if not self._sort_ctrls['radix']:
-                    return
-                self._nums[i] = num
-                self._sort_update_screen(i)
-            exp *= 10
-        self._sort_ctrls['radix'] = False
-        self._sorted = True
+        if self._trace_cached or self._timeline is None:
+            return
+        self._trace_cached = True
+        if self._cache_writer is None:
+            self._cache_writer = ThreadPoolExecutor(1)
+        # the finished timeline is not changed anymore, so its operations are written by the thread without copying
+        self._cache_writer.submit(_store_trace, self._trace_cache, self._chosen_sort, self._timeline.initial,
+                                  self._timeline.operations())
+
+    def run_headless(self, sort_name: str, nums: list, ops_per_frame: int = 10) -> int:
+        """
+        Sorts the given numbers through the rendering path, without handling the events and waiting for the clock
+
+        :param sort_name: the name of the sorting algorithm
+        :param nums: the numbers to sort in place
+        :param ops_per_frame: the fixed number of operations performed per frame
+        :return: the number of rendered frames
+        """
+        self._chosen_sort = sort_name
+        self._selected = None
+        self._timeline = None
+        self._set_nums(nums)
+        self._update_bars()
+        self._full_redraw = True
+        self._update_screen()
+        self._sorting = True
+        frames = 0
+        while self._sorting:
+            self._advance_sort(ops_per_frame)
+            self._update_screen()
+            frames += 1
+        return frames
 
-    def _shell_sort(self):
+    def load_trace(self, path: str):
         """
-        Sorts the numbers' array using the shell sort algorithm
+        Loads the recorded trace, the started sort replays it instead of running the algorithm until a new array is
+        generated or another algorithm is chosen
+
+        :param path: the path of the trace file
         """
-        dist = len(self._nums) // 2
-        iteration = 1
-        while dist > 0:
-            for i in range(dist, len(self._nums)):
-                j = i
-                while j >= dist and self._nums[j - dist] > self._nums[j]:
-                    self._events_handler()
-                    self._clock.tick(60)
-                    if not self._sort_ctrls['shell']:
-                        return
-                    self._nums[j], self._nums[j - dist] = self._nums[j - dist], self._nums[j]
-                    self._sort_update_screen(j)
-                    j -= dist
-            iteration += 1
-            dist //= 2
-        self._sort_ctrls['shell'] = False
-        self._sorted = True
+        self._reset_sort()
+        self._trace = Trace(path)
+        self._chosen_sort = self._trace.name
+        self._sort_name_btn.update_text(self._chosen_sort.capitalize())
+        self._set_nums(self._trace.initial())
+        self._update_bars()
 
     def main_loop(self):
         """
         Main program handler
         """
-        self._generate_nums()
-        self._update_bars()
-        while self._running:
-            self._events_handler()
-            if self._sort_ctrls['bubble']:
-                self._bubble_sort()
-            if self._sort_ctrls['insertion']:
-                self._insertion_sort()
-            if self._sort_ctrls['merge']:
-                self._merge_sort()
-            if self._sort_ctrls['selection']:
-                self._selection_sort()
-            if self._sort_ctrls['quick']:
-                self._quick_sort()
-            if self._sort_ctrls['heap']:
-                self._heap_sort()
-            if self._sort_ctrls['counting']:
-                self._counting_sort()
-            if self._sort_ctrls['radix']:
-                self._radix_sort()
-            if self._sort_ctrls['shell']:
-                self._shell_sort()
-            if self._sorted:
-                self._sort_states.reset()
-                self._start_pause_btn.update_text(next(self._sort_states).capitalize())
-            self._update_screen()
-            self._clock.tick(60)
+        # the icon is loaded only when the window is run interactively, a headless window has no icon to show
+        if pg.display.get_driver() != 'dummy':
+            pg.display.set_icon(load_image('img/icon.png'))
+        if self._trace is None:
+            self._generate_nums()
+            self._update_bars()
+        profiler = self._profiler
+        try:
+            while self._running:
+                profiler.begin_frame()
+                with profiler.measure('events'):
+                    self._events_handler()
+                    if self._commands:
+                        self._execute_commands()
+                if self._sorting and self._process_engine:
+                    self._poll_engine()  # times its reading of the engine and the rebuild of the bars separately
+                elif self._sorting:
+                    count = self._scheduler.batch()
+                    with profiler.measure('sort'):
+                        start = perf_counter()
+                        self._advance_sort(count)
+                        self._scheduler.report(count, perf_counter() - start)
+                self._update_screen()
+                profiler.end_frame()
+                if self._show_profiler and profiler.frames % 30 == 0:
+                    self._profiler_changed = True
+                self._clock.tick(60)
+        finally:
+            self._stop_engine()
+            if self._cache_writer is not None:
+                self._cache_writer.shutdown()
+        if self._profile:
+            print(profiler.report())
 
 
 if __name__ == '__main__':
-    root = Visualizer()
+    parser = argparse.ArgumentParser(description='Sorting algorithms visualizer')
+    parser.add_argument('--backend', choices=['pygame', 'numpy'], default='pygame')
+    parser.add_argument('--number', type=array_length, default=600, help='the length of the generated array')
+    parser.add_argument('--ops-per-second', type=float, default=600,
+                        help='the speed of the sort, inf to perform as many operations as fit in a frame')
+    parser.add_argument('--replay', help='a trace file recorded with traces.py to replay')
+    parser.add_argument('--counters-csv',
+                        help='a CSV file the operation counters of every finished sort are appended to')
+    parser.add_argument('--profile', action='store_true', help='print the render loop profile when exiting')
+    parser.add_argument('--distribution', choices=list(DISTRIBUTIONS), default='random',
+                        help='the shape of the generated arrays')
+    parser.add_argument('--seed', type=int, help='the seed of the first generated array')
+    parser.add_argument('--engine', choices=['inline', 'process'], default='inline',
+                        help='run the sort in the main loop or in a separate process sharing the array')
+    parser.add_argument('--trace-cache-size', type=float, default=MAX_BYTES / 2 ** 20, metavar='MIB',
+                        help='the size limit of the cache of the computed traces, 0 to disable the cache')
+    parser.add_argument('--full-redraw', action='store_true',
+                        help='rebuild all bars and redraw the whole screen every frame instead of the changed areas')
+    args = parser.parse_args()
+    root = Visualizer(ops_per_second=args.ops_per_second, backend=args.backend, number=args.number,
+                      counters_csv=args.counters_csv, profile=args.profile, distribution=args.distribution,
+                      seed=args.seed, engine=args.engine, trace_cache_size=int(args.trace_cache_size * 2 ** 20),
+                      incremental=not args.full_redraw)
+    if args.replay:
+        root.load_trace(args.replay)
     root.main_loop()
@@ -0,0 +1,17 @@
+import os
+import random
+import sys
+
+import pytest
+
+# the modules live in the repository's root, next to the tests directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def nums():
+    """
+    Seeded random array shared by the tests of the recorded and replayed runs
+    """
+    rng = random.Random(1)
+    return [rng.randint(1, 600) for _ in range(80)]
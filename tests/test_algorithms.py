@@ -0,0 +1,103 @@
+import random
+from functools import total_ordering
+
+import pytest
+
+from algorithms import ALGORITHMS, ALLOC, FREE, HIGHLIGHT, LANE, SWAP, WRITE
+from counters import Counters
+
+# the algorithms claiming stability, sorted as keyed numbers so the equal ones written through buffers can be told apart
+STABLE = ['bubble', 'insertion', 'merge', 'tim', 'ping-pong', 'k-way', 'rotation', 'block-merge']
+
+
+@total_ordering
+class _Keyed:
+    """
+    Number compared by its key only, tagged with its original position
+    """
+    def __init__(self, key: int, tag: int):
+        self.key = key
+        self.tag = tag
+
+    def __eq__(self, other) -> bool:
+        return self.key == other.key
+
+    def __lt__(self, other) -> bool:
+        return self.key < other.key
+
+
+def _arrays():
+    rng = random.Random(0)
+    return {
+        'empty': [],
+        'single': [5],
+        'pair': [2, 1],
+        'sorted': list(range(1, 101)),
+        'reversed': list(range(100, 0, -1)),
+        'equal': [7] * 50,
+        'few_unique': [rng.randint(1, 4) for _ in range(150)],
+        'random': [rng.randint(1, 600) for _ in range(257)],
+    }
+
+
+def _replay(ops, nums: list) -> list:
+    """
+    Applies the operations to a copy of the array, checking the indices of every operation
+    """
+    nums = list(nums)
+    for op in ops:
+        if op.code == SWAP:
+            assert 0 <= op.a < len(nums) and 0 <= op.b < len(nums)
+            nums[op.a], nums[op.b] = nums[op.b], nums[op.a]
+        elif op.code == WRITE:
+            assert 0 <= op.a < len(nums)
+            nums[op.a] = op.b
+        elif op.code in (ALLOC, FREE):
+            assert op.b == 0 and op.a >= 0
+        elif op.code == LANE:
+            assert 0 <= op.a <= max(len(nums) - 1, 0)
+        elif op.code != HIGHLIGHT:
+            assert 0 <= op.a < len(nums) and 0 <= op.b < len(nums)
+    return nums
+
+
+@pytest.mark.parametrize('name', list(ALGORITHMS))
+@pytest.mark.parametrize('case', list(_arrays()))
+def test_sorts(name, case):
+    nums = _arrays()[case]
+    work = list(nums)
+    ops = list(ALGORITHMS[name](work))
+    assert work == sorted(nums)
+    assert _replay(ops, nums) == sorted(nums)
+
+
+@pytest.mark.parametrize('name', list(ALGORITHMS))
+def test_auxiliary_memory_is_freed(name):
+    counters = Counters()
+    for op in ALGORITHMS[name](_arrays()['random']):
+        counters.count(op)
+    assert counters.aux_memory == 0
+
+
+@pytest.mark.parametrize('name', STABLE)
+def test_stable(name):
+    keyed = [_Keyed(num, tag) for tag, num in enumerate(_arrays()['few_unique'])]
+    work = list(keyed)
+    ops = list(ALGORITHMS[name](work))
+    assert [num.tag for num in _replay(ops, keyed)] == [num.tag for num in work]
+    pairs = [(num.key, num.tag) for num in work]
+    assert pairs == sorted(pairs)
+
+
+@pytest.mark.parametrize('name', ['counting', 'radix', 'radix-8', 'radix-11', 'radix-16', 'msd-radix',
+                                  'american-flag', 'bucket'])
+def test_distribution_sorts_wide_range(name):
+    nums = [0, 10 ** 12, 7, -3, 10 ** 12, 42, -(10 ** 9)]
+    work = list(nums)
+    counters = Counters()
+    ops = list(ALGORITHMS[name](work))
+    for op in ops:
+        counters.count(op)
+    assert work == sorted(nums)
+    assert _replay(ops, nums) == sorted(nums)
+    assert counters.peak_aux_memory < 1 << 17  # no counters for every number of the range
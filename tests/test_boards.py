@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pygame as pg
+import pytest
+
+from boards import ArrayBoard, BucketBoard
+
+RECT = pg.Rect(0, 0, 100, 60)
+
+
+def _render(board) -> np.ndarray:
+    """
+    Draws the board on a fresh surface and returns its pixels
+    """
+    surface = pg.Surface(RECT.size, depth=32)
+    board.draw(surface)
+    return pg.surfarray.array2d(surface)
+
+
+def _aggregates(board: BucketBoard) -> tuple:
+    return board._mins.tolist(), board._maxs.tolist(), board._sums.tolist()
+
+
+@pytest.mark.parametrize('swaps', [1, 20, 2000])  # a few buckets touched, or enough to aggregate all of them again
+def test_bucket_update_matches_recompute(swaps):
+    rng = random.Random(swaps)
+    nums = [rng.randint(1, 1000) for _ in range(1037)]
+    board = BucketBoard(RECT)
+    board.set_values(nums, selected=5)
+    _render(board)
+    dirty = set()
+    for _ in range(swaps):
+        i, j = rng.randrange(len(nums)), rng.randrange(len(nums))
+        nums[i], nums[j] = nums[j], nums[i]
+        dirty.update((i, j))
+    board.update(dirty, nums, selected=700)
+    fresh = BucketBoard(RECT)
+    fresh.set_values(nums, selected=700)
+    assert _aggregates(board) == _aggregates(fresh)
+    assert np.array_equal(_render(board), _render(fresh))
+
+
+def test_bucket_updates_between_draws():
+    rng = random.Random(0)
+    nums = [rng.randint(1, 1000) for _ in range(500)]
+    board = BucketBoard(RECT)
+    board.set_values(nums)
+    _render(board)
+    for _ in range(3):  # the columns touched by all updates since the last draw are rasterized
+        i, j = rng.randrange(len(nums)), rng.randrange(len(nums))
+        nums[i], nums[j] = nums[j], nums[i]
+        board.update({i, j}, nums, selected=i)
+    fresh = BucketBoard(RECT)
+    fresh.set_values(nums, selected=i)
+    assert _aggregates(board) == _aggregates(fresh)
+    assert np.array_equal(_render(board), _render(fresh))
+
+
+def test_array_board_update_matches_set_values():
+    nums = list(range(1, 51))
+    board = ArrayBoard(RECT)
+    board.set_values(nums)
+    _render(board)
+    nums[3], nums[40] = nums[40], nums[3]
+    board.update({3, 40}, nums, selected=3)
+    fresh = ArrayBoard(RECT)
+    fresh.set_values(nums, selected=3)
+    assert np.array_equal(_render(board), _render(fresh))
+
+
+@pytest.mark.parametrize('board_cls, n', [(ArrayBoard, 50), (ArrayBoard, 100), (BucketBoard, 1037)])
+def test_draw_changed_columns_only(board_cls, n):
+    rng = random.Random(n)
+    nums = [rng.randint(1, 1000) for _ in range(n)]
+    board = board_cls(RECT)
+    board.set_values(nums)
+    surface = pg.Surface(RECT.size, depth=32)
+    assert board.draw(surface, changed_only=True) == [RECT]  # the first draw blits the whole board
+    assert board.draw(surface, changed_only=True) == []
+    i, j = 3, n - 2
+    nums[i], nums[j] = nums[j], nums[i]
+    board.update({i, j}, nums, selected=i)
+    rects = board.draw(surface, changed_only=True)
+    assert rects and all(RECT.contains(rect) and rect.height == RECT.height for rect in rects)
+    assert sum(rect.width for rect in rects) < RECT.width // 4
+    fresh = board_cls(RECT)
+    fresh.set_values(nums, selected=i)
+    assert np.array_equal(pg.surfarray.array2d(surface), _render(fresh))
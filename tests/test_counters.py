@@ -0,0 +1,29 @@
+import csv
+
+from algorithms import ALLOC, COMPARE, FREE, Operation, SWAP, WRITE
+from counters import Counters, append_csv
+
+
+def test_count_operations():
+    counters = Counters()
+    for op in [Operation(COMPARE, 0, 1), Operation(SWAP, 0, 1), Operation(WRITE, 2, 7), Operation(ALLOC, 10),
+               Operation(ALLOC, 5), Operation(FREE, 10), Operation(COMPARE, 1, 2)]:
+        counters.count(op)
+    assert counters.as_dict() == {'comparisons': 2, 'swaps': 1, 'writes': 1, 'allocations': 2, 'aux_memory': 5,
+                                  'peak_aux_memory': 15}
+
+
+def test_append_csv_writes_header_once(tmp_path):
+    path = str(tmp_path / 'counters.csv')
+    append_csv(path, {'algorithm': 'bubble', 'comparisons': 10})
+    append_csv(path, {'algorithm': 'quick', 'comparisons': 4})
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows == [['algorithm', 'comparisons'], ['bubble', '10'], ['quick', '4']]
+
+
+def test_append_csv_to_empty_file(tmp_path):
+    path = tmp_path / 'counters.csv'
+    path.write_text('')
+    append_csv(str(path), {'algorithm': 'heap', 'swaps': 3})
+    assert path.read_text().splitlines() == ['algorithm,swaps', 'heap,3']
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from algorithms import ALGORITHMS
+from counters import Counters
+from engine import SortEngine
+from scheduler import UNTHROTTLED
+
+
+def _wait(condition, timeout: float = 10.0):
+    """
+    Polls the condition until it holds, failing after the timeout
+    """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'the engine did not get there in time'
+        time.sleep(0.005)
+
+
+def _expected_counters(name: str, nums: list) -> tuple:
+    """
+    Returns the number of operations and the counters of the algorithm run in this process
+    """
+    counters = Counters()
+    ops = 0
+    for op in ALGORITHMS[name](list(nums)):
+        counters.count(op)
+        ops += 1
+    return ops, counters.as_dict()
+
+
+@pytest.mark.parametrize('name', ['bubble', 'merge'])
+def test_finishes_sorted(nums, name):
+    engine = SortEngine(name, nums)
+    try:
+        assert engine.step == 0 and engine.selected is None and not engine.finished  # created paused
+        engine.resume()
+        _wait(lambda: engine.finished)
+        ops, counters = _expected_counters(name, nums)
+        assert engine.values.tolist() == sorted(nums)
+        assert engine.step == ops
+        assert engine.counters.as_dict() == counters
+        _wait(lambda: engine.exitcode is not None)
+        assert engine.exitcode == 0
+    finally:
+        engine.stop()
+
+
+def test_pause_and_resume(nums):
+    engine = SortEngine('bubble', nums, rate=200)
+    try:
+        engine.resume()
+        _wait(lambda: engine.step > 5)
+        engine.pause()
+        time.sleep(0.05)  # the worker stops at its next check of the signals
+        paused_step = engine.step
+        time.sleep(0.2)
+        assert engine.step == paused_step
+        assert not engine.finished
+        assert engine.counters.comparisons > 0
+        engine.rate = UNTHROTTLED
+        assert engine.rate == UNTHROTTLED
+        engine.resume()
+        _wait(lambda: engine.finished)
+        assert engine.values.tolist() == sorted(nums)
+    finally:
+        engine.stop()
+
+
+def test_stop_running(nums):
+    engine = SortEngine('bubble', nums, rate=100)
+    engine.resume()
+    _wait(lambda: engine.step > 0)
+    engine.stop()
+    assert engine.exitcode == 0  # the worker returned at the stop signal instead of being killed
+
+
+def test_stop_paused(nums):
+    engine = SortEngine('bubble', nums)
+    engine.stop()
+    assert engine.exitcode is None  # the worker was never started
@@ -0,0 +1,110 @@
+import random
+import struct
+
+import numpy as np
+import pytest
+
+from export import PALETTE, _lzw, export
+from workloads import generate
+
+
+def _lzw_decode(data: bytes, min_code_size: int) -> list:
+    """
+    Reference decoder of the variable-length LZW of GIF
+    """
+    clear = 1 << min_code_size
+    table = {}
+    size = min_code_size + 1
+    next_code = clear + 2
+    previous = None
+    out = []
+    bits = count = i = 0
+    while True:
+        while count < size:
+            bits |= data[i] << count
+            count += 8
+            i += 1
+        code = bits & ((1 << size) - 1)
+        bits >>= size
+        count -= size
+        if code == clear:
+            table = {k: [k] for k in range(clear)}
+            size, next_code, previous = min_code_size + 1, clear + 2, None
+            continue
+        if code == clear + 1:
+            return out
+        if previous is None:
+            entry = table[code]
+        elif code in table:
+            entry = table[code]
+        else:
+            assert code == next_code
+            entry = previous + [previous[0]]
+        out += entry
+        if previous is not None and next_code < 4096:
+            table[next_code] = previous + [entry[0]]
+            next_code += 1
+            if next_code == 1 << size and size < 12:
+                size += 1
+        previous = entry
+
+
+def _decode_gif(path: str) -> list:
+    """
+    Returns the palette indices of every frame of the GIF written by the export
+    """
+    data = open(path, 'rb').read()
+    assert data[:6] == b'GIF89a'
+    width, height, packed = struct.unpack_from('<HHB', data, 6)
+    p = 13 + 3 * 2 ** ((packed & 7) + 1)
+    canvas = np.zeros((height, width), dtype=np.uint8)
+    frames = []
+    while data[p] != 0x3B:
+        if data[p] == 0x21:
+            p += 2
+            while data[p]:
+                p += data[p] + 1
+            p += 1
+            continue
+        left, top, w, h = struct.unpack_from('<HHHH', data, p + 1)
+        min_code_size = data[p + 10]
+        p += 11
+        compressed = bytearray()
+        while data[p]:
+            compressed += data[p + 1:p + 1 + data[p]]
+            p += data[p] + 1
+        p += 1
+        canvas[top:top + h, left:left + w] = np.array(_lzw_decode(compressed, min_code_size)).reshape(h, w)
+        frames.append(canvas.copy())
+    return frames
+
+
+@pytest.mark.parametrize('min_code_size', [2, 3, 8])
+@pytest.mark.parametrize('n', [1, 2, 3, 100, 20000])
+def test_lzw_round_trip(min_code_size, n):
+    rng = random.Random(n)
+    pixels = bytes(rng.randrange(1 << min_code_size) if rng.random() < 0.7 else 0 for _ in range(n))
+    assert _lzw_decode(_lzw(pixels, min_code_size), min_code_size) == list(pixels)
+
+
+def test_gif_matches_png_frames(tmp_path):
+    pg = pytest.importorskip('pygame')
+    nums = generate('random', 40, 1).tolist()
+    size = (80, 60)
+    count = export('quick', nums, str(tmp_path / 'quick.gif'), 'gif', size, stride=5, workers=1, chunk=4)
+    assert export('quick', nums, str(tmp_path / 'frames'), 'frames', size, stride=5, workers=1, chunk=4) == count
+    frames = _decode_gif(str(tmp_path / 'quick.gif'))
+    assert len(frames) == count
+    palette = np.array(PALETTE + ((0, 0, 0),) * (8 - len(PALETTE)), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        surface = pg.image.load(str(tmp_path / 'frames' / f'frame_{i:06d}.png'))
+        assert (pg.surfarray.array3d(surface).transpose(1, 0, 2) == palette[frame]).all()
+
+
+def test_frames_do_not_depend_on_chunks(tmp_path):
+    nums = generate('random', 64, 3).tolist()
+    for chunk in (32, 7):
+        export('merge', nums, str(tmp_path / f'{chunk}.gif'), 'gif', (64, 40), stride=3, workers=1, chunk=chunk)
+    first, second = _decode_gif(str(tmp_path / '32.gif')), _decode_gif(str(tmp_path / '7.gif'))
+    assert len(first) == len(second)
+    assert all((a == b).all() for a, b in zip(first, second))
@@ -0,0 +1,52 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from external import ITEM, external_sort, make_input, parse_size
+
+
+def _sort(input_path, output_path, **kwargs):
+    deque(external_sort(str(input_path), str(output_path), **kwargs), maxlen=0)
+
+
+def _read(path) -> np.ndarray:
+    if str(path).endswith(('.csv', '.txt')):
+        text = path.read_text().replace(',', ' ')
+        return np.array(text.split(), dtype=ITEM)
+    return np.fromfile(path, dtype=ITEM)
+
+
+@pytest.mark.parametrize('n', [0, 1, 1000, 50003])
+@pytest.mark.parametrize('budget, block', [(64 << 20, 1 << 20), (8 << 10, 1 << 10), (4 << 10, 2 << 10)])
+def test_binary_matches_np_sort(tmp_path, n, budget, block):
+    make_input(str(tmp_path / 'in.bin'), n, seed=n)
+    _sort(tmp_path / 'in.bin', tmp_path / 'out.bin', budget=budget, block=block, tmp_dir=str(tmp_path))
+    assert (_read(tmp_path / 'out.bin') == np.sort(_read(tmp_path / 'in.bin'))).all()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['in.bin', 'out.bin']
+
+
+@pytest.mark.parametrize('source, target', [('in.csv', 'out.bin'), ('in.txt', 'out.csv'), ('in.bin', 'out.txt')])
+def test_text_files(tmp_path, source, target):
+    make_input(str(tmp_path / source), 5000, seed=1)
+    _sort(tmp_path / source, tmp_path / target, budget=8 << 10, block=1 << 10)
+    assert (_read(tmp_path / target) == np.sort(_read(tmp_path / source))).all()
+
+
+def test_negative_and_comma_separated(tmp_path):
+    (tmp_path / 'in.csv').write_text('5,-3, 9\n0,-3\n7')
+    _sort(tmp_path / 'in.csv', tmp_path / 'out.bin')
+    assert _read(tmp_path / 'out.bin').tolist() == [-3, -3, 0, 5, 7, 9]
+
+
+def test_rejects_truncated_binary(tmp_path):
+    (tmp_path / 'in.bin').write_bytes(b'\0' * 17)
+    with pytest.raises(ValueError):
+        _sort(tmp_path / 'in.bin', tmp_path / 'out.bin')
+
+
+def test_parse_size():
+    assert parse_size('512') == 512
+    assert parse_size('64K') == 64 << 10
+    assert parse_size('1.5m') == 3 << 19
+    assert parse_size('2GB') == 2 << 30
@@ -0,0 +1,79 @@
+import importlib
+import json
+import os
+
+import pytest
+
+import fonts
+import paths
+
+
+@pytest.fixture
+def cache_path(monkeypatch, tmp_path):
+    """
+    Path of the font cache under $XDG_CACHE_HOME pointed at the temporary directory, the modules are reloaded to pick it
+    up and restored afterwards
+    """
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    importlib.reload(paths)
+    yield importlib.reload(fonts).FONT_CACHE
+    monkeypatch.delenv('XDG_CACHE_HOME')
+    importlib.reload(paths)
+    importlib.reload(fonts)
+
+
+@pytest.fixture
+def scans(monkeypatch, tmp_path):
+    """
+    Replaces the scan of the installed fonts, every font resolves to an existing file; returns the scanned names
+    """
+    scanned = []
+
+    def match_font(name):
+        scanned.append(name)
+        path = tmp_path / f'{name}.ttf'
+        path.write_bytes(b'')
+        return str(path)
+
+    monkeypatch.setattr(fonts.pg.font, 'match_font', match_font)
+    return scanned
+
+
+def test_cache_under_xdg_cache_home(cache_path, tmp_path):
+    assert cache_path == os.path.join(str(tmp_path), 'sorting-visualizer', 'fonts.json')
+
+
+def test_miss_then_hit(cache_path, scans, tmp_path):
+    path = fonts.resolve_font('calibri')
+    assert path == str(tmp_path / 'calibri.ttf')
+    assert scans == ['calibri']
+    with open(cache_path) as f:
+        assert json.load(f) == {'calibri': path}
+    assert fonts.resolve_font('calibri') == path
+    assert fonts.resolve_font('arial') == str(tmp_path / 'arial.ttf')
+    assert scans == ['calibri', 'arial']  # only the missing font was scanned
+
+
+def test_missing_font_is_cached(cache_path, monkeypatch):
+    scanned = []
+    monkeypatch.setattr(fonts.pg.font, 'match_font', lambda name: scanned.append(name))
+    assert fonts.resolve_font('nosuchfont') is None
+    assert fonts.resolve_font('nosuchfont') is None
+    assert scanned == ['nosuchfont']  # pygame's default font is used without scanning again
+
+
+def test_deleted_font_is_scanned_again(cache_path, scans, tmp_path):
+    path = fonts.resolve_font('calibri')
+    os.remove(path)
+    assert fonts.resolve_font('calibri') == path
+    assert scans == ['calibri', 'calibri']
+
+
+def test_corrupted_cache_is_replaced(cache_path, scans):
+    os.makedirs(os.path.dirname(cache_path))
+    with open(cache_path, 'w') as f:
+        f.write('{not json')
+    path = fonts.resolve_font('calibri')
+    assert scans == ['calibri']
+    with open(cache_path) as f:
+        assert json.load(f) == {'calibri': path}
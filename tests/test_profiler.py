@@ -0,0 +1,61 @@
+import pytest
+
+import profiler
+from profiler import FrameProfiler, SECTIONS, percentile
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fake clock of the profiler, advanced by setting its value in seconds
+    """
+    now = [0.0]
+    monkeypatch.setattr(profiler, 'perf_counter', lambda: now[0])
+    return now
+
+
+def test_percentile():
+    assert percentile([], 0.5) == 0.0
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 51
+    assert percentile(values, 0.99) == 100
+    assert percentile(values, 1.0) == 100
+
+
+def test_sections_and_dropped_frames(clock):
+    prof = FrameProfiler(window=100, frame_time=0.010)
+    for frame in range(10):
+        prof.begin_frame()
+        with prof.measure('sort'):
+            clock[0] += 0.001 * (frame + 1)
+        with prof.measure('draw_bars'):
+            clock[0] += 0.002
+        with prof.measure('draw_bars'):  # the repeated sections of a frame add up
+            clock[0] += 0.001
+        prof.end_frame()
+        clock[0] += 0.5  # waiting for the clock is not part of the frame
+    assert prof.frames == 10
+    assert prof.dropped == 3  # the frames taking 11, 12 and 13 ms
+    assert prof.percentiles('sort') == pytest.approx((0.006, 0.010, 0.010))
+    assert prof.percentiles('draw_bars') == pytest.approx((0.003,) * 3)
+    assert prof.percentiles('frame') == pytest.approx((0.009, 0.013, 0.013))
+    assert prof.percentiles('events') == (0.0, 0.0, 0.0)
+    report = prof.report().splitlines()
+    assert len(report) == len(SECTIONS) + 2
+    assert report[-1] == 'dropped frames: 3 of 10'
+
+
+def test_window_keeps_last_frames(clock):
+    prof = FrameProfiler(window=5, frame_time=1.0)
+    for seconds in [10.0] * 5 + [0.1] * 5:
+        prof.begin_frame()
+        clock[0] += seconds
+        prof.end_frame()
+    assert prof.percentiles('frame') == pytest.approx((0.1, 0.1, 0.1))
+    assert prof.dropped == 5  # the dropped frames are counted over the whole run
+
+
+def test_end_without_begin_is_ignored(clock):
+    prof = FrameProfiler()
+    prof.end_frame()
+    assert prof.frames == 0
@@ -0,0 +1,79 @@
+import time
+
+import pygame as pg
+import pytest
+
+from race import RaceBoard, _Workers
+from traces import Trace, record
+
+RECT = pg.Rect(0, 0, 120, 80)
+
+
+@pytest.fixture
+def font():
+    pg.font.init()
+    return pg.font.Font(None, 14)
+
+
+def _wait(workers: _Workers, count: int, timeout: float = 30.0) -> dict:
+    """
+    Polls the workers until the given number of them finished, failing after the timeout
+    """
+    finished = {}
+    deadline = time.monotonic() + timeout
+    while len(finished) < count:
+        assert time.monotonic() < deadline, 'the workers did not finish in time'
+        finished.update(workers.poll())
+        time.sleep(0.01)
+    return finished
+
+
+def test_board_replays_trace(tmp_path, nums, font):
+    path = str(tmp_path / 'merge.svt')
+    count = record('merge', nums, path)
+    board = RaceBoard('merge', nums, RECT, font)
+    surface = pg.Surface((200, 100))
+    assert RECT.contains(board.draw(surface)[0])
+    trace = Trace(path)
+    board.start(trace)
+    board.advance(count // 2)
+    assert not board.finished
+    assert board.draw(surface)  # the changed columns and the label
+    board.advance(count)
+    assert board.finished and not board.failed
+    assert board._nums == sorted(nums)
+    board.draw(surface)
+    assert board.draw(surface) == []  # nothing changed since the last draw
+    board.close()
+
+
+def test_failed_worker_fails_only_its_board(tmp_path, nums):
+    workers = _Workers([('bubble', 'a'), ('no-such-sort', 'b'), ('quick', 'c')], nums, str(tmp_path), 2)
+    try:
+        finished = _wait(workers, 3)
+    finally:
+        workers.close()
+    assert finished['b'] is None
+    for tag, name in (('a', 'bubble'), ('c', 'quick')):
+        trace = Trace(finished[tag])
+        assert trace.name == name and len(trace)
+        trace.close()
+
+
+def test_failed_board(nums, font):
+    board = RaceBoard('bubble', nums, RECT, font)
+    board.fail()
+    board.advance(10)
+    assert board.failed and not board.finished
+    assert board.draw(pg.Surface((200, 100)))
+
+
+def test_close_kills_running_workers(tmp_path):
+    nums = list(range(3000, 0, -1))
+    workers = _Workers([('bubble', 'a'), ('insertion', 'b'), ('selection', 'c')], nums, str(tmp_path), 2)
+    assert workers.poll() == []
+    processes = workers.processes
+    assert len(processes) == 2  # the third waits for a free worker
+    workers.close()
+    assert all(not process.is_alive() and process.exitcode < 0 for process in processes)
+    assert workers.processes == [] and workers.poll() == []
@@ -0,0 +1,76 @@
+import pytest
+
+import scheduler
+from scheduler import Scheduler, UNTHROTTLED
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Fake clock of the scheduler, advanced by setting its value in seconds
+    """
+    now = [0.0]
+    monkeypatch.setattr(scheduler, 'perf_counter', lambda: now[0])
+    return now
+
+
+def test_batch_follows_elapsed_time(clock):
+    sched = Scheduler(rate=600, frame_time=1 / 60)
+    sched.report(1, 1e-6)  # cheap operations, the capacity does not limit the batches
+    assert sched.batch() == 10  # the first frame assumes the frame time elapsed
+    clock[0] += 0.05
+    assert sched.batch() == 30
+    clock[0] += 10
+    assert sched.batch() == 150  # a long pause is not caught up beyond 0.25 s
+
+
+def test_credit_carries_over(clock):
+    sched = Scheduler(rate=25, frame_time=1 / 60)
+    sched.report(1, 1e-6)
+    counts = []
+    for _ in range(60):
+        counts.append(sched.batch())
+        clock[0] += 1 / 60
+    # less than one operation per frame, the fractions add up to the rate over a second
+    assert set(counts) == {0, 1}
+    assert sum(counts) in (24, 25)
+
+
+def test_reset_drops_credit(clock):
+    sched = Scheduler(rate=30, frame_time=1 / 60)
+    sched.report(1, 1e-6)
+    assert sched.batch() == 0  # half an operation is carried over
+    sched.reset()
+    clock[0] += 5
+    assert sched.batch() == 0  # the time since the reset is not caught up and the half is dropped
+
+
+def test_capacity_adapts_to_cost(clock):
+    sched = Scheduler(rate=UNTHROTTLED, frame_time=0.02, budget=0.5)
+    assert sched.batch() == 1  # nothing measured yet
+    sched.report(10, 0.001)
+    assert sched.capacity() == 100
+    assert sched.batch() == 100
+    for _ in range(50):
+        sched.report(100, 0.1)  # the operations got ten times more expensive
+    assert sched.capacity() == pytest.approx(10, abs=1)
+    sched.report(0, 1.0)  # an empty batch does not change the cost
+    assert sched.capacity() == pytest.approx(10, abs=1)
+
+
+def test_backlog_is_dropped_over_capacity(clock):
+    sched = Scheduler(rate=100000, frame_time=0.02, budget=0.5)
+    sched.report(1, 0.001)  # 10 operations fit in the frame
+    assert sched.batch() == 10
+    clock[0] += 0.02
+    assert sched.batch() == 10  # the credit over the capacity is not carried over
+
+
+def test_rate_setter_resets(clock):
+    sched = Scheduler(rate=10, frame_time=1 / 60)
+    sched.report(1, 1e-6)
+    sched.batch()
+    clock[0] += 0.25
+    sched.rate = 120
+    assert sched.rate == 120
+    assert sched.batch() == 2  # the first frame after the change assumes the frame time elapsed
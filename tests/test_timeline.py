@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from algorithms import ALGORITHMS, SWAP, WRITE
+from timeline import Timeline
+
+
+def _states(name: str, nums: list) -> list:
+    """
+    Returns the array after every operation of the algorithm, the initial array first
+    """
+    work = list(nums)
+    states = [list(work)]
+    for op in ALGORITHMS[name](list(nums)):
+        if op.code == SWAP:
+            work[op.a], work[op.b] = work[op.b], work[op.a]
+        elif op.code == WRITE:
+            work[op.a] = op.b
+        states.append(list(work))
+    return states
+
+
+@pytest.mark.parametrize('name', ['insertion', 'merge', 'radix'])
+def test_seek_matches_run(nums, name):
+    states = _states(name, nums)
+    # a tiny interval and memory limit exercise the snapshots and their thinning
+    timeline = Timeline(nums, ALGORITHMS[name], interval=1, memory_limit=8 * len(nums) * 4)
+    work = list(nums)
+    rng = random.Random(3)
+    for step in [len(states) - 1, 0] + [rng.randrange(len(states)) for _ in range(50)]:
+        changed = timeline.seek(work, step)
+        assert timeline.position == step
+        assert work == states[step]
+        assert changed is None or all(i < len(nums) for i in changed)
+    assert len(timeline) == len(states) - 1
+
+
+def test_back_undoes_forward(nums):
+    states = _states('merge', nums)
+    timeline = Timeline(nums, ALGORITHMS['merge'])
+    work = list(nums)
+    for _ in timeline.forward(work):
+        pass
+    assert timeline.finished and work == sorted(nums)
+    for step in range(len(states) - 1, 0, -1):
+        assert timeline.back(work) is not None
+        assert work == states[step - 1]
+    assert timeline.back(work) is None
+    assert timeline.position == 0
+
+
+def test_lazy_recording_and_operations(nums):
+    timeline = Timeline(nums, ALGORITHMS['quick'])
+    assert len(timeline) == 0
+    work = list(nums)
+    timeline.seek(work, 10)
+    assert len(timeline) == 10 and not timeline.finished
+    timeline.seek(work, float('inf'))
+    assert list(timeline.operations()) == list(ALGORITHMS['quick'](list(nums)))
+    assert list(timeline.initial) == nums
+
+
+def test_lanes_follow_position():
+    nums = list(range(200, 0, -1))
+    timeline = Timeline(nums, ALGORITHMS['parallel-merge'])
+    work = list(nums)
+    timeline.seek(work, float('inf'))
+    lane_steps = [i for i, op in enumerate(timeline.operations()) if op.code.name == 'LANE']
+    assert timeline.lanes() == [(0, -1)]
+    first = lane_steps[0]
+    timeline.seek(work, first)
+    assert timeline.lanes() == []
+    count = next(k for k, step in enumerate(lane_steps) if step != first + k)  # the regions of the first phase
+    timeline.seek(work, first + count)
+    regions = timeline.lanes()
+    assert len(regions) > 1 and regions[0][0] == 0
+    assert [start for start, _ in regions] == sorted(start for start, _ in regions)
+    timeline.back(work)
+    assert timeline.lanes() == regions[:-1]
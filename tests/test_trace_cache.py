@@ -0,0 +1,75 @@
+import os
+import time
+
+import trace_cache
+from algorithms import ALGORITHMS
+from trace_cache import TraceCache
+from traces import Trace
+
+
+def _size(name: str, nums: list, tmp_path) -> int:
+    path = TraceCache(str(tmp_path / 'sizes')).path(name, nums, str(tmp_path / f'{name}.size.svt'))
+    return os.path.getsize(path)
+
+
+def test_keys(nums):
+    cache = TraceCache()
+    assert cache.key('heap', nums) == cache.key('heap', list(nums))
+    assert cache.key('heap', nums) != cache.key('heap-4', nums)
+    assert cache.key('heap', nums) != cache.key('heap', nums[::-1])
+    assert cache.key('heap', nums) != cache.key('heap', nums[:-1])
+
+
+def test_miss_then_hit(tmp_path, nums):
+    cache = TraceCache(str(tmp_path / 'cache'))
+    assert cache.lookup('merge', nums) is None
+    first = cache.path('merge', nums, str(tmp_path / 'a.svt'))
+    second = cache.path('merge', nums, str(tmp_path / 'b.svt'))
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(cache) == 1
+    assert open(first, 'rb').read() == open(second, 'rb').read()
+    trace = Trace(second)
+    try:
+        assert list(trace.operations()) == list(ALGORITHMS['merge'](list(nums)))
+    finally:
+        trace.close()
+
+
+def test_store_from_operations(tmp_path, nums):
+    cache = TraceCache(str(tmp_path / 'cache'))
+    path = cache.store('quick', nums, ALGORITHMS['quick'](list(nums)))
+    assert cache.lookup('quick', nums) == path
+
+
+def test_oversized_trace_is_not_stored(tmp_path, nums):
+    cache = TraceCache(str(tmp_path / 'cache'), max_bytes=_size('bubble', nums, tmp_path) - 1)
+    cache.path('quick', nums, str(tmp_path / 'quick.svt'))
+    scratch = cache.path('bubble', nums, str(tmp_path / 'bubble.svt'))
+    assert os.path.exists(scratch)
+    assert cache.lookup('bubble', nums) is None
+    assert cache.lookup('quick', nums) is not None
+
+
+def test_least_recently_used_are_evicted(tmp_path, nums, monkeypatch):
+    monkeypatch.setattr(trace_cache, '_GRACE', 0)
+    names = ['quick', 'heap', 'shell']
+    cache = TraceCache(str(tmp_path / 'cache'), max_bytes=sum(_size(name, nums, tmp_path) for name in names))
+    for age, name in zip((300, 200, 100), names):
+        path = cache.store(name, nums, ALGORITHMS[name](list(nums)))
+        os.utime(path, (time.time() - age,) * 2)
+    cache.lookup('quick', nums)  # used last now, so heap is the least recently used one
+    cache.store('intro', nums, ALGORITHMS['intro'](list(nums)))
+    assert cache.lookup('heap', nums) is None
+    assert cache.lookup('quick', nums) is not None
+    assert cache.lookup('intro', nums) is not None
+    assert cache.size <= sum(_size(name, nums, tmp_path) for name in names)
+
+
+def test_recent_traces_survive_eviction(tmp_path, nums):
+    sizes = [_size(name, nums, tmp_path) for name in ('quick', 'heap')]
+    cache = TraceCache(str(tmp_path / 'cache'), max_bytes=max(sizes))  # fits either trace but not both
+    cache.path('quick', nums, str(tmp_path / 'quick.svt'))
+    cache.path('heap', nums, str(tmp_path / 'heap.svt'))
+    assert len(cache) == 2
+    cache.clear()
+    assert len(cache) == 0
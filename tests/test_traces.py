@@ -0,0 +1,78 @@
+import pytest
+
+from algorithms import ALGORITHMS, Operation, SWAP, WRITE
+from traces import RECORD, Trace, record, replay, write
+
+
+@pytest.mark.parametrize('name', ['bubble', 'merge', 'heap-4', 'radix'])
+def test_record_round_trip(tmp_path, nums, name):
+    path = str(tmp_path / 'run.svt')
+    count = record(name, nums, path)
+    expected = list(ALGORITHMS[name](list(nums)))
+    trace = Trace(path)
+    try:
+        assert trace.name == name
+        assert len(trace) == count == len(expected)
+        assert trace.initial() == nums
+        assert list(trace.operations()) == expected
+        assert list(trace.operations(count // 2)) == expected[count // 2:]
+        work = trace.initial()
+        ops = list(trace.replay(work))
+        assert ops == expected
+        assert work == sorted(nums)
+    finally:
+        trace.close()
+
+
+def test_replay_from_position(tmp_path, nums):
+    path = str(tmp_path / 'run.svt')
+    count = record('quick', nums, path)
+    trace = Trace(path)
+    try:
+        work = trace.initial()
+        ops = trace.replay(work)
+        for _ in range(count // 3):
+            next(ops)
+        ops.close()
+        assert list(trace.replay(work, count // 3))
+        assert work == sorted(nums)
+    finally:
+        trace.close()
+
+
+def test_write_and_replay_file(tmp_path):
+    path = str(tmp_path / 'ops.svt')
+    ops = [Operation(SWAP, 0, 2), Operation(WRITE, 1, -5)]
+    assert write('custom', [3, 2, 1], ops, path) == 2
+    work = [3, 2, 1]
+    assert list(replay(path, work)) == ops
+    assert work == [1, -5, 3]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        Trace(str(path))
+
+
+@pytest.mark.parametrize('extra', [b'\0' * RECORD.size, b'\0' * 5])
+def test_rejects_trailing_bytes(tmp_path, extra):
+    path = tmp_path / 'run.svt'
+    write('custom', [3, 2, 1], [Operation(SWAP, 0, 2)], str(path))
+    path.write_bytes(path.read_bytes() + extra)
+    with pytest.raises(ValueError):
+        Trace(str(path))
+
+
+def test_rejects_truncated_file(tmp_path):
+    path = tmp_path / 'run.svt'
+    write('custom', [3, 2, 1], [Operation(SWAP, 0, 2), Operation(WRITE, 1, -5)], str(path))
+    path.write_bytes(path.read_bytes()[:-3])
+    with pytest.raises(ValueError):
+        Trace(str(path))
+
+
+def test_rejects_long_names(tmp_path):
+    with pytest.raises(ValueError):
+        write('x' * 17, [3, 2, 1], [], str(tmp_path / 'run.svt'))
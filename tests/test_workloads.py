@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from workloads import DISTRIBUTIONS, generate
+
+
+@pytest.mark.parametrize('distribution', list(DISTRIBUTIONS))
+def test_same_seed_same_array(distribution):
+    nums = generate(distribution, 1000, seed=5)
+    assert nums.dtype == np.int64
+    assert len(nums) == 1000
+    assert nums.min() >= 1 and nums.max() <= 1000
+    assert np.array_equal(nums, generate(distribution, 1000, seed=5))
+
+
+@pytest.mark.parametrize('distribution', ['random', 'nearly_sorted', 'few_unique', 'gaussian'])
+def test_other_seed_other_array(distribution):
+    assert not np.array_equal(generate(distribution, 1000, seed=5), generate(distribution, 1000, seed=6))
+
+
+@pytest.mark.parametrize('distribution', list(DISTRIBUTIONS))
+@pytest.mark.parametrize('n', [0, 1, 3])
+def test_short_arrays(distribution, n):
+    assert len(generate(distribution, n, seed=0)) == n
+
+
+def test_sorted_and_reversed():
+    nums = generate('sorted', 500, seed=1)
+    assert np.all(nums[:-1] <= nums[1:])
+    nums = generate('reversed', 500, seed=1)
+    assert np.all(nums[:-1] >= nums[1:])
+
+
+def test_nearly_sorted():
+    nums = generate('nearly_sorted', 1000, seed=1)
+    assert np.count_nonzero(nums[:-1] > nums[1:]) <= 2 * 10  # every of the 10 swaps breaks at most two pairs
+
+
+def test_few_unique():
+    assert len(np.unique(generate('few_unique', 1000, seed=1))) <= 8
+
+
+def test_sawtooth_runs():
+    nums = generate('sawtooth', 800, seed=1, low=1, high=100)
+    runs = np.split(nums, np.flatnonzero(nums[:-1] > nums[1:]) + 1)
+    assert len(runs) == 8
+    for run in runs:
+        assert np.all(run[:-1] <= run[1:])
+        assert run[0] == 1 and run[-1] == 100
+
+
+def test_organ_pipe():
+    nums = generate('organ_pipe', 101, seed=1)
+    assert np.all(nums[:50] <= nums[1:51])
+    assert np.all(nums[50:-1] >= nums[51:])
+
+
+def test_median_of_3_killer():
+    # Musser's sequence for 20 numbers
+    assert generate('median_of_3_killer', 20, low=1, high=20).tolist() == [1, 11, 3, 13, 5, 15, 7, 17, 9, 19,
+                                                                            2, 4, 6, 8, 10, 12, 14, 16, 18, 20]
+    nums = generate('median_of_3_killer', 1000, low=1, high=1000)
+    assert sorted(nums.tolist()) == list(range(1, 1001))
+
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        generate('zigzag', 10)
@@ -0,0 +1,203 @@
+"""
+Seekable timeline of a sorting algorithm's run. Every operation is stored as an undoable delta and full snapshots of the
+array are taken periodically, so the run can be scrubbed forward and backward without running the algorithm again.
+"""
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterator, Optional
+
+from algorithms import LANE, Operation, OpCode, SWAP, WRITE
+from counters import Counters
+
+_OPCODES = tuple(OpCode)
+
+
+class Timeline:
+    """
+    Recorded run of a sorting algorithm, the algorithm is run lazily as the timeline is moved forward. Stepping back one
+    operation is O(1) and seeking costs at most one snapshot interval of operations on top of restoring a snapshot
+    """
+    def __init__(self, nums: list, algorithm: Callable[[list], Iterator[Operation]], interval: int = 4096,
+                 memory_limit: int = 64 * 2 ** 20):
+        """
+        :param nums: the array before the first operation, it is not modified
+        :param algorithm: the sorting algorithm (or a trace replay) to record, it sorts its own copy of the array
+        :param interval: the minimal number of operations between two snapshots, it is never shorter than the array,
+            so the cost of taking snapshots stays O(1) per operation
+        :param memory_limit: the memory in bytes the snapshots may take, when exceeded every other snapshot is dropped
+            and the interval is doubled; the snapshot of the initial array is always kept
+        """
+        self._source = algorithm(list(nums))
+        self._head = array('q', nums)  # the array after all recorded operations
+        self._codes = array('B')
+        self._a = array('I')
+        self._b = array('q')
+        self._old = array('q')  # the overwritten numbers, needed to undo the writes
+        self._lane_steps = array('q')  # the indices of the LANE operations, so the regions can be found when seeking
+        self._interval = max(interval, len(nums), 1)
+        self._max_snapshots = max(memory_limit // max(8 * len(nums), 1), 2)
+        self._snapshots = {0: array('q', nums)}
+        self._position = 0
+        self._exhausted = False
+        self._counters = Counters()
+
+    def _record(self) -> bool:
+        """
+        Runs the algorithm for one more operation and stores it
+
+        :return: False if the algorithm has already finished, True otherwise
+        """
+        op = next(self._source, None)
+        if op is None:
+            self._exhausted = True
+            return False
+        self._counters.count(op)
+        code, a, b = op
+        head = self._head
+        old = 0
+        if code == SWAP:
+            head[a], head[b] = head[b], head[a]
+        elif code == WRITE:
+            old = head[a]
+            head[a] = b
+        if code == LANE:
+            self._lane_steps.append(len(self._codes))
+        self._codes.append(code)
+        self._a.append(a)
+        self._b.append(b)
+        self._old.append(old)
+        if len(self._codes) % self._interval == 0:
+            self._snapshot()
+        return True
+
+    def _snapshot(self):
+        """
+        Stores the copy of the array after all recorded operations, thinning out the snapshots above the memory limit
+        """
+        self._snapshots[len(self._codes)] = array('q', self._head)
+        if len(self._snapshots) > self._max_snapshots:
+            self._interval *= 2
+            self._snapshots = {step: snapshot for step, snapshot in self._snapshots.items()
+                               if step % self._interval == 0}
+
+    def forward(self, nums: list) -> Iterator[Operation]:
+        """
+        Applies the next operations to the array and yields them, the algorithm is run further once the recorded
+        operations run out
+
+        :param nums: the array in the state at the current position
+        """
+        while self._position < len(self._codes) or (not self._exhausted and self._record()):
+            i = self._position
+            code, a, b = self._codes[i], self._a[i], self._b[i]
+            if code == SWAP:
+                nums[a], nums[b] = nums[b], nums[a]
+            elif code == WRITE:
+                nums[a] = b
+            self._position = i + 1
+            yield Operation(_OPCODES[code], a, b)
+
+    def back(self, nums: list) -> Optional[Operation]:
+        """
+        Undoes the last applied operation
+
+        :param nums: the array in the state at the current position
+        :return: the undone operation, None at the beginning of the timeline
+        """
+        if not self._position:
+            return None
+        i = self._position - 1
+        code, a, b = self._codes[i], self._a[i], self._b[i]
+        if code == SWAP:
+            nums[a], nums[b] = nums[b], nums[a]
+        elif code == WRITE:
+            nums[a] = self._old[i]
+        self._position = i
+        return Operation(_OPCODES[code], a, b)
+
+    def seek(self, nums: list, step: int) -> Optional[set]:
+        """
+        Moves the array to the state after the given number of operations, either by walking the deltas from the current
+        position or from the nearest preceding snapshot, whichever is shorter
+
+        :param nums: the array in the state at the current position
+        :param step: the number of operations to be applied, it is clamped to the length of the run
+        :return: the indices of the changed numbers, None if the whole array was restored from a snapshot
+        """
+        while step > len(self._codes) and self._record():
+            pass
+        step = max(min(step, len(self._codes)), 0)
+        snapshot_step = max(s for s in self._snapshots if s <= step)
+        # restoring a snapshot copies the whole array, which is much cheaper per number than applying an operation
+        if abs(step - self._position) > step - snapshot_step + len(self._head) // 32:
+            nums[:] = self._snapshots[snapshot_step]
+            self._position = snapshot_step
+            deque(islice(self.forward(nums), step - snapshot_step), maxlen=0)
+            return None
+        changed = set()
+        while self._position > step:
+            op = self.back(nums)
+            if op.code == SWAP:
+                changed.update((op.a, op.b))
+            elif op.code == WRITE:
+                changed.add(op.a)
+        for op in islice(self.forward(nums), step - self._position):
+            if op.code == SWAP:
+                changed.update((op.a, op.b))
+            elif op.code == WRITE:
+                changed.add(op.a)
+        return changed
+
+    def lanes(self) -> list:
+        """
+        Returns the regions of the workers of a parallel algorithm set by the LANE operations applied so far
+
+        :return: the (first index, worker) of the regions, ascending, empty if no regions are set
+        """
+        end = bisect_left(self._lane_steps, self._position)
+        first = end
+        while first > 0:  # back to the last region starting at 0, which replaced all previous ones
+            first -= 1
+            if self._a[self._lane_steps[first]] == 0:
+                break
+        return [(self._a[i], self._b[i]) for i in self._lane_steps[first:end]]
+
+    def operations(self) -> Iterator[Operation]:
+        """
+        Yields all recorded operations, without applying them or running the algorithm further
+        """
+        for i in range(len(self._codes)):
+            yield Operation(_OPCODES[self._codes[i]], self._a[i], self._b[i])
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    @property
+    def initial(self) -> array:
+        """
+        Getter for the array before the first operation
+        """
+        return self._snapshots[0]
+
+    @property
+    def position(self) -> int:
+        """
+        Getter for the number of operations applied to the array
+        """
+        return self._position
+
+    @property
+    def counters(self) -> Counters:
+        """
+        Getter for the counters of all recorded operations, they are not moved back when the timeline is scrubbed back
+        """
+        return self._counters
+
+    @property
+    def finished(self) -> bool:
+        """
+        Getter for the information whether the algorithm finished and all its operations are applied
+        """
+        return self._exhausted and self._position == len(self._codes)
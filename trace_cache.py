@@ -0,0 +1,247 @@
+"""
+Disk cache of the computed traces. A trace is stored under the hash of the algorithm's name and parameters, the source
+of the algorithms and the input array, so rerunning an algorithm on an array it has already sorted, in the visualizer,
+a race or an export, replays the trace instead of computing the operations again. The least recently used traces are
+deleted once the cache grows over its size limit.
+
+Usage: python trace_cache.py [--clear]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+from array import array
+from functools import lru_cache
+from time import time
+from typing import Iterable, Optional
+
+from algorithms import ALGORITHMS, Operation
+from paths import CACHE_DIR
+from traces import VERSION, record, write
+
+TRACE_CACHE = os.path.join(CACHE_DIR, 'traces')
+MAX_BYTES = 512 * 2 ** 20
+_SUFFIX = '.svt'
+# the seconds a trace is kept for after its last use even above the size limit, so a path looked up by one process is
+# not evicted by another one before it is opened
+_GRACE = 60
+# the modules the operations of the algorithms depend on, the cached traces are not reused once they change
+_SOURCES = ('algorithms.py', 'parallel.py')
+
+
+@lru_cache(maxsize=None)
+def _source_digest() -> bytes:
+    """
+    Returns the hash of the algorithms' source
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for source in _SOURCES:
+        with open(os.path.join(directory, source), 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+class TraceCache:
+    """
+    Directory of the trace files named by their keys, the modification time of a file is its last use
+    """
+    def __init__(self, directory: str = TRACE_CACHE, max_bytes: int = MAX_BYTES):
+        """
+        :param directory: the directory of the trace files, created on the first store
+        :param max_bytes: the size the trace files may take, the least recently used ones are deleted above it; the
+            traces used in the last minute are kept, and a trace larger than the limit is not stored
+        """
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name: str, nums: list) -> str:
+        """
+        Returns the key of the algorithm's run on the array
+
+        :param name: the name of the algorithm
+        :param nums: the array before the first operation
+        """
+        digest = hashlib.sha256()
+        parameters = sorted(getattr(ALGORITHMS[name], 'keywords', {}).items())
+        digest.update(f'{VERSION}:{name}:{parameters}:'.encode())
+        digest.update(_source_digest())
+        digest.update(array('q', nums).tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._directory, key + _SUFFIX)
+
+    def lookup(self, name: str, nums: list) -> Optional[str]:
+        """
+        Returns the path of the cached trace and marks it as used
+
+        :param name: the name of the algorithm
+        :param nums: the array before the first operation
+        :return: the path of the trace file, None if the run is not cached
+        """
+        path = self._path(self.key(name, nums))
+        try:
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return path
+
+    def _insert(self, tmp_path: str, path: str) -> Optional[str]:
+        """
+        Moves the trace file written to the cache directory to its place and evicts the least recently used traces over
+        the size limit
+
+        :param tmp_path: the temporary path of the trace file
+        :param path: the path of the trace file in the cache
+        :return: the path of the trace file, None if the trace alone is larger than the size limit and is not cached
+        """
+        if os.path.getsize(tmp_path) > self._max_bytes:
+            return None
+        os.replace(tmp_path, path)
+        self._evict(path)
+        return path
+
+    def store(self, name: str, nums: list, ops: Iterable[Operation]) -> Optional[str]:
+        """
+        Writes the operations to the cache atomically and evicts the least recently used traces over the size limit
+
+        :param name: the name of the algorithm
+        :param nums: the array before the first operation
+        :param ops: all operations of the run
+        :return: the path of the trace file, None if the trace is larger than the size limit and is not cached
+        """
+        path = self._path(self.key(name, nums))
+        os.makedirs(self._directory, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            write(name, nums, ops, tmp_path)
+            return self._insert(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def add(self, name: str, nums: list, trace_path: str) -> Optional[str]:
+        """
+        Copies the recorded trace file to the cache atomically and evicts the least recently used traces over the size
+        limit
+
+        :param name: the name of the recorded algorithm
+        :param nums: the array before the first operation
+        :param trace_path: the path of the trace file, it is left in place
+        :return: the path of the cached copy, None if the trace is larger than the size limit and is not cached
+        """
+        path = self._path(self.key(name, nums))
+        os.makedirs(self._directory, exist_ok=True)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            shutil.copyfile(trace_path, tmp_path)
+            return self._insert(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def path(self, name: str, nums: list, scratch: str) -> str:
+        """
+        Returns the path of a trace file of the algorithm's run, running the algorithm only if the run is not cached.
+        A cached trace is hard-linked to the scratch path and a computed one is recorded there and copied to the cache,
+        so the eviction by another process cannot delete the file before it is opened
+
+        :param name: the name of the algorithm
+        :param nums: the numbers to sort, the list is left unchanged
+        :param scratch: the path outside the cache directory the trace file is linked or recorded to
+        :return: the scratch path, or the cached trace's path on the file systems without hard links
+        """
+        cached = self.lookup(name, nums)
+        if cached is not None:
+            try:
+                os.link(cached, scratch)
+            except OSError:
+                return cached  # the grace period of the eviction still keeps it
+            return scratch
+        record(name, nums, scratch)
+        try:
+            self.add(name, nums, scratch)
+        except OSError:
+            pass  # the trace is used uncached if the cache cannot be written
+        return scratch
+
+    def _entries(self) -> list:
+        """
+        Returns the (last use, size, path) of the cached traces, the least recently used first
+        """
+        entries = []
+        try:
+            names = os.listdir(self._directory)
+        except OSError:
+            return entries
+        for file_name in names:
+            if not file_name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self._directory, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:  # deleted by another process meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def _evict(self, keep: str):
+        """
+        Deletes the least recently used traces until the cache fits its size limit
+
+        :param keep: the path of the trace which is never deleted
+        """
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        recent = time() - _GRACE
+        for last_use, file_size, path in entries:
+            if size <= self._max_bytes or last_use > recent:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:  # deleted by another process or still mapped on Windows
+                continue
+            size -= file_size
+
+    def clear(self):
+        """
+        Deletes all cached traces
+        """
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @property
+    def size(self) -> int:
+        """
+        Getter for the size of the cached traces in bytes
+        """
+        return sum(entry[1] for entry in self._entries())
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Shows or clears the cache of the computed traces')
+    parser.add_argument('--clear', action='store_true', help='delete all cached traces')
+    parser.add_argument('--directory', default=TRACE_CACHE)
+    args = parser.parse_args(argv)
+
+    cache = TraceCache(args.directory)
+    if args.clear:
+        cache.clear()
+    print(f'{len(cache)} traces, {cache.size / 2 ** 20:.1f} MiB in {args.directory}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,181 @@
+"""
+Compact binary traces of the sorting algorithms' operations. A trace file holds a header, the initial array and one
+fixed-width record (opcode, index, index or value) per operation, so a run can be replayed by memory-mapping the file
+instead of running the algorithm again.
+
+Usage: python traces.py bubble -o bubble.svt [--number 600] [--seed 0]
+       python sorting_visualizer.py --replay bubble.svt
+"""
+import argparse
+import mmap
+import random as rnd
+import struct
+from array import array
+from typing import Iterable, Iterator
+
+from algorithms import ALGORITHMS, Operation, OpCode, SWAP, WRITE
+
+MAGIC = b'SVTR'
+VERSION = 1
+# magic, version, algorithm name, length of the array, number of the operations
+HEADER = struct.Struct('<4sH16sQQ')
+# opcode, index, second index or the written value
+RECORD = struct.Struct('<BIq')
+_NAME_SIZE = 16
+_OPCODES = tuple(OpCode)
+_FLUSH_RECORDS = 1 << 16
+
+
+def write(name: str, nums: list, ops: Iterable[Operation], path: str) -> int:
+    """
+    Writes the operations to the trace file, the records are flushed in chunks, so the memory use does not grow with the
+    length of the run
+
+    :param name: the name of the algorithm
+    :param nums: the array before the first operation
+    :param ops: the operations of the run
+    :param path: the path of the trace file
+    :return: the number of written operations
+    :raises ValueError: if the encoded name is longer than the header's 16 bytes
+    """
+    encoded = name.encode()
+    if len(encoded) > _NAME_SIZE:
+        raise ValueError(f'the algorithm name {name!r} is longer than {_NAME_SIZE} bytes')
+    initial = array('q', nums)
+    count = 0
+    chunk = bytearray()
+    pack = RECORD.pack
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, encoded, len(initial), 0))
+        f.write(initial.tobytes())
+        for op in ops:
+            chunk += pack(op.code, op.a, op.b)
+            count += 1
+            if len(chunk) >= _FLUSH_RECORDS * RECORD.size:
+                f.write(chunk)
+                chunk.clear()
+        f.write(chunk)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, encoded, len(initial), count))
+    return count
+
+
+def record(name: str, nums: list, path: str) -> int:
+    """
+    Runs the sorting algorithm on a copy of the numbers and writes its operations to the trace file
+
+    :param name: the name of the algorithm
+    :param nums: the numbers to sort, the list is left unchanged
+    :param path: the path of the trace file
+    :return: the number of recorded operations
+    """
+    return write(name, nums, ALGORITHMS[name](list(nums)), path)
+
+
+def replay(path: str, nums: list) -> Iterator[Operation]:
+    """
+    Replays the trace file the same way a sorting algorithm runs, the file is mapped only while the replay runs
+
+    :param path: the path of the trace file
+    :param nums: the array to apply the operations to, it has to be in the state before the first operation
+    """
+    trace = Trace(path)
+    ops = trace.replay(nums)
+    try:
+        yield from ops
+    finally:
+        ops.close()
+        trace.close()
+
+
+class Trace:
+    """
+    Memory-mapped trace file, the records are unpacked lazily while they are replayed
+    """
+    def __init__(self, path: str):
+        """
+        :param path: the path of the trace file
+        :raises ValueError: if the file is not a trace or its size does not match the header
+        """
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a sorting visualizer trace file')
+        magic, version, name, self._length, self._count = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f'{path} is not a sorting visualizer trace file')
+        self._name = name.rstrip(b'\0').decode()
+        self._records_offset = HEADER.size + self._length * 8
+        if len(self._mmap) != self._records_offset + self._count * RECORD.size:
+            self._mmap.close()
+            raise ValueError(f'{path} is truncated or has trailing data, its size does not match the header')
+
+    def initial(self) -> list:
+        """
+        Returns a copy of the array the trace was recorded on
+        """
+        return array('q', self._mmap[HEADER.size:self._records_offset]).tolist()
+
+    def operations(self, start: int = 0) -> Iterator[Operation]:
+        """
+        Yields the recorded operations
+
+        :param start: the index of the first operation to yield
+        """
+        end = self._records_offset + self._count * RECORD.size
+        view = memoryview(self._mmap)[min(self._records_offset + start * RECORD.size, end):end]
+        try:
+            for code, a, b in RECORD.iter_unpack(view):
+                yield Operation(_OPCODES[code], a, b)
+        finally:
+            view.release()
+
+    def replay(self, nums: list, start: int = 0) -> Iterator[Operation]:
+        """
+        Applies the recorded operations to the array and yields them, the same way a sorting algorithm does
+
+        :param nums: the array to apply the operations to, it has to be in the state before the first operation
+        :param start: the index of the first operation to apply
+        """
+        for op in self.operations(start):
+            if op.code == SWAP:
+                nums[op.a], nums[op.b] = nums[op.b], nums[op.a]
+            elif op.code == WRITE:
+                nums[op.a] = op.b
+            yield op
+
+    def close(self):
+        """
+        Unmaps the trace file
+        """
+        self._mmap.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def name(self) -> str:
+        """
+        Getter for the name of the recorded algorithm
+        """
+        return self._name
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Records a sorting algorithm run to a trace file')
+    parser.add_argument('algorithm', choices=list(ALGORITHMS))
+    parser.add_argument('-o', '--output', required=True, help='the path of the trace file')
+    parser.add_argument('--number', type=int, default=600, help='the length of the generated array')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = rnd.Random(args.seed)
+    nums = [rng.randint(1, 600) for _ in range(args.number)]
+    count = record(args.algorithm, nums, args.output)
+    print(f'recorded {count} operations to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Reproducible input arrays for the sorting algorithms. Every distribution is generated at once with NumPy from a seeded
+generator, so the same seed always gives the same array and arrays of millions of numbers are generated in milliseconds.
+
+Usage: python workloads.py organ_pipe --number 20 --seed 0
+"""
+import argparse
+from typing import Callable, Dict
+
+import numpy as np
+
+
+def _random(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Uniformly distributed numbers
+    """
+    return rng.integers(low, high + 1, n)
+
+
+def _sorted(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Ascending numbers, the worst case of the quick sort taking the last element as the pivot
+    """
+    return np.sort(_random(rng, n, low, high))
+
+
+def _nearly_sorted(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Ascending numbers with 1% of them swapped with random others
+    """
+    nums = _sorted(rng, n, low, high)
+    swaps = max(n // 100, 1) if n > 1 else 0
+    i = rng.integers(0, n, swaps)
+    j = rng.integers(0, n, swaps)
+    nums[i], nums[j] = nums[j], nums[i]
+    return nums
+
+
+def _reversed(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Descending numbers
+    """
+    return _sorted(rng, n, low, high)[::-1].copy()
+
+
+def _few_unique(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Numbers drawn from only 8 distinct values
+    """
+    values = np.linspace(low, high, 8).round().astype(np.int64)
+    return values[rng.integers(0, len(values), n)]
+
+
+def _sawtooth(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    8 ascending runs, each spanning the whole range
+    """
+    period = max(-(-n // 8), 1)
+    return low + np.arange(n) % period * (high - low) // max(period - 1, 1)
+
+
+def _organ_pipe(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Ascending first half followed by a descending second half
+    """
+    steps = np.minimum(np.arange(n), np.arange(n)[::-1])
+    return low + steps * (high - low) // max(int(steps.max(initial=0)), 1)
+
+
+def _gaussian(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Normally distributed numbers centered in the range, 3 standard deviations reach its bounds
+    """
+    nums = rng.normal((low + high) / 2, (high - low) / 6, n).round()
+    return np.clip(nums, low, high).astype(np.int64)
+
+
+def _median_of_3_killer(rng: np.random.Generator, n: int, low: int, high: int) -> np.ndarray:
+    """
+    Musser's permutation making the quick sort with the median of the first, middle and last element as the pivot
+    quadratic, the numbers past the largest multiple of 4 are appended ascending
+    """
+    k = n // 4 * 2
+    ranks = np.arange(1, n + 1)
+    odd = np.arange(1, k + 1, 2)
+    ranks[odd - 1] = odd
+    ranks[odd] = k + odd
+    ranks[k:2 * k] = np.arange(2, 2 * k + 1, 2)
+    return low + (ranks - 1) * (high - low) // max(n - 1, 1)
+
+
+# input distributions by their names, each function takes the generator, the length and the bounds of the numbers
+DISTRIBUTIONS: Dict[str, Callable[[np.random.Generator, int, int, int], np.ndarray]] = {
+    'random': _random,
+    'sorted': _sorted,
+    'nearly_sorted': _nearly_sorted,
+    'reversed': _reversed,
+    'few_unique': _few_unique,
+    'sawtooth': _sawtooth,
+    'organ_pipe': _organ_pipe,
+    'gaussian': _gaussian,
+    'median_of_3_killer': _median_of_3_killer,
+}
+
+
+def generate(distribution: str, n: int, seed: int = None, low: int = 1, high: int = None) -> np.ndarray:
+    """
+    Generates the input array
+
+    :param distribution: the shape of the input, one of DISTRIBUTIONS
+    :param n: the length of the input
+    :param seed: the seed of the random generator, a fresh random state if not given
+    :param low: the smallest possible number
+    :param high: the largest possible number, n by default
+    :return: the int64 array of the numbers
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f'unknown distribution: {distribution}')
+    high = max(n, low) if high is None else high
+    return DISTRIBUTIONS[distribution](np.random.default_rng(seed), n, low, high).astype(np.int64, copy=False)
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description='Generates a reproducible input array')
+    parser.add_argument('distribution', choices=list(DISTRIBUTIONS))
+    parser.add_argument('--number', type=int, default=600, help='the length of the array')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--low', type=int, default=1)
+    parser.add_argument('--high', type=int)
+    args = parser.parse_args(argv)
+
+    print(' '.join(map(str, generate(args.distribution, args.number, args.seed, args.low, args.high).tolist())))
+
+
+if __name__ == '__main__':
+    main()